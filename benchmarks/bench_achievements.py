@@ -0,0 +1,48 @@
+"""成就计算基准测试
+
+运行: python -m benchmarks.bench_achievements
+
+为一个用户依次记录 10000 次会话的统计，报告每次 record() 的耗时（应不随会话数增长），
+以及重新创建 AchievementEngine（读取已保存状态）的耗时。
+"""
+import os
+import random
+import tempfile
+import time
+
+from core.Achievements import AchievementEngine
+from core.DatabaseManager import DatabaseManger
+
+SESSIONS = 10_000
+DAY = 86400
+
+
+def main() -> None:
+    rng = random.Random(1)
+    database = DatabaseManger(os.path.join(tempfile.mkdtemp(), "bench.db"))
+    achievements = AchievementEngine(database, 1)
+
+    start_time = 1_700_000_000
+    elapsed = []
+    for i in range(SESSIONS):
+        start_time += rng.choice((3600, DAY, DAY, 2 * DAY))
+        stats = {
+            'typed_chars': rng.randint(100, 600), 'wpm': rng.uniform(20, 70),
+            'accuracy': rng.uniform(85, 100), 'duration_time': rng.uniform(30, 300),
+            'start_time': start_time, 'end_time': start_time + 300,
+        }
+        before = time.perf_counter()
+        achievements.record(stats)
+        elapsed.append(time.perf_counter() - before)
+
+    for label, part in (("前 1000 次", elapsed[:1000]), ("后 1000 次", elapsed[-1000:])):
+        print(f"{label}: 平均 {sum(part) / len(part) * 1e6:8.1f} us/次")
+
+    before = time.perf_counter()
+    reloaded = AchievementEngine(database, 1)
+    print(f"重新加载状态: {(time.perf_counter() - before) * 1000:.2f} ms, 已达成 {len(reloaded.unlocked)} 项")
+    database.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""批量输入基准测试
+
+运行: python -m benchmarks.bench_batch_input
+
+用 1 MB 的回放数据（约 1% 错误）分别逐字符调用 process_input
+与按块调用 process_inputs，对比吞吐量。批量输入的计时包含按键间隔统计的导出（rows），
+确保没有工作被推迟到计时之外；批量输入相对逐字符输入的加速比低于 MIN_SPEEDUP 时以非零状态退出。
+"""
+import random
+import sys
+import time
+
+from core.StatusScheduler import StatusScheduler
+from core.TypingEngine import TypingEngine
+
+TEXT_SIZE = 1024 * 1024
+CHUNK = 4096
+MIN_SPEEDUP = 8
+
+
+def build_replay() -> tuple:
+    rng = random.Random(7)
+    words = ["typing", "practice", "keyboard", "engine", "replay", "session", "throughput"]
+    text = " ".join(rng.choice(words) for _ in range(TEXT_SIZE // 7))[:TEXT_SIZE]
+    typed = "".join(c if rng.random() > 0.01 else '#' for c in text)
+    timestamps = [i * 100_000_000 for i in range(len(text))]
+    return text, typed, timestamps
+
+
+def new_engine(text:str) -> TypingEngine:
+    engine = TypingEngine(StatusScheduler())
+    engine.status_update = lambda status: None
+    engine.load_text(text)
+    engine.reset_engine()
+    return engine
+
+
+def main() -> None:
+    text, typed, timestamps = build_replay()
+
+    engine = new_engine(text)
+    start = time.perf_counter()
+    for char, timestamp in zip(typed, timestamps):
+        engine.process_input(char, timestamp)
+    single = time.perf_counter() - start
+
+    engine = new_engine(text)
+    start = time.perf_counter()
+    for offset in range(0, len(typed), CHUNK):
+        engine.process_inputs(typed[offset:offset + CHUNK], timestamps[offset:offset + CHUNK])
+    engine.latency.rows(None)
+    batch = time.perf_counter() - start
+
+    print(f"回放 {len(typed):,} 个字符")
+    print(f"process_input  逐字符: {single * 1000:>9.1f} ms  ({len(typed) / single:>12,.0f} 字符/秒)")
+    print(f"process_inputs 分块:   {batch * 1000:>9.1f} ms  ({len(typed) / batch:>12,.0f} 字符/秒, {single / batch:.1f}x)")
+    if single / batch < MIN_SPEEDUP:
+        print(f"失败: 加速比低于 {MIN_SPEEDUP}x")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""挑战模式基准测试
+
+运行: python -m benchmarks.bench_challenge
+
+1. 同时进行 200 个时长随机（0.2 ~ 1 秒）的定时挑战，报告调度线程在截止时刻之后
+   多久被唤醒，并核对每个会话记录的时长与限定时间完全一致。
+2. 对比普通会话与定量挑战中 process_input 的吞吐量（定量检查为每键 O(1)）。
+"""
+import itertools
+import random
+import time
+
+from core.Challenge import TimedChallenge, QuotaChallenge
+from core.DeadlineScheduler import DeadlineScheduler
+from core.StatusScheduler import StatusScheduler
+from core.TypingEngine import TypingEngine
+
+CHALLENGES = 200
+KEYS = 200_000
+
+
+def new_engine(text:str = "") -> TypingEngine:
+    engine = TypingEngine(StatusScheduler())
+    engine.status_update = lambda status: None
+    if text:
+        engine.load_text(text)
+    return engine
+
+
+def wake_accuracy() -> None:
+    rng = random.Random(3)
+    scheduler = DeadlineScheduler()
+    lateness = []
+    challenges = []
+    for _ in range(CHALLENGES):
+        challenge = TimedChallenge(
+            new_engine(), rng.uniform(0.2, 1.0), itertools.repeat("practice makes perfect"), scheduler
+        )
+        expire = challenge.expire
+
+        def timed_expire(challenge=challenge, expire=expire):
+            lateness.append(time.perf_counter_ns() - challenge.deadline)
+            expire()
+
+        challenge.expire = timed_expire
+        challenge.start()
+        challenges.append(challenge)
+
+    time.sleep(1.2)
+    exact = sum(c.engine.get_duration_ns() == c.limit for c in challenges)
+    lateness.sort()
+    print(
+        f"{CHALLENGES} 个定时挑战: 唤醒滞后 p50 {lateness[len(lateness) // 2] / 1e6:.3f} ms, "
+        f"p99 {lateness[len(lateness) * 99 // 100] / 1e6:.3f} ms, 最大 {lateness[-1] / 1e6:.3f} ms; "
+        f"时长与限定时间一致 {exact}/{CHALLENGES}"
+    )
+
+
+def quota_throughput() -> None:
+    text = "practice makes perfect " * (KEYS // 23 + 1)
+    for name, make in (
+        ("普通会话", lambda engine: engine.start_session()),
+        ("定量挑战", lambda engine: QuotaChallenge(engine, chars=KEYS).start()),
+    ):
+        engine = new_engine(text)
+        make(engine)
+        start = time.perf_counter()
+        for char in text[:KEYS]:
+            engine.process_input(char)
+        elapsed = time.perf_counter() - start
+        print(f"{name}: {KEYS / elapsed:12,.0f} 键/秒  (已结束: {engine.is_completed})")
+
+
+def main() -> None:
+    wake_accuracy()
+    quota_throughput()
+
+
+if __name__ == "__main__":
+    main()
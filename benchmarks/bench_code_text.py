@@ -0,0 +1,61 @@
+"""代码练习文本基准测试
+
+运行: python -m benchmarks.bench_code_text
+
+把本仓库的 Python 源文件重复拼接成约 1 万行的代码，比较首次分析（Pygments）
+与命中磁盘缓存的加载时间，并测量按位置查找记号与可见区域着色的耗时。
+"""
+import glob
+import os
+import random
+import tempfile
+import time
+
+from core.CodeText import CodeText, TokenCache
+
+LINES = 10_000
+VISIBLE = 3_000
+
+
+def build_source() -> str:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sources = []
+    for path in sorted(glob.glob(os.path.join(root, 'core', '*.py'))):
+        with open(path, encoding='utf-8') as file:
+            sources.append(file.read())
+    lines = "\n".join(sources).split('\n')
+    return "\n".join((lines * (LINES // len(lines) + 1))[:LINES])
+
+
+def main() -> None:
+    source = build_source()
+    cache = TokenCache(tempfile.mkdtemp())
+
+    start = time.perf_counter()
+    code = CodeText(source, "bench.py", cache=cache)
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    CodeText(source, "bench.py", cache=cache)
+    warm = time.perf_counter() - start
+    print(f"{LINES:,} 行, 输入 {len(code):,} 字符, {len(code.starts):,} 个记号段")
+    print(f"首次分析: {cold * 1000:8.1f} ms")
+    print(f"命中缓存: {warm * 1000:8.1f} ms  ({cold / warm:.0f}x)")
+
+    rng = random.Random(5)
+    positions = [rng.randrange(len(code)) for _ in range(100_000)]
+    start = time.perf_counter()
+    for position in positions:
+        code.token_at(position)
+    elapsed = time.perf_counter() - start
+    print(f"token_at: {elapsed / len(positions) * 1e9:8.0f} ns/次")
+
+    start = time.perf_counter()
+    for position in positions[:1000]:
+        for _ in code.tokens_between(position, position + VISIBLE):
+            pass
+    elapsed = time.perf_counter() - start
+    print(f"可见区域着色（{VISIBLE} 字符）: {elapsed / 1000 * 1e6:8.1f} us/次")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""数据库访问基准测试
+
+运行: python -m benchmarks.bench_database
+
+多个写线程并发插入、查询，对比每次调用都新建连接（原实现）
+与线程内复用 WAL 连接两种方式的每秒操作数。
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from core.DatabaseManager import DatabaseManger
+
+WRITERS = 4
+OPERATIONS = 500
+
+SCHEMA = "CREATE TABLE IF NOT EXISTS samples (id INTEGER PRIMARY KEY, writer INTEGER, value REAL)"
+INSERT = "INSERT INTO samples (writer, value) VALUES (?, ?)"
+SELECT = "SELECT COUNT(*), AVG(value) FROM samples WHERE writer = ?"
+
+
+def run_threads(worker) -> float:
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(WRITERS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return WRITERS * OPERATIONS / (time.perf_counter() - start)
+
+
+def bench_connect_per_call(path:str) -> tuple:
+    def connect():
+        return sqlite3.connect(database=path, timeout=30)
+
+    conn = connect()
+    conn.execute(SCHEMA)
+    conn.close()
+
+    def writer(index):
+        for i in range(OPERATIONS):
+            conn = connect()
+            conn.execute(INSERT, (index, i))
+            conn.commit()
+            conn.close()
+
+    def reader(index):
+        for _ in range(OPERATIONS):
+            conn = connect()
+            conn.execute(SELECT, (index,)).fetchone()
+            conn.close()
+
+    return run_threads(writer), run_threads(reader)
+
+
+def bench_pooled(path:str) -> tuple:
+    database = DatabaseManger(path)
+    database.execute(SCHEMA)
+
+    def writer(index):
+        for i in range(OPERATIONS):
+            with database.transaction() as conn:
+                conn.execute(INSERT, (index, i))
+
+    def reader(index):
+        for _ in range(OPERATIONS):
+            database.execute(SELECT, (index,)).fetchone()
+
+    result = run_threads(writer), run_threads(reader)
+    database.close()
+    return result
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        legacy_insert, legacy_query = bench_connect_per_call(os.path.join(directory, 'legacy.db'))
+        pooled_insert, pooled_query = bench_pooled(os.path.join(directory, 'pooled.db'))
+
+    print(f"{WRITERS} 个线程并发，每线程 {OPERATIONS} 次操作")
+    print(f"每次新建连接: 插入 {legacy_insert:>10,.0f} 次/秒, 查询 {legacy_query:>10,.0f} 次/秒")
+    print(f"复用 WAL 连接: 插入 {pooled_insert:>10,.0f} 次/秒, 查询 {pooled_query:>10,.0f} 次/秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""游程差异渲染器基准测试
+
+运行: python -m benchmarks.bench_diff_renderer
+
+在 100 KB 文本上，对比每次按键后全量生成标记文本（原 get_formatted_text）
+与增量游程渲染的单次重绘耗时。
+"""
+import time
+
+from ui.components import DiffRenderer
+
+TEXT_SIZE = 100 * 1024
+LEGACY_SAMPLES = 20
+SAMPLES = 100_000
+
+
+def legacy_formatted_text(text:str, current_index:int, error_positions:set) -> str:
+    """原实现：逐字符拼接标记"""
+    formatted_text = ""
+    for i, char in enumerate(text):
+        if i < current_index:
+            if i in error_positions:
+                formatted_text += f"[ERROR]{char}[/ERROR]"
+            else:
+                formatted_text += f"[CORRECT]{char}[/CORRECT]"
+        elif i == current_index:
+            formatted_text += f"[CURRENT]{char}[/CURRENT]"
+        else:
+            formatted_text += char
+    return formatted_text
+
+
+def main() -> None:
+    text = ("lorem ipsum dolor sit amet " * (TEXT_SIZE // 27 + 1))[:TEXT_SIZE]
+    error_positions = set(range(0, TEXT_SIZE, 17))
+
+    start = time.perf_counter_ns()
+    for i in range(LEGACY_SAMPLES):
+        legacy_formatted_text(text, TEXT_SIZE // 2 + i, error_positions)
+    legacy_ns = (time.perf_counter_ns() - start) / LEGACY_SAMPLES
+
+    renderer = DiffRenderer(TEXT_SIZE)
+    start = time.perf_counter_ns()
+    for i in range(SAMPLES):
+        renderer.advance(i % 17 != 0)
+        if i % 10 == 9:
+            renderer.retreat()
+    renderer_ns = (time.perf_counter_ns() - start) / SAMPLES
+
+    print(f"全量标记文本: {legacy_ns / 1000:>10.1f} us/次")
+    print(f"增量游程渲染: {renderer_ns / 1000:>10.3f} us/次  (共 {len(renderer.runs):,} 个游程)")
+
+
+if __name__ == "__main__":
+    main()
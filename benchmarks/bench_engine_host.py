@@ -0,0 +1,98 @@
+"""多用户宿主基准测试
+
+运行: python -m benchmarks.bench_engine_host [秒数]
+
+在单个进程（单核）中模拟 1000 名学生同时练习，每人每秒 10 次按键（约 3% 错误），
+按键经 EngineHost 交给各自的引擎，状态由共享调度器每 100ms 推送一次，
+练习数据经共享写入器保存到临时数据库。报告 CPU 占用、按键处理延迟与每个会话的内存。
+"""
+import heapq
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from core.DatabaseManager import DatabaseManger
+from core.EngineHost import EngineHost
+from core.SessionWriter import SessionWriter
+
+TYPISTS = 1000
+KEYS_PER_SECOND = 10
+TEXTS = 20
+
+
+def build_texts(rng:random.Random) -> list:
+    words = ["lesson", "keyboard", "practice", "student", "classroom", "accuracy", "rhythm", "finger"]
+    return [" ".join(rng.choice(words) for _ in range(400)) for _ in range(TEXTS)]
+
+
+def session_memory(texts:list) -> float:
+    """每个会话的内存占用（字节，不含共享文本）"""
+    host = EngineHost()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(TYPISTS):
+        engine = host.open(i, texts[i % TEXTS])
+        for char in engine.text[:200]:
+            host.feed(i, char)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    host.close_all()
+    return used / TYPISTS
+
+
+def main() -> None:
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+    rng = random.Random(9)
+    texts = build_texts(rng)
+
+    print(f"每个会话内存（输入 200 字符后）: {session_memory(texts) / 1024:.1f} KB")
+
+    database = DatabaseManger(os.path.join(tempfile.mkdtemp(), "bench.db"))
+    writer = SessionWriter(database)
+    host = EngineHost(writer)
+    period = 1 / KEYS_PER_SECOND
+
+    start = time.perf_counter()
+    queue = []
+    for i in range(TYPISTS):
+        host.open(i, texts[i % TEXTS])
+        heapq.heappush(queue, (start + rng.random() * period, i))
+
+    lags = []
+    keystrokes = 0
+    cpu_start = time.process_time()
+    deadline = start + seconds
+    while queue[0][0] < deadline:
+        due, i = queue[0]
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        engine = host.get(i)
+        expected = engine.text[engine.current_position]
+        host.feed(i, expected if rng.random() > 0.03 else '#')
+        keystrokes += 1
+        lags.append(time.perf_counter() - due)
+        heapq.heapreplace(queue, (due + period * rng.uniform(0.5, 1.5), i))
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+
+    host.close_all()
+    writer.close()
+    saved = database.query("SELECT COUNT(*) FROM keystrokes")[0][0]
+    database.close()
+
+    lags.sort()
+    print(f"{TYPISTS} 名学生 x {KEYS_PER_SECOND} 键/秒, 运行 {elapsed:.1f} 秒")
+    print(f"处理按键: {keystrokes:,} 次 ({keystrokes / elapsed:,.0f} 次/秒), 已保存 {saved:,} 条")
+    print(f"CPU 占用: {cpu / elapsed * 100:.1f}% (单核)")
+    print(
+        f"按键处理滞后: p50 {lags[len(lags) // 2] * 1000:.2f} ms, "
+        f"p99 {lags[len(lags) * 99 // 100] * 1000:.2f} ms, 最大 {lags[-1] * 1000:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
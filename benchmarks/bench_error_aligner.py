@@ -0,0 +1,73 @@
+"""错误对齐基准测试
+
+运行: python -m benchmarks.bench_error_aligner
+
+在 4 KB ~ 256 KB 的文本上注入漂移错误（每约 30 个字符一处打错、多打、漏打或交换），
+逐字符输入 ErrorAligner，报告每个按键的平均与最大耗时。每键耗时只取决于窗口大小，
+不随文本长度增长；同时核对识别出的错误类型与注入的一致。
+"""
+import random
+import time
+from collections import Counter
+
+from core.ErrorAligner import ErrorAligner, SUBSTITUTION, INSERTION, OMISSION, TRANSPOSITION
+
+SIZES = (4 * 1024, 16 * 1024, 64 * 1024, 256 * 1024)
+ERROR_INTERVAL = 30
+
+
+def build(size:int, rng:random.Random) -> tuple:
+    """生成文本与带漂移错误的输入"""
+    words = ["typing", "practice", "keyboard", "engine", "replay", "session", "throughput", "latency"]
+    text = " ".join(rng.choice(words) for _ in range(size // 7))[:size]
+    typed = []
+    injected = Counter()
+    position = 0
+    next_error = ERROR_INTERVAL // 2
+    while position < len(text):
+        if position >= next_error and position + 2 < len(text) and text[position] != text[position + 1]:
+            next_error = position + ERROR_INTERVAL
+            kind = rng.choice((SUBSTITUTION, INSERTION, OMISSION, TRANSPOSITION))
+            injected[kind] += 1
+            if kind == SUBSTITUTION:
+                typed.append('#')
+                position += 1
+            elif kind == INSERTION:
+                typed.append('#')
+            elif kind == OMISSION:
+                position += 1
+            else:
+                typed.append(text[position + 1])
+                typed.append(text[position])
+                position += 2
+            continue
+        typed.append(text[position])
+        position += 1
+    return text, "".join(typed), injected
+
+
+def main() -> None:
+    rng = random.Random(11)
+    for size in SIZES:
+        text, typed, injected = build(size, rng)
+        aligner = ErrorAligner()
+        aligner.reset(text)
+        slowest = 0
+        start = time.perf_counter()
+        for char in typed:
+            before = time.perf_counter_ns()
+            aligner.feed(char)
+            slowest = max(slowest, time.perf_counter_ns() - before)
+        aligner.finish()
+        elapsed = time.perf_counter() - start
+
+        detected = {kind: aligner.counts[kind] for kind in injected}
+        print(
+            f"{size // 1024:>4} KB: {len(typed):>7,} 键, "
+            f"平均 {elapsed / len(typed) * 1e6:6.2f} us/键, 最大 {slowest / 1000:7.1f} us, "
+            f"注入 {sum(injected.values())} 处错误, 识别{'一致' if detected == dict(injected) else f'不一致 {detected}'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
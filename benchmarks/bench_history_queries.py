@@ -0,0 +1,82 @@
+"""历史查询基准测试
+
+运行: python -m benchmarks.bench_history_queries [会话数]
+
+向临时数据库写入大量（默认 100 万条）合成练习记录及按键记录，
+测量进度图表与错误趋势查询的耗时，并输出查询计划以确认使用了覆盖索引。
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from core.DatabaseManager import DatabaseManger
+
+USERS = 1000
+KEYSTROKES = 1_000_000
+CHARS = "abcdefghijklmnopqrstuvwxyz,.;"
+
+HISTORY = '''
+    SELECT started_at, wpm, accuracy FROM sessions
+    WHERE user_id = ? AND started_at >= ? ORDER BY started_at
+'''
+RECENT = '''
+    SELECT started_at, wpm, accuracy FROM sessions
+    WHERE user_id = ? ORDER BY started_at DESC LIMIT 100
+'''
+CHAR_TREND = '''
+    SELECT COUNT(*), SUM(is_correct = 0) FROM keystrokes
+    WHERE user_id = ? AND expected = ? AND timestamp >= ?
+'''
+
+
+def load(database:DatabaseManger, sessions:int) -> None:
+    rng = random.Random(42)
+    now = time.time()
+    span = 365 * 24 * 3600
+    database.executemany(
+        "INSERT INTO sessions (id, user_id, started_at, duration, wpm, accuracy) VALUES (?, ?, ?, ?, ?, ?)",
+        (
+            (i, rng.randrange(USERS), now - rng.random() * span, 60.0, rng.uniform(20, 120), rng.uniform(80, 100))
+            for i in range(1, sessions + 1)
+        )
+    )
+    database.executemany(
+        "INSERT INTO keystrokes (session_id, user_id, position, char, expected, is_correct, timestamp) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (
+            (i // 100, rng.randrange(USERS), i % 100, 'a', rng.choice(CHARS), rng.random() > 0.05, now - rng.random() * span)
+            for i in range(KEYSTROKES)
+        )
+    )
+
+
+def timed(database:DatabaseManger, sql:str, parameters:tuple, repeat:int = 200) -> float:
+    start = time.perf_counter()
+    for i in range(repeat):
+        database.query(sql, (i % USERS,) + parameters)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as directory:
+        database = DatabaseManger(os.path.join(directory, 'history.db'))
+        start = time.perf_counter()
+        load(database, sessions)
+        print(f"写入 {sessions:,} 条会话与 {KEYSTROKES:,} 条按键记录: {time.perf_counter() - start:.1f} s")
+
+        month_ago = time.time() - 30 * 24 * 3600
+        for name, sql, parameters in (
+            ("近 30 天历史", HISTORY, (month_ago,)),
+            ("最近 100 次", RECENT, ()),
+            ("单字符错误趋势", CHAR_TREND, ('e', month_ago)),
+        ):
+            plan = database.query("EXPLAIN QUERY PLAN " + sql, (0,) + parameters)[0][-1]
+            print(f"{name}: {timed(database, sql, parameters):>8.3f} ms/次  [{plan}]")
+        database.close()
+
+
+if __name__ == "__main__":
+    main()
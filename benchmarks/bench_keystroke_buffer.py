@@ -0,0 +1,65 @@
+"""按键缓冲区基准测试
+
+运行: python -m benchmarks.bench_keystroke_buffer
+
+分别测量在已输入 100 ~ 1,000,000 个字符时，继续追加/退格的单次耗时，
+并与原先字符串拼接方式对比。缓冲区的单次耗时应基本保持不变。
+"""
+import time
+
+from core.KeystrokeBuffer import KeystrokeBuffer
+
+SIZES = (100, 1_000, 10_000, 100_000, 1_000_000)
+SAMPLES = 2_000
+
+
+def bench_buffer(size:int) -> tuple:
+    buffer = KeystrokeBuffer()
+    for i in range(size):
+        buffer.append('a', i % 7 != 0)
+
+    start = time.perf_counter_ns()
+    for _ in range(SAMPLES):
+        buffer.append('b', True)
+    append_ns = (time.perf_counter_ns() - start) / SAMPLES
+
+    start = time.perf_counter_ns()
+    for _ in range(SAMPLES):
+        buffer.pop()
+    pop_ns = (time.perf_counter_ns() - start) / SAMPLES
+
+    return append_ns, pop_ns
+
+
+def bench_string(size:int) -> tuple:
+    user_input = 'a' * size
+
+    start = time.perf_counter_ns()
+    for _ in range(SAMPLES):
+        user_input += 'b'
+        # 保持对旧字符串的引用，模拟真实场景下无法原地扩展的情况
+        snapshot = user_input
+    append_ns = (time.perf_counter_ns() - start) / SAMPLES
+
+    start = time.perf_counter_ns()
+    for _ in range(SAMPLES):
+        user_input = user_input[:-1]
+    pop_ns = (time.perf_counter_ns() - start) / SAMPLES
+
+    del snapshot
+    return append_ns, pop_ns
+
+
+def main() -> None:
+    print(f"{'已输入字符':>12} | {'缓冲区追加':>10} | {'缓冲区退格':>10} | {'字符串追加':>10} | {'字符串退格':>10}  (ns/次)")
+    for size in SIZES:
+        buf_append, buf_pop = bench_buffer(size)
+        str_append, str_pop = bench_string(size)
+        print(
+            f"{size:>12,} | {buf_append:>14.1f} | {buf_pop:>14.1f} | "
+            f"{str_append:>14.1f} | {str_pop:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""练习文本生成基准测试
+
+运行: python -m benchmarks.bench_practice_generator
+
+生成约 30 万词（约 3 万个不同单词）的合成语料，分别测量：
+首次建立索引、读取磁盘缓存、修改一个文件后的增量更新，
+以及按薄弱字符/字符对生成 500 词练习文本的耗时。
+"""
+import os
+import random
+import tempfile
+import time
+
+from core.PracticeGenerator import CorpusIndex, PracticeGenerator
+
+FILES = 10
+WORDS_PER_FILE = 30_000
+VOCABULARY = 30_000
+DRILLS = 200
+
+
+def build_corpus(directory:str) -> None:
+    rng = random.Random(3)
+    letters = "etaoinshrdlcumwfgypbvkjxqz"
+    vocabulary = [
+        "".join(rng.choices(letters, weights=range(26, 0, -1), k=rng.randint(2, 10)))
+        for _ in range(VOCABULARY)
+    ]
+    for i in range(FILES):
+        with open(os.path.join(directory, f"corpus{i}.txt"), 'w', encoding='utf-8') as file:
+            file.write(" ".join(rng.choices(vocabulary, k=WORDS_PER_FILE)))
+
+
+def timed(function) -> tuple:
+    start = time.perf_counter()
+    result = function()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    directory = tempfile.mkdtemp()
+    build_corpus(directory)
+
+    cache_dir = tempfile.mkdtemp()
+    index, cold = timed(lambda: CorpusIndex(directory, cache_dir))
+    _, cached = timed(lambda: CorpusIndex(directory, cache_dir))
+    path = os.path.join(directory, "corpus0.txt")
+    with open(path, 'a', encoding='utf-8') as file:
+        file.write(" additional words appended")
+    changed, incremental = timed(index.refresh)
+    _, unchanged = timed(index.refresh)
+
+    print(f"语料: {FILES * WORDS_PER_FILE:,} 词, 词表 {len(index):,} 个, 倒排表 {len(index.postings):,} 个")
+    print(f"首次建立索引:     {cold:>8.1f} ms")
+    print(f"读取磁盘缓存:     {cached:>8.1f} ms")
+    print(f"增量更新({changed} 个文件): {incremental:>8.1f} ms")
+    print(f"无变化时检查:     {unchanged:>8.1f} ms")
+
+    generator = PracticeGenerator(index, seed=1)
+    error_analysis = {'q': 12, 'z': 7, 'x': 5, 'j': 3}
+    slow_bigrams = [('th', 420.0, 30), ('qu', 380.0, 12), ('e ', 300.0, 80)]
+    samples = []
+    for _ in range(DRILLS):
+        _, elapsed = timed(lambda: generator.generate(500, error_analysis, slow_bigrams))
+        samples.append(elapsed)
+    samples.sort()
+    print(f"生成 500 词练习:  p50 {samples[len(samples) // 2]:.2f} ms, p95 {samples[len(samples) * 95 // 100]:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""会话回放基准测试
+
+运行: python -m benchmarks.bench_replay [录制文件 ...]
+
+不指定录制文件时生成一段合成录制（约 2% 错误、少量退格与一次暂停），
+以虚拟时钟全速回放（无 sleep、无界面），报告吞吐量、
+单次按键处理耗时分布以及每个会话的内存占用。
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from core.Clock import VirtualClock
+from core.SessionRecorder import SessionRecorder, SessionReplayer, PAUSE, RESUME, BACKSPACE
+from core.StatusScheduler import StatusScheduler
+from core.TypingEngine import TypingEngine
+
+KEYSTROKES = 200000
+ROUNDS = 5
+
+
+def new_engine(text:str, recorder:SessionRecorder = None, clock:VirtualClock = None) -> TypingEngine:
+    engine = TypingEngine(StatusScheduler(), recorder=recorder, clock=clock)
+    engine.status_update = lambda status: None
+    engine.load_text(text)
+    return engine
+
+
+def build_recording(path:str) -> None:
+    """生成一段合成录制"""
+    rng = random.Random(11)
+    words = ["typing", "practice", "keyboard", "engine", "replay", "session", "latency"]
+    text = " ".join(rng.choice(words) for _ in range(KEYSTROKES // 7))[:KEYSTROKES]
+
+    clock = VirtualClock(1_700_000_000 * 1_000_000_000)
+    engine = new_engine(text, SessionRecorder(path, {'text': text}), clock)
+    engine.start_session()
+    for char in text:
+        clock.advance(rng.randrange(40_000_000, 250_000_000))
+        if rng.random() < 0.02:
+            engine.process_input('#', clock.now)
+            if rng.random() < 0.5:
+                engine.backspace()
+                engine.process_input(char, clock.now)
+        else:
+            engine.process_input(char, clock.now)
+        if engine.current_position == len(text) // 2 and engine.is_active:
+            engine.pause_session()
+            clock.advance(30_000_000_000)
+            engine.resume_session()
+    engine.end_session()
+
+
+def histogram(samples:list) -> str:
+    """按 2 的幂分桶的耗时直方图（纳秒）"""
+    buckets = {}
+    for sample in samples:
+        bucket = 1 << max(0, sample.bit_length() - 1)
+        buckets[bucket] = buckets.get(bucket, 0) + 1
+    width = max(buckets.values())
+    return "\n".join(
+        f"  {bucket:>8,} ns  {count:>9,}  " + "#" * max(1, count * 40 // width)
+        for bucket, count in sorted(buckets.items())
+    )
+
+
+def per_keystroke(replayer:SessionReplayer) -> list:
+    """逐个事件回放，测量每次按键的处理耗时"""
+    clock = VirtualClock(replayer.metadata['started_at'])
+    engine = new_engine(replayer.metadata['text'], clock=clock)
+    engine.start_session()
+    base = engine.start_time
+    counter = time.perf_counter_ns
+    samples = []
+    for code, elapsed in replayer.events:
+        clock.now = base + elapsed
+        if isinstance(code, str):
+            start = counter()
+            engine.process_input(code, clock.now)
+            samples.append(counter() - start)
+        elif code == BACKSPACE:
+            engine.backspace()
+        elif code == PAUSE:
+            engine.pause_session()
+        elif code == RESUME:
+            engine.resume_session()
+        else:
+            engine.end_session()
+    return samples
+
+
+def main() -> None:
+    paths = sys.argv[1:]
+    if not paths:
+        path = os.path.join(tempfile.mkdtemp(), "synthetic.jtrc")
+        build_recording(path)
+        paths = [path]
+
+    for path in paths:
+        replayer = SessionReplayer(path)
+        text = replayer.metadata['text']
+        print(f"{os.path.basename(path)}: {len(replayer):,} 个事件, 文本 {len(text):,} 个字符")
+
+        for batch in (False, True):
+            best = float('inf')
+            for _ in range(ROUNDS):
+                engine = new_engine(text)
+                start = time.perf_counter()
+                replayer.replay(engine, batch=batch)
+                best = min(best, time.perf_counter() - start)
+            label = "批量回放" if batch else "逐键回放"
+            print(f"  {label}: {best * 1000:>8.1f} ms  ({len(replayer) / best:>12,.0f} 事件/秒)")
+
+        samples = sorted(per_keystroke(replayer))
+        for point in (50, 95, 99):
+            print(f"  p{point}: {samples[len(samples) * point // 100]:,} ns")
+        print(histogram(samples))
+
+        tracemalloc.start()
+        engine = new_engine(text)
+        replayer.replay(engine)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"  每个会话内存: 当前 {current / 1024:,.0f} KB, 峰值 {peak / 1024:,.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
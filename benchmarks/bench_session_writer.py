@@ -0,0 +1,63 @@
+"""练习数据写入基准测试
+
+运行: python -m benchmarks.bench_session_writer
+
+对比输入线程中同步逐条写入与交给 SessionWriter 后台批量写入时，
+每次按键在输入线程上的耗时，以及全部数据落盘所需的总时间。
+"""
+import os
+import tempfile
+import time
+
+from core.DatabaseManager import DatabaseManger
+from core.SessionWriter import SessionWriter
+
+KEYSTROKES = 20_000
+
+
+def percentile(samples:list, ratio:float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * ratio))]
+
+
+def bench_sync(database:DatabaseManger) -> tuple:
+    latencies = []
+    start = time.perf_counter()
+    for i in range(KEYSTROKES):
+        begin = time.perf_counter_ns()
+        with database.transaction() as conn:
+            conn.execute(SessionWriter.INSERT_KEYSTROKE, (1, 1, i, 'a', 'a', True, time.time()))
+        latencies.append(time.perf_counter_ns() - begin)
+    return latencies, time.perf_counter() - start
+
+
+def bench_async(database:DatabaseManger) -> tuple:
+    writer = SessionWriter(database)
+    latencies = []
+    start = time.perf_counter()
+    for i in range(KEYSTROKES):
+        begin = time.perf_counter_ns()
+        writer.record_keystroke(2, 1, i, 'a', 'a', True, time.time())
+        latencies.append(time.perf_counter_ns() - begin)
+    writer.flush()
+    elapsed = time.perf_counter() - start
+    writer.close()
+    return latencies, elapsed
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        database = DatabaseManger(os.path.join(directory, 'bench.db'))
+        SessionWriter(database).close()
+        for name, bench in (("同步逐条写入", bench_sync), ("后台批量写入", bench_async)):
+            latencies, elapsed = bench(database)
+            print(
+                f"{name}: 输入线程 p50 {percentile(latencies, 0.5) / 1000:>8.2f} us, "
+                f"p99 {percentile(latencies, 0.99) / 1000:>8.2f} us, "
+                f"max {max(latencies) / 1000:>9.2f} us | 全部落盘 {elapsed * 1000:>8.1f} ms"
+            )
+        database.close()
+
+
+if __name__ == "__main__":
+    main()
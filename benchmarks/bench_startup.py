@@ -0,0 +1,102 @@
+"""启动时间基准测试
+
+运行: python -m benchmarks.bench_startup
+
+用 python -X importtime 在子进程中测量各启动路径的导入耗时，
+检查终端模式（--headless）不会导入 tkinter，
+并在有显示器时测量图形界面从启动到第一帧的时间。任一项超出预算时以非零状态退出。
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 各启动路径的预算（毫秒）
+BUDGET = {
+    'import core': 20,
+    'headless': 150,
+    'gui import': 250,
+    'first frame': 1000,
+}
+
+FIRST_FRAME = """
+import time
+start = time.perf_counter()
+from core import TyperApplication
+app = TyperApplication()
+app.root.update()
+print((time.perf_counter() - start) * 1000)
+app.root.destroy()
+"""
+
+
+def import_time(args:list, stdin:str = '') -> tuple:
+    """在子进程中以 -X importtime 运行
+    Returns:
+        total(float): 顶层模块累计导入耗时（毫秒）
+        modules(set): 导入的全部模块名
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', *args],
+        cwd=ROOT, input=stdin, capture_output=True, text=True, check=True
+    )
+    total = 0
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules.add(name.strip())
+        # 顶层导入没有缩进
+        if not name.startswith('  '):
+            total += int(cumulative)
+    return total / 1000, modules
+
+
+def first_frame() -> float:
+    """图形界面启动到第一帧的时间（毫秒），无显示器时返回 None"""
+    result = subprocess.run(
+        [sys.executable, '-c', FIRST_FRAME], cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip())
+
+
+def main() -> None:
+    failures = []
+
+    def report(name:str, elapsed:float) -> None:
+        over = elapsed > BUDGET[name]
+        if over:
+            failures.append(name)
+        print(f"{name:<12} {elapsed:8.1f} ms  (预算 {BUDGET[name]} ms){'  超出预算！' if over else ''}")
+
+    elapsed, modules = import_time(['-c', 'import core'])
+    report('import core', elapsed)
+    for heavy in ('tkinter', 'sqlite3'):
+        if heavy in modules:
+            failures.append(f'import core 导入了 {heavy}')
+
+    elapsed, modules = import_time(['main.py', '--headless'], "The quick brown fox\njumps over the lazy dog.\n")
+    report('headless', elapsed)
+    if 'tkinter' in modules:
+        failures.append('终端模式导入了 tkinter')
+
+    elapsed, modules = import_time(['-c', 'from core import TyperApplication'])
+    report('gui import', elapsed)
+
+    elapsed = first_frame()
+    if elapsed is None:
+        print("first frame  跳过（没有可用的显示器）")
+    else:
+        report('first frame', elapsed)
+
+    if failures:
+        print("失败: " + ", ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
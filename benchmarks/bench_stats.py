@@ -0,0 +1,88 @@
+"""统计累加器基准测试
+
+运行: python -m benchmarks.bench_stats
+
+对比每次按键后「重新构建统计字典」（原实现）与引擎实际路径「每次按键只累加，
+由调度器按帧取快照」的每秒按键处理数。引擎的按键路径上不取快照，
+「每键快照」一行只作为快照本身开销的参考。
+"""
+import time
+
+from core.StatsAccumulator import StatsAccumulator
+
+KEYSTROKES = 500_000
+
+
+def legacy_path(keystrokes:int) -> float:
+    """原实现：每次按键后重新计算并构建状态字典"""
+    correct_chars = error_counts = 0
+    start_time = time.time()
+
+    def calculate_statistic_info(position):
+        duration_time = time.time() - start_time
+        if duration_time > 0 and position > 0:
+            wpm = (correct_chars / 5) / (duration_time / 60)
+        else:
+            wpm = 0
+        accuracy = correct_chars / position * 100 if position > 0 else 0
+        return {'wpm': round(wpm, 1), 'accuracy': round(accuracy, 1)}
+
+    begin = time.perf_counter()
+    for position in range(1, keystrokes + 1):
+        if position % 13:
+            correct_chars += 1
+        else:
+            error_counts += 1
+        duration = time.time() - start_time
+        statistic_info = calculate_statistic_info(position)
+        status = {
+            'current_position': position,
+            'total_chars': keystrokes,
+            'progress': position / keystrokes * 100,
+            'correct_chars': correct_chars,
+            'error_counts': error_counts,
+            'duration_time': duration,
+            'wpm': statistic_info['wpm'],
+            'accuracy': statistic_info['accuracy']
+        }
+    return keystrokes / (time.perf_counter() - begin)
+
+
+def per_key_snapshot_path(keystrokes:int) -> float:
+    """参考：增量累加，每次按键都取一次快照（引擎不这样使用）"""
+    stats = StatsAccumulator()
+    start_time = time.perf_counter_ns()
+
+    begin = time.perf_counter()
+    for position in range(1, keystrokes + 1):
+        now = time.perf_counter_ns()
+        stats.record(position % 13 != 0, now)
+        snapshot = stats.snapshot(now - start_time)
+    return keystrokes / (time.perf_counter() - begin)
+
+
+def framed_path(keystrokes:int, keys_per_frame:int = 100) -> float:
+    """引擎实际路径：每次按键只累加，快照由调度器按帧获取"""
+    stats = StatsAccumulator()
+    start_time = time.perf_counter_ns()
+
+    begin = time.perf_counter()
+    for position in range(1, keystrokes + 1):
+        now = time.perf_counter_ns()
+        stats.record(position % 13 != 0, now)
+        if position % keys_per_frame == 0:
+            snapshot = stats.snapshot(now - start_time)
+    return keystrokes / (time.perf_counter() - begin)
+
+
+def main() -> None:
+    legacy = legacy_path(KEYSTROKES)
+    framed = framed_path(KEYSTROKES)
+    per_key = per_key_snapshot_path(KEYSTROKES)
+    print(f"字典重建(原实现):       {legacy:>12,.0f} 次按键/秒")
+    print(f"累加器(按帧快照,引擎):  {framed:>12,.0f} 次按键/秒  ({framed / legacy:.2f}x)")
+    print(f"参考: 累加器(每键快照): {per_key:>12,.0f} 次按键/秒  ({per_key / legacy:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
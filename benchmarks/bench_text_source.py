@@ -0,0 +1,85 @@
+"""文本来源基准测试
+
+运行: python -m benchmarks.bench_text_source [大小MB]
+
+生成一个 UTF-8 大文件（默认 200 MB），分别测量 MmapTextSource 的打开耗时、
+开始会话、首次按键与首次推送状态的耗时、顺序输入的单次耗时，
+以及与整体读入内存相比的内存增量。
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from core.TextSource import MmapTextSource
+from core.TypingEngine import TypingEngine
+from core.StatusScheduler import StatusScheduler
+
+LINE = "敏捷的棕色狐狸跳过了懒狗。The quick brown fox jumps over the lazy dog.\n"
+
+
+def build_file(size_mb:int) -> str:
+    handle, path = tempfile.mkstemp(suffix='.txt')
+    block = (LINE * 1000).encode('utf-8')
+    with os.fdopen(handle, 'wb') as file:
+        for _ in range(size_mb * 1024 * 1024 // len(block)):
+            file.write(block)
+    return path
+
+
+def main() -> None:
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    path = build_file(size_mb)
+    try:
+        start = time.perf_counter()
+        source = MmapTextSource(path)
+        engine = TypingEngine(StatusScheduler())
+        engine.status_update = lambda status: None
+        engine.load_text(source)
+        opened = time.perf_counter()
+        engine.start_session()
+        started = time.perf_counter()
+        engine.process_input(LINE[0])
+        first_key = time.perf_counter()
+        engine.push_status()
+        first_status = time.perf_counter()
+
+        keys = 100_000
+        for char in (LINE * (keys // len(LINE) + 1))[1:keys]:
+            engine.process_input(char)
+        typed = time.perf_counter()
+        engine.end_session()
+        source.close()
+
+        # 单独测量内存（tracemalloc 会显著拖慢上面的计时）
+        tracemalloc.start()
+        with MmapTextSource(path) as source:
+            for index in range(0, keys * 10, 7):
+                source[index]
+            _, mmap_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        start_read = time.perf_counter()
+        with open(path, encoding='utf-8') as file:
+            text = file.read()
+        read_time = time.perf_counter() - start_read
+        _, read_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del text
+
+        print(f"文件大小: {size_mb} MB")
+        print(f"MmapTextSource 打开:  {(opened - start) * 1000:>10.3f} ms")
+        print(f"开始会话:             {(started - opened) * 1000:>10.3f} ms")
+        print(f"首次按键:             {(first_key - started) * 1000:>10.3f} ms")
+        print(f"首次推送状态:         {(first_status - first_key) * 1000:>10.3f} ms")
+        print(f"顺序输入:             {(typed - first_status) / (keys - 1) * 1e9:>10.1f} ns/键")
+        print(f"内存峰值(mmap):       {mmap_peak / 1024 / 1024:>10.2f} MB")
+        print(f"整体读入: {read_time * 1000:.1f} ms, 内存峰值 {read_peak / 1024 / 1024:.1f} MB")
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""虚拟化视口基准测试
+
+运行: python -m benchmarks.bench_viewport
+
+在 10 MB 文本上测量首帧时间（生成首屏文本与着色区间），
+并与一次性对全文折行的方式对比。有图形环境时还会测量 Tk 控件的首帧。
+"""
+import os
+import sys
+import textwrap
+import time
+
+from ui.components import DiffRenderer, TextViewport
+
+TEXT_SIZE = 10 * 1024 * 1024
+
+
+def build_text() -> str:
+    paragraph = textwrap.fill("The quick brown fox jumps over the lazy dog. " * 40, 120)
+    text = (paragraph + "\n\n") * (TEXT_SIZE // (len(paragraph) + 2) + 1)
+    return text[:TEXT_SIZE]
+
+
+def first_frame(text:str, position:int) -> float:
+    start = time.perf_counter()
+    viewport = TextViewport(text, rows=30, columns=100)
+    renderer = DiffRenderer(len(text))
+    window_start, content = viewport.materialize(position)
+    renderer.segments_between(window_start, window_start + len(content))
+    return time.perf_counter() - start
+
+
+def full_wrap(text:str) -> float:
+    start = time.perf_counter()
+    rows = []
+    for line in text.split("\n"):
+        rows.extend(line[i:i + 100] for i in range(0, max(len(line), 1), 100))
+    return time.perf_counter() - start
+
+
+def tk_first_frame(text:str) -> float:
+    import tkinter as tk
+    from ui.components import VirtualTextView
+
+    start = time.perf_counter()
+    root = tk.Tk()
+    view = VirtualTextView(root, TextViewport(text, rows=30, columns=100), DiffRenderer(len(text)))
+    view.widget.pack()
+    root.update()
+    elapsed = time.perf_counter() - start
+    root.destroy()
+    return elapsed
+
+
+def main() -> None:
+    text = build_text()
+    print(f"文本大小: {len(text) / 1024 / 1024:.1f} MB")
+    print(f"视口首帧（开头）:   {first_frame(text, 0) * 1000:>10.3f} ms")
+    print(f"视口首帧（中间）:   {first_frame(text, len(text) // 2) * 1000:>10.3f} ms")
+    print(f"全文折行:           {full_wrap(text) * 1000:>10.3f} ms")
+    if os.environ.get('DISPLAY') or sys.platform in ('win32', 'darwin'):
+        print(f"Tk 控件首帧:        {tk_first_frame(text) * 1000:>10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""记单词调度基准测试
+
+运行: python -m benchmarks.bench_vocabulary_review
+
+向临时数据库导入 10 万个单词（单个事务），随后模拟多轮复习，
+测量每次取卡与记录结果的耗时，并确认取卡查询走 idx_cards_due 索引。
+"""
+import os
+import random
+import tempfile
+import time
+
+from core.DatabaseManager import DatabaseManger
+from core.VocabularyReview import ReviewScheduler, DAY
+
+WORDS = 100_000
+REVIEWS = 20_000
+
+
+def main() -> None:
+    database = DatabaseManger(os.path.join(tempfile.mkdtemp(), "bench.db"))
+    scheduler = ReviewScheduler(database, 1, "bench")
+    rng = random.Random(5)
+
+    start = time.perf_counter()
+    scheduler.import_words(((f"word{i}", f"meaning {i}") for i in range(WORDS)), now=0)
+    imported = time.perf_counter() - start
+    print(f"导入 {WORDS:,} 个单词: {imported * 1000:.0f} ms")
+
+    plan = database.query('''
+        EXPLAIN QUERY PLAN SELECT id FROM cards WHERE user_id = 1 AND deck = 'bench'
+        AND (next_due, id) > (0, 0) ORDER BY next_due, id LIMIT 10
+    ''')
+    print("取卡查询计划:", "; ".join(row[-1] for row in plan))
+
+    picks = []
+    answers = []
+    now = 0
+    counter = time.perf_counter_ns
+    for _ in range(REVIEWS):
+        begin = counter()
+        card = scheduler.next_card(now)
+        picked = counter()
+        if card is None:
+            now += DAY
+            continue
+        scheduler.answer(card, rng.choice((1, 3, 4, 5, 5)), now)
+        answers.append(counter() - picked)
+        picks.append(picked - begin)
+
+    for label, samples in (("取卡", picks), ("记录结果", answers)):
+        samples.sort()
+        print(
+            f"{label}: p50 {samples[len(samples) // 2] / 1000:.1f} µs, "
+            f"p99 {samples[len(samples) * 99 // 100] / 1000:.1f} µs"
+        )
+    database.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""异步会话接口负载测试
+
+运行: python -m benchmarks.loadtest_async_server [会话数] [秒数]
+
+在本机回环地址上启动一个简单的 TCP 练习服务器（每行一条命令）：
+    OPEN <用户编号>    开始会话，之后服务器持续推送 JSON 状态行
+    K <字符>           输入一个字符
+    B                  退格
+    END                结束会话，服务器回复最终统计后关闭连接
+客户端在另一个进程中以每人每秒 10 次按键模拟学生输入，
+报告服务器处理的按键数、推送的状态数、服务器进程的 CPU 占用与事件循环延迟。
+（单核机器上客户端进程与服务器争用同一个 CPU，延迟数据会偏高。）
+"""
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+from core.AsyncEngine import AsyncDatabase, AsyncEngineHost
+from core.SessionWriter import SessionWriter
+
+TEXT = " ".join(["server", "socket", "classroom", "leaderboard", "typing", "lesson"] * 100)
+KEYS_PER_SECOND = 10
+
+
+async def handle(host:AsyncEngineHost, reader, writer) -> None:
+    """服务器端：处理一个客户端连接"""
+    session = None
+    forward = None
+
+    async def push_statuses():
+        async for status in session.statuses():
+            writer.write(b"S " + json.dumps(status).encode() + b"\n")
+
+    async for line in reader:
+        command = line.rstrip(b"\n")
+        if command.startswith(b"K "):
+            await session.feed(command[2:].decode())
+        elif command == b"B":
+            await session.backspace()
+        elif command.startswith(b"OPEN "):
+            session = await host.open(int(command[5:]), TEXT)
+            forward = asyncio.create_task(push_statuses())
+        elif command == b"END":
+            stats = await session.end(flush=False)
+            await forward
+            writer.write(b"E " + json.dumps(stats).encode() + b"\n")
+            break
+    await writer.drain()
+    writer.close()
+
+
+async def client(port:int, user_id:int, seconds:float, counters:dict) -> None:
+    """客户端：以固定节奏输入，同时读取服务器推送"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f"OPEN {user_id}\n".encode())
+    rng = random.Random(user_id)
+
+    async def receive():
+        async for line in reader:
+            if line.startswith(b"S "):
+                counters['statuses'] += 1
+            elif line.startswith(b"E "):
+                counters['sessions'] += 1
+    receiving = asyncio.create_task(receive())
+
+    await asyncio.sleep(rng.random() / KEYS_PER_SECOND)
+    deadline = time.perf_counter() + seconds
+    position = 0
+    while time.perf_counter() < deadline:
+        if rng.random() < 0.03:
+            writer.write(b"K #\nB\n")
+        else:
+            writer.write(f"K {TEXT[position]}\n".encode())
+            position += 1
+        counters['keys'] += 1
+        await asyncio.sleep(1 / KEYS_PER_SECOND * rng.uniform(0.5, 1.5))
+    writer.write(b"END\n")
+    await writer.drain()
+    await receiving
+    writer.close()
+
+
+async def run_clients(port:int, sessions:int, seconds:float) -> dict:
+    counters = {'keys': 0, 'statuses': 0, 'sessions': 0}
+    await asyncio.gather(*(client(port, i, seconds, counters) for i in range(1, sessions + 1)))
+    return counters
+
+
+def client_process(port:int, sessions:int, seconds:float, results) -> None:
+    """客户端进程入口"""
+    results.put(asyncio.run(run_clients(port, sessions, seconds)))
+
+
+async def monitor_lag(samples:list, stop:asyncio.Event) -> None:
+    """每 10ms 检查一次事件循环的调度延迟"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        samples.append(time.perf_counter() - start - 0.01)
+
+
+async def main(sessions:int, seconds:float) -> None:
+    database = await AsyncDatabase.open(os.path.join(tempfile.mkdtemp(), "loadtest.db"))
+    session_writer = SessionWriter(database.database)
+    host = AsyncEngineHost(session_writer)
+    server = await asyncio.start_server(
+        lambda reader, writer: handle(host, reader, writer), '127.0.0.1', 0, backlog=sessions
+    )
+    port = server.sockets[0].getsockname()[1]
+
+    lags = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(monitor_lag(lags, stop))
+    results = multiprocessing.Queue()
+    clients = multiprocessing.Process(target=client_process, args=(port, sessions, seconds, results))
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    clients.start()
+    loop = asyncio.get_running_loop()
+    counters = await loop.run_in_executor(None, results.get)
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+    clients.join()
+    stop.set()
+    await monitor
+
+    await host.flush()
+    saved = (await database.query("SELECT COUNT(*) FROM sessions"))[0][0]
+    server.close()
+    await server.wait_closed()
+    session_writer.close()
+    await database.close()
+
+    lags.sort()
+    print(f"{sessions} 个会话, 运行 {elapsed:.1f} 秒, 已保存会话 {saved}")
+    print(f"按键: {counters['keys']:,} 次 ({counters['keys'] / elapsed:,.0f} 次/秒)")
+    print(f"状态推送: {counters['statuses']:,} 条, 完成会话: {counters['sessions']}")
+    print(f"服务器 CPU 占用: {cpu / elapsed * 100:.1f}%")
+    print(f"事件循环延迟: p50 {lags[len(lags) // 2] * 1000:.2f} ms, p99 {lags[len(lags) * 99 // 100] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1000,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    ))
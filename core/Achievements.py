@@ -0,0 +1,235 @@
+import json
+import time
+from datetime import date
+
+from core.DatabaseManager import DatabaseManger
+
+
+class Rule:
+    """成就规则基类
+
+    规则声明所依赖的统计字段（inputs），这些字段缺失或为 None 时不计算。
+    规则的状态是可 JSON 序列化的小字典，大小与历史会话数无关，
+    每次更新 O(1)，保存在 achievements.state 中，启动时无需重新扫描历史。
+    无状态规则（initial() 为空字典）的结果只取决于本次的输入，
+    输入与上一次计算时相同则跳过。
+    """
+
+    inputs = ()
+
+    def __init__(self, code:str, title:str):
+        """初始化规则
+        Args:
+            code(str): 成就编号（achievements.code）
+            title(str): 成就名称
+        """
+        self.code = code
+        self.title = title
+
+    def initial(self) -> dict:
+        """初始状态"""
+        return {}
+
+    def update(self, state:dict, stats:dict) -> bool:
+        """用一次会话的统计更新状态
+        Args:
+            state(dict): 规则状态（原地修改）
+            stats(dict): TypingEngine.get_stats() 的结果
+        Returns:
+            is_unlocked(bool): 是否达成
+        """
+        raise NotImplementedError
+
+
+class ThresholdRule(Rule):
+    """单次会话达标：所有字段都不低于给定值（例如 WPM >= 60 且准确率 >= 95）"""
+
+    def __init__(self, code:str, title:str, **minimums):
+        super().__init__(code, title)
+        self.minimums = minimums
+        self.inputs = tuple(minimums)
+
+    def update(self, state:dict, stats:dict) -> bool:
+        return all((stats.get(field) or 0) >= minimum for field, minimum in self.minimums.items())
+
+
+class CumulativeRule(Rule):
+    """累计达标：某个字段在所有会话中的总和达到目标（例如累计输入 100000 字符）"""
+
+    def __init__(self, code:str, title:str, field:str, target:float):
+        super().__init__(code, title)
+        self.field = field
+        self.target = target
+        self.inputs = (field,)
+
+    def initial(self) -> dict:
+        return {'total': 0}
+
+    def update(self, state:dict, stats:dict) -> bool:
+        state['total'] += stats.get(self.field) or 0
+        return state['total'] >= self.target
+
+
+class StreakRule(Rule):
+    """连续练习天数（按会话开始时间的本地日期）"""
+
+    inputs = ('start_time',)
+
+    def __init__(self, code:str, title:str, days:int):
+        super().__init__(code, title)
+        self.days = days
+
+    def initial(self) -> dict:
+        return {'last_day': None, 'streak': 0}
+
+    def update(self, state:dict, stats:dict) -> bool:
+        day = date.fromtimestamp(stats['start_time']).toordinal()
+        last_day = state['last_day']
+        if last_day is None or day > last_day + 1:
+            state['streak'] = 1
+        elif day == last_day + 1:
+            state['streak'] += 1
+        if last_day is None or day > last_day:
+            state['last_day'] = day
+        return state['streak'] >= self.days
+
+
+class BestAverageRule(Rule):
+    """连续 N 次会话的平均值达标（例如连续 5 次会话平均 WPM >= 50）
+
+    状态只保存最近 N 个取值与其总和，每次更新 O(1)（N 固定）。
+    """
+
+    def __init__(self, code:str, title:str, field:str, sessions:int, target:float):
+        super().__init__(code, title)
+        self.field = field
+        self.sessions = sessions
+        self.target = target
+        self.inputs = (field,)
+
+    def initial(self) -> dict:
+        return {'recent': [], 'sum': 0, 'best': 0}
+
+    def update(self, state:dict, stats:dict) -> bool:
+        value = stats.get(self.field) or 0
+        recent = state['recent']
+        recent.append(value)
+        state['sum'] += value
+        if len(recent) > self.sessions:
+            state['sum'] -= recent.pop(0)
+        if len(recent) == self.sessions:
+            state['best'] = max(state['best'], state['sum'] / self.sessions)
+        return state['best'] >= self.target
+
+
+# 默认成就
+DEFAULT_RULES = (
+    ThresholdRule('first_session', "初次练习", typed_chars=1),
+    ThresholdRule('speed_40', "速度 40 WPM", wpm=40),
+    ThresholdRule('speed_60', "速度 60 WPM", wpm=60),
+    ThresholdRule('speed_80', "速度 80 WPM", wpm=80),
+    ThresholdRule('perfect_100', "百字无误", typed_chars=100, accuracy=100),
+    CumulativeRule('chars_10k', "累计一万字符", 'typed_chars', 10_000),
+    CumulativeRule('chars_100k', "累计十万字符", 'typed_chars', 100_000),
+    CumulativeRule('chars_1m', "累计百万字符", 'typed_chars', 1_000_000),
+    CumulativeRule('time_10h', "累计练习十小时", 'duration_time', 10 * 3600),
+    StreakRule('streak_7', "连续练习七天", 7),
+    StreakRule('streak_30', "连续练习三十天", 30),
+    BestAverageRule('steady_50', "连续五次平均 50 WPM", 'wpm', 5, 50),
+    BestAverageRule('steady_95', "连续十次平均准确率 95%", 'accuracy', 10, 95),
+)
+
+
+class AchievementEngine:
+    """增量成就计算
+
+    启动时读取一次 achievements 表中各规则的状态；每次会话结束时只计算尚未达成、
+    依赖字段都有取值、且（无状态规则）输入与上次计算时不同的规则，
+    并在一个事务中只写回状态实际发生变化或新达成的规则。
+    计算量只与规则数有关，与历史会话数无关。
+    """
+
+    UPSERT = '''
+        INSERT INTO achievements (user_id, code, state, unlocked_at) VALUES (?, ?, ?, ?)
+        ON CONFLICT (user_id, code) DO UPDATE SET
+            state = excluded.state,
+            unlocked_at = COALESCE(achievements.unlocked_at, excluded.unlocked_at)
+    '''
+
+    def __init__(self, database:DatabaseManger, user_id:int = None, rules = DEFAULT_RULES):
+        """初始化成就计算
+        Args:
+            database(DatabaseManger): 数据库管理器
+            user_id(int): 用户编号
+            rules(iterable): 成就规则
+        """
+        self.database = database
+        self.user_id = user_id or 0
+        self.rules = {rule.code: rule for rule in rules}
+        # 无状态规则上一次计算时的输入：编号 -> 依赖字段的取值
+        self.last_inputs = {}
+        # 已保存的状态：编号 -> JSON，状态没有变化时不再写回
+        self.saved = {}
+
+        self.states = {code: rule.initial() for code, rule in self.rules.items()}
+        self.unlocked = {}
+        for code, state, unlocked_at in database.query(
+            "SELECT code, state, unlocked_at FROM achievements WHERE user_id = ?", (self.user_id,)
+        ):
+            if code not in self.rules:
+                continue
+            if state is not None:
+                self.states[code] = json.loads(state)
+                self.saved[code] = state
+            if unlocked_at is not None:
+                self.unlocked[code] = unlocked_at
+
+    def is_unlocked(self, code:str) -> bool:
+        return code in self.unlocked
+
+    def progress(self) -> list:
+        """各成就的达成情况
+        Returns:
+            progress(list): [(code, title, unlocked_at, state)]，未达成时 unlocked_at 为 None
+        """
+        return [
+            (code, rule.title, self.unlocked.get(code), self.states[code])
+            for code, rule in self.rules.items()
+        ]
+
+    def record(self, stats:dict) -> list:
+        """用一次会话的统计更新成就
+        Args:
+            stats(dict): TypingEngine.get_stats() 的结果
+        Returns:
+            unlocked(list): 本次新达成的成就编号
+        """
+        unlocked_at = stats.get('end_time') or time.time()
+        newly_unlocked = []
+        rows = []
+        for code, rule in self.rules.items():
+            if code in self.unlocked:
+                continue
+            inputs = tuple(stats.get(field) for field in rule.inputs)
+            if None in inputs:
+                continue
+            state = self.states[code]
+            if not state:
+                if self.last_inputs.get(code) == inputs:
+                    # 无状态规则的输入没有变化，结果与上次相同（未达成）
+                    continue
+                self.last_inputs[code] = inputs
+
+            is_unlocked = rule.update(state, stats)
+            saved = json.dumps(state) if state else None
+            if is_unlocked:
+                self.unlocked[code] = unlocked_at
+                newly_unlocked.append(code)
+            elif saved == self.saved.get(code):
+                # 未达成且状态没有变化（或无状态）时不需要保存
+                continue
+            self.saved[code] = saved
+            rows.append((self.user_id, code, saved, self.unlocked.get(code)))
+        if rows:
+            self.database.executemany(AchievementEngine.UPSERT, rows)
+        return newly_unlocked
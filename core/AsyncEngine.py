@@ -0,0 +1,255 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from core.DatabaseManager import DatabaseManger
+from core.EngineHost import EngineHost
+from core.StatusScheduler import StatusScheduler
+
+
+class AsyncDatabase:
+    """DatabaseManger 的异步封装
+
+    所有数据库调用都交给专用线程池执行，事件循环不会因磁盘 I/O 或写锁等待而阻塞。
+    DatabaseManger 为每个线程维护自己的连接，线程池中的线程同样各自复用连接。
+    """
+
+    def __init__(self, database:DatabaseManger, executor:ThreadPoolExecutor = None):
+        """初始化异步封装
+        Args:
+            database(DatabaseManger): 数据库管理器
+            executor(ThreadPoolExecutor): 执行数据库调用的线程池，默认新建单线程线程池
+        """
+        self.database = database
+        self.executor = executor or ThreadPoolExecutor(1, thread_name_prefix="AsyncDatabase")
+
+    @classmethod
+    async def open(cls, database_path:str = None) -> 'AsyncDatabase':
+        """在线程池中打开数据库（包括执行迁移）
+        Args:
+            database_path(str): 数据库文件路径
+        Returns:
+            database(AsyncDatabase): 异步封装
+        """
+        executor = ThreadPoolExecutor(1, thread_name_prefix="AsyncDatabase")
+        loop = asyncio.get_running_loop()
+        database = await loop.run_in_executor(executor, DatabaseManger, database_path)
+        return cls(database, executor)
+
+    async def run(self, function, *args, **kwargs):
+        """在线程池中执行任意调用"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(function, *args, **kwargs))
+
+    async def query(self, sql:str, parameters = ()) -> list:
+        """查询并返回全部结果"""
+        return await self.run(self.database.query, sql, parameters)
+
+    async def execute(self, sql:str, parameters = ()) -> int:
+        """执行一条语句
+        Returns:
+            rowcount(int): 受影响的行数
+        """
+        return await self.run(lambda: self.database.execute(sql, parameters).rowcount)
+
+    async def executemany(self, sql:str, seq_of_parameters) -> None:
+        """在一个事务中批量执行同一条语句"""
+        await self.run(self.database.executemany, sql, list(seq_of_parameters))
+
+    async def close(self) -> None:
+        """关闭所有连接并停止线程池"""
+        await self.run(self.database.close)
+        self.executor.shutdown(wait=False)
+
+
+class StatusStream:
+    """会话状态的异步迭代器
+
+    只保留最新一次状态：消费者跟不上推送速度时直接跳到最新状态，
+    内存占用不随积压增长。会话结束后，取完最后一次状态即停止迭代。
+    """
+
+    __slots__ = ('latest', 'event', 'closed')
+
+    def __init__(self):
+        self.latest = None
+        self.event = asyncio.Event()
+        self.closed = False
+
+    def push(self, status:dict) -> None:
+        self.latest = status
+        self.event.set()
+
+    def close(self) -> None:
+        self.closed = True
+        self.event.set()
+
+    def __aiter__(self) -> 'StatusStream':
+        return self
+
+    async def __anext__(self) -> dict:
+        while self.latest is None:
+            if self.closed:
+                raise StopAsyncIteration
+            self.event.clear()
+            await self.event.wait()
+        status, self.latest = self.latest, None
+        return status
+
+
+class AsyncSession:
+    """单个练习会话的异步接口"""
+
+    # 大段输入每处理这么多字符让出一次事件循环
+    CHUNK = 4096
+
+    def __init__(self, host:'AsyncEngineHost', key, engine):
+        self.host = host
+        self.key = key
+        self.engine = engine
+        self.streams = []
+        self.loop = asyncio.get_running_loop()
+        engine.status_update = self._push
+
+    def _push(self, status:dict) -> None:
+        if not _in_loop(self.loop):
+            # 在线程池中结束会话时推送的最终状态，转交事件循环线程
+            self.loop.call_soon_threadsafe(self._push, status)
+            return
+        for stream in self.streams:
+            stream.push(status)
+
+    def statuses(self) -> StatusStream:
+        """订阅状态推送
+        Returns:
+            stream(StatusStream): async for 迭代得到状态字典
+        """
+        stream = StatusStream()
+        if self.engine.is_completed:
+            stream.push(self.engine.get_current_status())
+            stream.close()
+        else:
+            self.streams.append(stream)
+        return stream
+
+    async def feed(self, chars:str, timestamps = None) -> int:
+        """输入字符
+        Args:
+            chars(str): 输入的字符
+            timestamps(list): 每个字符的按键时刻（纳秒），为空时取当前时间
+        Returns:
+            count(int): 实际处理的字符数
+        """
+        if len(chars) <= AsyncSession.CHUNK:
+            return self.host.host.feed(self.key, chars, timestamps)
+        count = 0
+        for start in range(0, len(chars), AsyncSession.CHUNK):
+            end = start + AsyncSession.CHUNK
+            count += self.host.host.feed(
+                self.key, chars[start:end], None if timestamps is None else timestamps[start:end]
+            )
+            await asyncio.sleep(0)
+        return count
+
+    async def backspace(self) -> bool:
+        return self.engine.backspace()
+
+    async def pause(self) -> None:
+        self.engine.pause_session()
+
+    async def resume(self) -> None:
+        self.engine.resume_session()
+
+    async def end(self, flush:bool = True) -> dict:
+        """结束会话并返回统计信息
+        Args:
+            flush(bool): 是否等待练习数据写入数据库（在线程池中等待，不阻塞事件循环）
+        Returns:
+            stats(dict): TypingEngine.get_stats() 的结果
+        """
+        # 保存会话汇总时写入队列可能已满，在线程池中结束会话
+        stats = await self.host.run(self.host.host.close, self.key)
+        for stream in self.streams:
+            stream.close()
+        self.streams.clear()
+        self.host.sessions.pop(self.key, None)
+        if flush:
+            await self.host.flush()
+        return stats
+
+
+class AsyncEngineHost:
+    """在一个事件循环中托管大量练习会话
+
+    状态推送由事件循环的 call_later 驱动（不启动调度线程），
+    所有会话方法都应在该事件循环中调用。
+    开始、结束会话中可能等待写入线程的部分交给专用线程池执行，不阻塞事件循环。
+    """
+
+    def __init__(
+        self,
+        writer = None,
+        frame_interval:float = StatusScheduler.DEFAULT_FRAME_INTERVAL,
+        executor:ThreadPoolExecutor = None
+    ):
+        """初始化宿主（需在事件循环中调用）
+        Args:
+            writer(SessionWriter): 共享的练习数据写入器，为空时不保存练习数据
+            frame_interval(float): 状态推送的帧间隔（秒）
+            executor(ThreadPoolExecutor): 执行阻塞调用的线程池，默认新建单线程线程池
+        """
+        scheduler = StatusScheduler(frame_interval)
+        scheduler.attach_loop(asyncio.get_running_loop())
+        self.host = EngineHost(writer, scheduler)
+        self.sessions = {}
+        self.executor = executor or ThreadPoolExecutor(1, thread_name_prefix="AsyncEngineHost")
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    async def open(self, key, text:str, user_id:int = None) -> AsyncSession:
+        """开始一个会话
+        会话编号在线程池中分配，引擎在事件循环中创建并注册到调度器。
+        Args:
+            key(hashable): 会话标识
+            text(str): 练习文本
+            user_id(int): 用户编号，默认与 key 相同
+        Returns:
+            session(AsyncSession): 会话
+        """
+        writer = self.host.writer
+        session_id = None if writer is None else await self.run(writer.new_session_id)
+        engine = self.host.open(key, text, user_id, session_id=session_id)
+        session = self.sessions[key] = AsyncSession(self, key, engine)
+        return session
+
+    def get(self, key) -> AsyncSession:
+        return self.sessions[key]
+
+    async def run(self, function, *args, **kwargs):
+        """在线程池中执行阻塞调用"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(function, *args, **kwargs))
+
+    async def flush(self) -> None:
+        """等待此前的练习数据写入数据库（不阻塞事件循环）"""
+        writer = self.host.writer
+        if writer is not None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, partial(writer.flush, durable=False))
+
+    async def close_all(self) -> None:
+        """结束所有会话，最后统一等待一次写入，解除调度器与事件循环的绑定并停止线程池"""
+        for session in list(self.sessions.values()):
+            await session.end(flush=False)
+        await self.flush()
+        self.host.scheduler.detach()
+        self.executor.shutdown(wait=False)
+
+
+def _in_loop(loop) -> bool:
+    """当前线程是否正在运行 loop"""
+    try:
+        return asyncio.get_running_loop() is loop
+    except RuntimeError:
+        return False
@@ -0,0 +1,197 @@
+import threading
+from bisect import bisect_left
+
+from core.Clock import NS_PER_SECOND
+from core.DeadlineScheduler import DeadlineScheduler
+
+# 不设上限时使用的位置与时刻
+_UNLIMITED = float('inf')
+
+
+class Challenge:
+    """挑战模式基类
+
+    由引擎在每次输入前调用 admit() 截掉不计入的输入，输入后调用 advance() 检查是否结束，
+    两者都只比较预先算好的检查点，每次按键 O(1)。
+    挑战进行中，引擎的输入与会话控制都持有 lock，定时回调也只在持有 lock 时操作引擎。
+    """
+
+    def __init__(self, engine):
+        """初始化挑战
+        Args:
+            engine(TypingEngine): 打字引擎（需已加载文本）
+        """
+        self.engine = engine
+        # 输入位置达到 checkpoint 时由 advance() 处理（结束或延长文本）
+        self.checkpoint = _UNLIMITED
+        # 最多计入的输入位置
+        self.quota = _UNLIMITED
+        # 截止时刻（时钟读数），之后的按键不计入
+        self.deadline = _UNLIMITED
+        self.is_expired = False
+        # 与引擎的输入处理互斥（可重入：输入处理中可能结束会话）
+        self.lock = threading.RLock()
+
+    def start(self) -> None:
+        """开始挑战（开始引擎会话）"""
+        self.engine.start_session()
+        self.engine.challenge = self
+
+    def finish(self, end_time:int = None) -> None:
+        """结束挑战（之后的输入由 admit() 拒绝）
+        Args:
+            end_time(int): 结束时刻（纳秒），为空时取当前时间
+        """
+        # 会话结束后到达的输入（即使按键时刻在截止之前）也不再计入
+        self.quota = min(self.quota, self.engine.current_position)
+        if self.engine.is_active:
+            self.engine.end_session(end_time=end_time)
+
+    def resume(self) -> None:
+        """引擎从暂停中恢复"""
+
+    # ----------- 引擎回调 ----------- #
+
+    def admit(self, position:int, timestamps, count:int) -> int:
+        """计算一批输入中计入的字符数
+        Args:
+            position(int): 输入前的位置
+            timestamps(sequence): 各字符的按键时刻（非递减）
+            count(int): 输入的字符数
+        Returns:
+            count(int): 计入的字符数
+        """
+        if position + count > self.quota:
+            count = max(0, self.quota - position)
+        if count and timestamps[count - 1] >= self.deadline:
+            count = bisect_left(timestamps, self.deadline, 0, count)
+            self.is_expired = True
+        return count
+
+    def advance(self, position:int, timestamp:int) -> None:
+        """一批输入处理完成
+        Args:
+            position(int): 输入后的位置
+            timestamp(int): 最后一个计入字符的按键时刻，没有计入的字符时为空
+        """
+        if self.is_expired:
+            self.finish(self.deadline)
+        elif position >= self.checkpoint:
+            self.reach(position, timestamp)
+
+    def reach(self, position:int, timestamp:int) -> None:
+        """输入位置达到检查点"""
+
+
+class TimedChallenge(Challenge):
+    """定时挑战
+
+    在限定时间内尽可能多地输入。截止时刻由 DeadlineScheduler 在到期时唤醒执行，
+    会话的结束时刻记为截止时刻本身，截止之后才处理的按键按其捕获时刻判断、不计入，
+    因此结果（时长、WPM）精确到毫秒以内，与调度线程的唤醒延迟无关。
+    给出文本流时，剩余文本不足 LOOKAHEAD 个字符就从文本流追加，文本不会用完。
+    """
+
+    LOOKAHEAD = 512
+
+    def __init__(self, engine, seconds:float, stream = None, scheduler:DeadlineScheduler = None):
+        """初始化定时挑战
+        Args:
+            engine(TypingEngine): 打字引擎
+            seconds(float): 限定时间（秒）
+            stream(iterable): 文本流，依次给出追加的文本片段，为空时只使用已加载的文本
+            scheduler(DeadlineScheduler): 截止时刻调度器，默认使用全局共享调度器
+        """
+        super().__init__(engine)
+        self.limit = round(seconds * NS_PER_SECOND)
+        self.stream = iter(stream) if stream is not None else None
+        self.scheduler = scheduler if scheduler is not None else DeadlineScheduler.shared()
+        self.handle = None
+
+    def start(self) -> None:
+        if self.stream is not None:
+            self._extend(0)
+        super().start()
+        self._schedule()
+
+    def _schedule(self) -> None:
+        self.deadline = self.engine.start_time + self.limit
+        self.handle = self.scheduler.schedule(self.deadline, self.expire)
+
+    def expire(self) -> None:
+        """截止时刻到达（由调度器在调度线程或外部定时器所在线程中调用）"""
+        with self.lock:
+            engine = self.engine
+            if not engine.is_active or engine.clock() < engine.start_time + self.limit:
+                # 已暂停（恢复时重新调度），或暂停后恢复过、截止时刻已推后（已重新调度）
+                return
+            self.handle = None
+            self.is_expired = True
+            self.finish(self.deadline)
+
+    def resume(self) -> None:
+        if self.handle is not None:
+            self.scheduler.cancel(self.handle)
+        self._schedule()
+
+    def finish(self, end_time:int = None) -> None:
+        if self.handle is not None:
+            self.scheduler.cancel(self.handle)
+            self.handle = None
+        super().finish(end_time)
+
+    def reach(self, position:int, timestamp:int) -> None:
+        self._extend(position)
+
+    def _extend(self, position:int) -> None:
+        """从文本流追加文本，直到剩余文本不少于 LOOKAHEAD 个字符"""
+        engine = self.engine
+        while len(engine.text) - position < TimedChallenge.LOOKAHEAD:
+            chunk = next(self.stream, None)
+            if chunk is None:
+                self.checkpoint = _UNLIMITED
+                return
+            if engine.text and not engine.text[-1].isspace() and not chunk[0].isspace():
+                chunk = " " + chunk
+            engine.extend_text(chunk)
+        self.checkpoint = len(engine.text) - TimedChallenge.LOOKAHEAD
+
+
+class QuotaChallenge(Challenge):
+    """定量挑战
+
+    输入满指定的字符数（或单词数）即结束，结束时刻为最后一个计入字符的按键时刻。
+    单词数在开始前换算为文本位置，之后每次按键只比较一次位置。
+    """
+
+    def __init__(self, engine, chars:int = None, words:int = None):
+        """初始化定量挑战（chars 与 words 二选一，都为空时为整篇文本）
+        Args:
+            engine(TypingEngine): 打字引擎
+            chars(int): 字符数
+            words(int): 单词数
+        """
+        super().__init__(engine)
+        text = engine.text
+        if words is not None:
+            chars = _word_end(text, words)
+        if chars is None or chars > len(text):
+            chars = len(text)
+        self.quota = self.checkpoint = chars
+
+    def reach(self, position:int, timestamp:int) -> None:
+        self.finish(timestamp)
+
+
+def _word_end(text:str, words:int) -> int:
+    """文本中第 words 个单词结束的位置（不足时为文本长度）"""
+    position = 0
+    length = len(text)
+    for _ in range(words):
+        while position < length and text[position].isspace():
+            position += 1
+        if position >= length:
+            break
+        while position < length and not text[position].isspace():
+            position += 1
+    return position
@@ -0,0 +1,62 @@
+import time
+
+# 引擎内部的时间单位：整数纳秒
+NS_PER_SECOND = 1_000_000_000
+
+
+class MonotonicClock:
+    """单调时钟（默认）
+
+    基于 perf_counter_ns()，不受系统时间调整与休眠唤醒的影响，
+    与键盘监听线程捕获按键时使用的时间戳处于同一时间轴。
+    """
+
+    __slots__ = ('epoch_offset',)
+
+    def __init__(self):
+        # 单调时间 + epoch_offset = Unix 时间（纳秒），用于保存到数据库
+        self.epoch_offset = time.time_ns() - time.perf_counter_ns()
+
+    def __call__(self) -> int:
+        """当前时间（纳秒）"""
+        return time.perf_counter_ns()
+
+    def to_epoch(self, timestamp:int) -> float:
+        """把时钟读数换算为 Unix 时间（秒）"""
+        return (timestamp + self.epoch_offset) / NS_PER_SECOND
+
+
+class VirtualClock:
+    """虚拟时钟：返回手动设置的时间，用于测试与回放
+
+    读数本身即视为 Unix 时间（纳秒），推进时间不需要真正等待。
+    """
+
+    __slots__ = ('now',)
+
+    epoch_offset = 0
+
+    def __init__(self, now:int = 0):
+        """初始化虚拟时钟
+        Args:
+            now(int): 初始时间（纳秒）
+        """
+        self.now = now
+
+    def __call__(self) -> int:
+        """当前时间（纳秒）"""
+        return self.now
+
+    def advance(self, nanoseconds:int) -> int:
+        """推进时间
+        Args:
+            nanoseconds(int): 推进的纳秒数
+        Returns:
+            now(int): 推进后的时间（纳秒）
+        """
+        self.now += nanoseconds
+        return self.now
+
+    def to_epoch(self, timestamp:int) -> float:
+        """把时钟读数换算为 Unix 时间（秒）"""
+        return timestamp / NS_PER_SECOND
@@ -0,0 +1,299 @@
+import hashlib
+import marshal
+import os
+from array import array
+from bisect import bisect_right
+from collections import Counter
+
+# 行首缩进与行尾空白
+_INDENT = ' \t'
+
+
+def token_class(token_type) -> str:
+    """把 Pygments 的记号类型归并为统计用的类别
+    例如 Token.Keyword.Namespace -> 'Keyword'，Token.Literal.String.Double -> 'String'
+    """
+    parts = str(token_type).split('.')[1:]
+    if not parts:
+        return 'Text'
+    if parts[0] == 'Literal' and len(parts) > 1:
+        return parts[1]
+    return parts[0]
+
+
+class TokenCache:
+    """记号流的磁盘缓存
+
+    以「源代码内容 + 词法分析器 + 处理选项」的哈希为键，每个文件一条缓存，
+    相同的代码（无论文件名）只分析一次。
+    """
+
+    CACHE_VERSION = 2
+    CACHE_DIR = '.token_cache'
+    # 缓存文件头：格式标识与版本号
+    CACHE_HEADER = b'JTTOKENS%d\n' % CACHE_VERSION
+
+    def __init__(self, cache_dir:str = None):
+        """初始化缓存
+        Args:
+            cache_dir(str): 缓存目录，默认为 CACHE_DIR
+        """
+        self.cache_dir = cache_dir or TokenCache.CACHE_DIR
+
+    @staticmethod
+    def key(source:str, lexer:str, options:tuple) -> str:
+        digest = hashlib.sha1(source.encode('utf-8', 'surrogatepass'))
+        digest.update(repr((TokenCache.CACHE_VERSION, lexer, options)).encode())
+        return digest.hexdigest()
+
+    def _path(self, key:str) -> str:
+        return os.path.join(self.cache_dir, key + '.tokens')
+
+    def load(self, key:str) -> dict:
+        """读取缓存
+
+        缓存以 marshal 保存，只包含字符串、字节串与列表，读取后逐项校验
+        类型与范围，不会执行其中的任何内容。
+        Returns:
+            data(dict): 记号数据，不存在、已损坏或结构不对时返回 None
+        """
+        try:
+            with open(self._path(key), 'rb') as file:
+                if file.read(len(TokenCache.CACHE_HEADER)) != TokenCache.CACHE_HEADER:
+                    return None
+                lexer, text, starts, kinds, classes, indents = marshal.loads(file.read())
+            if not (
+                type(lexer) is str and type(text) is str
+                and type(classes) is list and all(type(name) is str for name in classes)
+                and type(indents) is list and all(type(indent) is str for indent in indents)
+            ):
+                return None
+            starts = array('I', starts)
+            kinds = array('B', kinds)
+            if len(starts) != len(kinds) or (kinds and max(kinds) >= len(classes)):
+                return None
+            if starts and max(starts) >= len(text):
+                return None
+        except Exception:
+            return None
+        return {
+            'lexer': lexer,
+            'text': text,
+            'starts': starts,
+            'kinds': kinds,
+            'classes': classes,
+            'indents': indents,
+        }
+
+    def save(self, key:str, data:dict) -> None:
+        """写入缓存（先写临时文件再替换，避免中断时损坏缓存）"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as file:
+            file.write(TokenCache.CACHE_HEADER)
+            file.write(marshal.dumps((
+                data['lexer'],
+                data['text'],
+                data['starts'].tobytes(),
+                data['kinds'].tobytes(),
+                data['classes'],
+                data['indents'],
+            )))
+        os.replace(temp_path, path)
+
+
+class CodeText:
+    """代码练习文本
+
+    用 Pygments 分析一次源代码，生成实际需要输入的文本（可跳过行首缩进、
+    去掉行尾空白并合并连续空行），同时记录每段记号的起始位置与类别。
+    按位置查找记号为对起始位置数组的二分查找（O(log n)），
+    因此大文件的语法着色与按记号类别统计错误都不需要重新分析。
+    """
+
+    def __init__(
+        self,
+        source:str,
+        filename:str = None,
+        skip_indent:bool = True,
+        collapse_newlines:bool = True,
+        cache:TokenCache = None
+    ):
+        """初始化代码文本
+        Args:
+            source(str): 源代码
+            filename(str): 文件名，用于选择词法分析器，为空时根据内容推测
+            skip_indent(bool): 是否跳过行首缩进（由编辑器自动缩进的部分不需要输入）
+            collapse_newlines(bool): 是否统一换行符并把连续空行合并为一个换行
+            cache(TokenCache): 记号缓存，为空时不缓存
+        """
+        source = source.replace('\r\n', '\n').replace('\r', '\n')
+        key = None
+        data = None
+        if cache is not None:
+            key = TokenCache.key(source, _lexer_name(filename), (skip_indent, collapse_newlines))
+            data = cache.load(key)
+        if data is None:
+            data = _build(source, filename, skip_indent, collapse_newlines)
+            if cache is not None:
+                cache.save(key, data)
+
+        self.lexer = data['lexer']
+        # 需要输入的文本
+        self.text = data['text']
+        # 每段记号的起始位置与类别编号（相邻同类记号已合并）
+        self.starts = data['starts']
+        self.kinds = data['kinds']
+        self.classes = data['classes']
+        # 每一行被跳过的缩进（供界面显示）
+        self.indents = data['indents']
+
+    @classmethod
+    def from_file(cls, path:str, cache:TokenCache = None, **options) -> 'CodeText':
+        """读取源代码文件"""
+        with open(path, encoding='utf-8') as file:
+            return cls(file.read(), os.path.basename(path), cache=cache, **options)
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    # ----------- 查询 ----------- #
+
+    def token_index(self, position:int) -> int:
+        """position 所在记号段的下标"""
+        return bisect_right(self.starts, position) - 1
+
+    def token_at(self, position:int) -> tuple:
+        """获取 position 所在的记号段
+        Args:
+            position(int): 文本位置
+        Returns:
+            (start, end, token_class)(tuple): 记号段的范围与类别
+        """
+        index = self.token_index(position)
+        end = self.starts[index + 1] if index + 1 < len(self.starts) else len(self.text)
+        return self.starts[index], end, self.classes[self.kinds[index]]
+
+    def tokens_between(self, start:int, end:int):
+        """依次生成与 [start, end) 相交的记号段 (start, end, token_class)，供可见区域着色"""
+        starts = self.starts
+        count = len(starts)
+        index = max(0, self.token_index(start))
+        while index < count and starts[index] < end:
+            token_end = starts[index + 1] if index + 1 < count else len(self.text)
+            yield max(start, starts[index]), min(end, token_end), self.classes[self.kinds[index]]
+            index += 1
+
+    def class_lengths(self) -> Counter:
+        """各记号类别的字符数"""
+        lengths = Counter()
+        ends = list(self.starts[1:]) + [len(self.text)]
+        for start, end, kind in zip(self.starts, ends, self.kinds):
+            lengths[self.classes[kind]] += end - start
+        return lengths
+
+    def error_stats(self, error_positions) -> dict:
+        """按记号类别统计错误
+        Args:
+            error_positions(iterable): 出错的位置（TypingEngine.error_positions）
+        Returns:
+            stats(dict): 类别 -> 出错次数
+        """
+        errors = Counter()
+        for position in error_positions:
+            errors[self.classes[self.kinds[self.token_index(position)]]] += 1
+        return dict(errors)
+
+
+# ----------- 辅助函数 ----------- #
+
+def _get_lexer(source:str, filename:str = None):
+    from pygments.lexers import get_lexer_for_filename, guess_lexer
+    from pygments.util import ClassNotFound
+
+    if filename:
+        try:
+            return get_lexer_for_filename(filename, source, stripnl=False, ensurenl=False)
+        except ClassNotFound:
+            pass
+    return guess_lexer(source, stripnl=False, ensurenl=False)
+
+
+def _lexer_name(filename:str = None) -> str:
+    """缓存键使用的分析器名称：有文件名时取扩展名，避免为计算缓存键而推测分析器"""
+    if filename:
+        return os.path.splitext(filename)[1].lower() or filename
+    return ''
+
+
+def _build(source:str, filename:str, skip_indent:bool, collapse_newlines:bool) -> dict:
+    """分析源代码并生成需要输入的文本与记号索引"""
+    lexer = _get_lexer(source, filename)
+
+    pieces = []
+    length = 0
+    starts = array('I')
+    kinds = array('B')
+    classes = []
+    class_ids = {}
+    indents = []
+
+    # 行首状态、本行已跳过的缩进、本行尚未输出的空白（行尾空白会被丢弃）、待输出的换行数
+    at_line_start = True
+    indent = ''
+    spaces = []
+    newlines = 0
+
+    def emit(value:str, name:str) -> None:
+        nonlocal length
+        kind = class_ids.get(name)
+        if kind is None:
+            kind = class_ids[name] = len(classes)
+            classes.append(name)
+        if not kinds or kinds[-1] != kind:
+            starts.append(length)
+            kinds.append(kind)
+        pieces.append(value)
+        length += len(value)
+
+    for token_type, value in lexer.get_tokens(source):
+        name = token_class(token_type)
+        lines = value.split('\n')
+        for number, content in enumerate(lines, 1):
+            if at_line_start and skip_indent:
+                stripped = content.lstrip(_INDENT)
+                indent += content[:len(content) - len(stripped)]
+                content = stripped
+            if content:
+                if not content.strip(_INDENT):
+                    spaces.append((content, name))
+                else:
+                    if newlines:
+                        emit('\n' if collapse_newlines else '\n' * newlines, 'Text')
+                        newlines = 0
+                    if at_line_start:
+                        indents.append(indent)
+                        at_line_start = False
+                    for space, space_name in spaces:
+                        emit(space, space_name)
+                    spaces = []
+                    emit(content, name)
+            if number < len(lines):
+                # 空行在 collapse_newlines 时不计入
+                if (not at_line_start or not collapse_newlines) and (length or newlines):
+                    newlines += 1
+                    if at_line_start:
+                        indents.append(indent)
+                at_line_start = True
+                indent = ''
+                spaces = []
+
+    return {
+        'lexer': lexer.name,
+        'text': "".join(pieces),
+        'starts': starts,
+        'kinds': kinds,
+        'classes': classes,
+        'indents': indents,
+    }
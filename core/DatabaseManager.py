@@ -1,36 +1,152 @@
-import os
 import sqlite3
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 
+from core.Migrations import MIGRATIONS, LATEST_VERSION
+
 class DatabaseManger:
     DATABASE_PATH = 'JTypewriterDB'
 
-    def __init__(self):
+    # 每个连接打开后执行的优化设置
+    PRAGMAS = (
+        "PRAGMA journal_mode = WAL",
+        "PRAGMA synchronous = NORMAL",
+        "PRAGMA cache_size = -8000",
+        "PRAGMA mmap_size = 67108864",
+        "PRAGMA temp_store = MEMORY",
+        "PRAGMA foreign_keys = ON",
+    )
+    # 写锁被占用时的等待时间（毫秒）
+    BUSY_TIMEOUT = 5000
+    # 每个连接缓存的预编译语句数量
+    CACHED_STATEMENTS = 256
+
+    def __init__(self, database_path:str = None):
+        """初始化数据库管理器
+        Args:
+            database_path(str): 数据库文件路径，默认为 DATABASE_PATH
+        """
+        self.database_path = database_path or DatabaseManger.DATABASE_PATH
+        # 每个线程复用自己的连接，键盘监听线程与计时线程互不干扰
+        self.local = threading.local()
+        self.connections = []
+        self.connections_lock = threading.Lock()
         self.init_db()
 
+    # ----------- 连接管理 ----------- #
+
     def get_connection(self) -> sqlite3.Connection:
-        """获取数据库连接"""
-        return sqlite3.connect(database=DatabaseManger.DATABASE_PATH)
-    
+        """获取当前线程的数据库连接（首次调用时创建并缓存）"""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = self.open_connection()
+            self.local.conn = conn
+            with self.connections_lock:
+                self.connections.append(conn)
+        return conn
+
+    def open_connection(self) -> sqlite3.Connection:
+        """创建一个新的数据库连接并应用优化设置"""
+        conn = sqlite3.connect(
+            database=self.database_path,
+            timeout=DatabaseManger.BUSY_TIMEOUT / 1000,
+            cached_statements=DatabaseManger.CACHED_STATEMENTS,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        for pragma in DatabaseManger.PRAGMAS:
+            conn.execute(pragma)
+        conn.execute(f"PRAGMA busy_timeout = {DatabaseManger.BUSY_TIMEOUT}")
+        return conn
+
+    def close(self) -> None:
+        """关闭所有线程的连接"""
+        with self.connections_lock:
+            connections, self.connections = self.connections, []
+        for conn in connections:
+            conn.close()
+        self.local = threading.local()
+
+    @contextmanager
+    def transaction(self):
+        """写事务：立即获取写锁，正常结束时提交，出错时回滚
+        Yields:
+            conn(sqlite3.Connection): 当前线程的连接
+        """
+        conn = self.get_connection()
+        if conn.in_transaction:
+            # 嵌套调用时并入外层事务
+            yield conn
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    # ----------- 语句执行 ----------- #
+
+    def execute(self, sql:str, parameters = ()) -> sqlite3.Cursor:
+        """在当前线程的连接上执行一条语句（复用预编译语句）
+        Args:
+            sql(str): SQL 语句
+            parameters(tuple | dict): 参数
+        Returns:
+            cursor(sqlite3.Cursor): 游标
+        """
+        return self.get_connection().execute(sql, parameters)
+
+    def executemany(self, sql:str, seq_of_parameters) -> None:
+        """在一个事务中批量执行同一条语句
+        Args:
+            sql(str): SQL 语句
+            seq_of_parameters(iterable): 参数序列
+        """
+        with self.transaction() as conn:
+            conn.executemany(sql, seq_of_parameters)
+
+    def query(self, sql:str, parameters = ()) -> list:
+        """查询并返回全部结果
+        Args:
+            sql(str): SQL 语句
+            parameters(tuple | dict): 参数
+        Returns:
+            rows(list): 结果行
+        """
+        return self.get_connection().execute(sql, parameters).fetchall()
+
+    # ----------- 表结构 ----------- #
+
     def init_db(self) -> None:
         """初始化数据库和表结构"""
+        self.migrate()
+        print("数据库加载完毕！")
 
-        # 数据库不存在，创建新数据库
-        if not os.path.exists(DatabaseManger.DATABASE_PATH):
-            conn = self.get_connection()
-            cursor = conn.cursor()
-
-            # 创建用户表
-            cursor.execute('''
-                CREATE TABLE users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT UNIQUE NOT NULL,
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    level TEXT DEFAULT 'beginner'
-                )
-            ''')
-
-            conn.commit()
-            conn.close()
+    def schema_version(self) -> int:
+        """获取当前表结构版本"""
+        return self.get_connection().execute("PRAGMA user_version").fetchone()[0]
 
-        print("数据库加载完毕！")
\ No newline at end of file
+    def migrate(self, target:int = LATEST_VERSION) -> int:
+        """按版本依次执行尚未执行的迁移，每个版本一个事务
+        Args:
+            target(int): 目标版本
+        Returns:
+            version(int): 迁移后的版本
+        """
+        current = self.schema_version()
+        for version, statements in MIGRATIONS:
+            if version <= current:
+                continue
+            if version > target:
+                break
+            with self.transaction() as conn:
+                # 在写锁内重新读取版本，避免多个进程重复迁移
+                if conn.execute("PRAGMA user_version").fetchone()[0] >= version:
+                    continue
+                for statement in statements:
+                    conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {version}")
+        return self.schema_version()
@@ -0,0 +1,139 @@
+import heapq
+import math
+import threading
+import time
+from functools import partial
+from itertools import count
+
+from core.Clock import NS_PER_SECOND
+
+
+class DeadlineScheduler:
+    """截止时刻调度器
+
+    按单调时钟（perf_counter_ns，与 MonotonicClock 同一时间轴）在截止时刻调用回调。
+    所有截止时刻放在一个最小堆中，由一个线程等待到最早的截止时刻再唤醒（不轮询），
+    提前被唤醒时继续等待剩余时间；没有待执行的回调时线程一直等待，不占用 CPU。
+    也可以像 StatusScheduler 一样改由 Tk 或 asyncio 的定时器驱动。
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self):
+        # (截止时刻, 序号, 回调)，取消的条目留在堆中，到期时跳过
+        self.deadlines = []
+        # 尚未执行也未取消的序号
+        self.live = set()
+        self.sequence = count()
+        self.condition = threading.Condition()
+        self.thread = None
+        # 外部定时器 timer(delay, callback)，设置后不再使用后台线程
+        self.timer = None
+
+    @classmethod
+    def shared(cls) -> 'DeadlineScheduler':
+        """获取全局共享的调度器"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def __len__(self) -> int:
+        return len(self.live)
+
+    # ----------- 调度 ----------- #
+
+    def schedule(self, deadline:int, callback) -> int:
+        """在截止时刻调用回调
+        Args:
+            deadline(int): 截止时刻（perf_counter_ns() 读数）
+            callback(callable): 回调（在调度线程或外部定时器所在线程中调用）
+        Returns:
+            handle(int): 用于取消的编号
+        """
+        with self.condition:
+            handle = next(self.sequence)
+            heapq.heappush(self.deadlines, (deadline, handle, callback))
+            self.live.add(handle)
+            if self.timer is not None:
+                self._start_timer(deadline)
+            elif self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="DeadlineScheduler", daemon=True)
+                self.thread.start()
+            self.condition.notify()
+            return handle
+
+    def cancel(self, handle:int) -> None:
+        """取消尚未执行的回调（已执行或已取消时什么都不做）"""
+        with self.condition:
+            self.live.discard(handle)
+
+    def run_due(self, now:int = None) -> int:
+        """执行所有已到期的回调
+        Args:
+            now(int): 当前时刻，默认为 perf_counter_ns()（测试时可传入虚拟时钟的读数）
+        Returns:
+            count(int): 执行的回调数
+        """
+        if now is None:
+            now = time.perf_counter_ns()
+        due = []
+        with self.condition:
+            while self.deadlines and self.deadlines[0][0] <= now:
+                _, handle, callback = heapq.heappop(self.deadlines)
+                if handle in self.live:
+                    self.live.discard(handle)
+                    due.append(callback)
+        for callback in due:
+            callback()
+        return len(due)
+
+    # ----------- 驱动方式 ----------- #
+
+    def attach_tk(self, root) -> None:
+        """改由 Tk 的 after 循环驱动（after 以毫秒为单位，向上取整避免提前执行）"""
+        self.attach_timer(lambda delay, callback: root.after(math.ceil(delay * 1000), callback))
+
+    def attach_loop(self, loop) -> None:
+        """改由 asyncio 事件循环驱动"""
+        self.attach_timer(loop.call_later)
+
+    def attach_timer(self, timer) -> None:
+        """改由外部定时器驱动，不再使用后台线程
+        Args:
+            timer(callable): timer(delay, callback) 在 delay 秒后调用 callback
+        """
+        with self.condition:
+            self.timer = timer
+            self.condition.notify()
+            for deadline, handle, _ in self.deadlines:
+                if handle in self.live:
+                    self._start_timer(deadline)
+
+    def _start_timer(self, deadline:int) -> None:
+        self.timer(max(0, deadline - time.perf_counter_ns()) / NS_PER_SECOND, partial(self._timer_due, deadline))
+
+    def _timer_due(self, deadline:int) -> None:
+        # 外部定时器的精度有限，提前触发时等待剩余的时间
+        if time.perf_counter_ns() < deadline:
+            self._start_timer(deadline)
+        else:
+            self.run_due()
+
+    def _run(self) -> None:
+        """后台线程：等待到最早的截止时刻"""
+        while True:
+            with self.condition:
+                while True:
+                    if self.timer is not None:
+                        self.thread = None
+                        return
+                    if not self.deadlines:
+                        self.condition.wait()
+                        continue
+                    timeout = self.deadlines[0][0] - time.perf_counter_ns()
+                    if timeout <= 0:
+                        break
+                    self.condition.wait(timeout / NS_PER_SECOND)
+            self.run_due()
@@ -0,0 +1,153 @@
+import threading
+
+from core.Clock import MonotonicClock
+from core.StatusScheduler import StatusScheduler
+from core.TypingEngine import TypingEngine
+
+
+class TextPool:
+    """练习文本池
+
+    相同内容的文本只保留一份，所有会话共享同一个只读 str 对象；
+    按引用计数管理，最后一个会话结束后释放。
+    """
+
+    def __init__(self):
+        self.texts = {}
+        self.references = {}
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def acquire(self, text:str) -> str:
+        """获取共享的文本对象
+        Args:
+            text(str): 文本
+        Returns:
+            text(str): 池中内容相同的文本对象
+        """
+        with self.lock:
+            shared = self.texts.setdefault(text, text)
+            self.references[shared] = self.references.get(shared, 0) + 1
+            return shared
+
+    def release(self, text:str) -> None:
+        """释放一次引用"""
+        with self.lock:
+            count = self.references.get(text, 0) - 1
+            if count > 0:
+                self.references[text] = count
+            else:
+                self.references.pop(text, None)
+                self.texts.pop(text, None)
+
+
+def _discard_status(status:dict) -> None:
+    """托管会话默认不输出状态"""
+
+
+class EngineHost:
+    """多用户打字引擎宿主
+
+    在一个进程中同时托管多个练习会话（教室、机房）：
+    各会话的文本由 TextPool 共享，状态推送由同一个 StatusScheduler 驱动，
+    练习数据经同一个 SessionWriter 写入，所有引擎共用一个时钟对象。
+    """
+
+    def __init__(self, writer = None, scheduler:StatusScheduler = None, clock = None):
+        """初始化宿主
+        Args:
+            writer(SessionWriter): 共享的练习数据写入器，为空时不保存练习数据
+            scheduler(StatusScheduler): 共享的状态推送调度器，默认新建一个
+            clock(MonotonicClock | VirtualClock): 共享的时钟，默认使用单调时钟
+        """
+        self.writer = writer
+        self.scheduler = scheduler or StatusScheduler()
+        self.clock = clock or MonotonicClock()
+        self.texts = TextPool()
+        # 会话标识 -> 引擎
+        self.sessions = {}
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def __contains__(self, key) -> bool:
+        return key in self.sessions
+
+    # ----------- 会话管理 ----------- #
+
+    def open(self, key, text:str, user_id:int = None, on_status = None, session_id:int = None) -> TypingEngine:
+        """开始一个会话
+        Args:
+            key(hashable): 会话标识（例如座位号或用户编号）
+            text(str): 练习文本
+            user_id(int): 用户编号，默认与 key 相同
+            on_status(callable): 状态推送回调，为空时不推送
+            session_id(int): 预先分配的会话编号，为空时由 writer 分配
+        Returns:
+            engine(TypingEngine): 该会话的引擎
+        """
+        engine = TypingEngine(
+            self.scheduler, self.writer, key if user_id is None else user_id, clock=self.clock
+        )
+        engine.status_update = on_status or _discard_status
+        engine.load_text(self.texts.acquire(text))
+        with self.lock:
+            if key in self.sessions:
+                self.texts.release(engine.text)
+                raise KeyError(f"会话 {key!r} 已存在！")
+            self.sessions[key] = engine
+        engine.start_session(session_id)
+        return engine
+
+    def get(self, key) -> TypingEngine:
+        """获取会话的引擎（不存在时抛出 KeyError）"""
+        return self.sessions[key]
+
+    def close(self, key) -> dict:
+        """结束会话并返回其统计信息
+        Args:
+            key(hashable): 会话标识
+        Returns:
+            stats(dict): TypingEngine.get_stats() 的结果
+        """
+        with self.lock:
+            engine = self.sessions.pop(key)
+        engine.end_session(flush=False)
+        self.texts.release(engine.text)
+        return engine.get_stats()
+
+    def close_all(self, flush:bool = True) -> None:
+        """结束所有会话
+        Args:
+            flush(bool): 是否等待全部练习数据落盘
+        """
+        for key in list(self.sessions):
+            self.close(key)
+        if flush and self.writer is not None:
+            self.writer.flush()
+
+    # ----------- 输入 ----------- #
+
+    def feed(self, key, chars:str, timestamps = None) -> int:
+        """把输入交给会话（可以是一个字符，也可以是一批字符）
+        Args:
+            key(hashable): 会话标识
+            chars(str): 输入的字符
+            timestamps(list): 每个字符的按键时刻（纳秒），为空时取当前时间
+        Returns:
+            count(int): 实际处理的字符数
+        """
+        engine = self.sessions[key]
+        if len(chars) == 1 and timestamps is None:
+            if engine.current_position >= len(engine.text):
+                return 0
+            engine.process_input(chars)
+            return 1
+        return engine.process_inputs(chars, timestamps)
+
+    def backspace(self, key) -> bool:
+        """会话退格"""
+        return self.sessions[key].backspace()
@@ -0,0 +1,283 @@
+from array import array
+from collections import Counter, defaultdict
+
+# 错误类型
+SUBSTITUTION = 'substitution'    # 打错字符
+INSERTION = 'insertion'          # 多打字符
+OMISSION = 'omission'            # 漏打字符
+TRANSPOSITION = 'transposition'  # 相邻两个字符顺序颠倒
+KINDS = (SUBSTITUTION, INSERTION, OMISSION, TRANSPOSITION)
+
+_INFINITY = float('inf')
+
+
+class ErrorAligner:
+    """增量错误对齐
+
+    按位置比较时，漏打或多打一个字符会让后面的输入全部错位。本类在输入出错后，
+    对出错点之后的输入与文本做带状编辑距离（含相邻交换）：每输入一个字符只计算一行
+    （宽度为 2 * window + 1），直到最优路径末尾连续 confirm 个字符匹配时确认对齐，
+    回溯得到各处错误的类型，并把同步点移到文本的对应位置。
+    没有待确认的输入且字符正确时只做一次比较。
+
+    对齐结果同时给出每处错误对应的文本位置（error_positions）与被判为错误的输入字符
+    （wrong_inputs），TypingEngine 的对齐模式据此计算准确率并推进文本位置（cursor）。
+    """
+
+    DEFAULT_WINDOW = 16
+    DEFAULT_CONFIRM = 3
+
+    def __init__(self, window:int = DEFAULT_WINDOW, confirm:int = DEFAULT_CONFIRM):
+        """初始化对齐器
+        Args:
+            window(int): 带宽，即一次错误最多能跨越的字符数，也是待确认输入的上限
+            confirm(int): 连续匹配多少个字符后确认对齐
+        """
+        self.window = window
+        self.confirm = confirm
+        self.reset("")
+
+    def reset(self, text) -> None:
+        """开始对齐新的文本
+        Args:
+            text(str | TextSource): 文本
+        """
+        self.text = text
+        # 已确认部分：每个输入字符对齐后的文本位置，以及带错误的输入字符 -> ((类型, 期望字符, 文本位置), ...)
+        self.positions = array('Q')
+        self.errors = {}
+        # 同步点（文本位置）以及之后待确认的输入、编辑距离矩阵的各行（起始列, 值）和当前最优列
+        self.origin = 0
+        self.pending = []
+        self.rows = []
+        self.column = 0
+        self.counts = Counter()
+        self.error_analysis = defaultdict(int)
+        # 文本位置 -> 错误数，以及被判为错误的输入字符下标（打错、多打、交换）
+        self.error_positions = Counter()
+        self.wrong_inputs = set()
+
+    @property
+    def position(self) -> int:
+        """已确认的文本位置"""
+        return self.origin
+
+    @property
+    def cursor(self) -> int:
+        """当前输入对应的文本位置（有待确认的输入时按当前最优路径估计）"""
+        return self.origin + self.column if self.pending else self.origin
+
+    def __len__(self) -> int:
+        """已输入的字符数"""
+        return len(self.positions) + len(self.pending)
+
+    # ----------- 输入 ----------- #
+
+    def feed(self, char:str) -> None:
+        """输入一个字符"""
+        if not self.pending:
+            origin = self.origin
+            # 用切片确定文本边界，不对 TextSource 调用 len()（内存映射的文件无需扫描到末尾）
+            if self.text[origin:origin + 1] == char:
+                self.origin = origin + 1
+                self.positions.append(origin + 1)
+                return
+            # 从出错点开始计算编辑距离
+            limit = len(self.text[origin:origin + self.window])
+            self.rows.append((0, list(range(limit + 1))))
+        self.pending.append(char)
+        self._add_row()
+
+        row = len(self.pending)
+        column = self.column = self._best_column()
+        if self._is_confirmed(row, column):
+            self._commit(row, column)
+        elif row >= self.window:
+            # 超出窗口仍未重新同步，按当前最优位置强制确认
+            self._commit(row, column)
+
+    def feed_many(self, chars:str) -> None:
+        """输入一批字符"""
+        for char in chars:
+            self.feed(char)
+
+    def pop(self) -> bool:
+        """撤销最后一个输入字符（退格）
+        Returns:
+            is_success(bool): 是否成功撤销
+        """
+        if self.pending:
+            self.pending.pop()
+            self.rows.pop()
+            if self.pending:
+                self.column = self._best_column()
+            else:
+                self.rows.clear()
+            return True
+        if not self.positions:
+            return False
+
+        index = len(self.positions) - 1
+        self.positions.pop()
+        self.origin = self.positions[-1] if self.positions else 0
+        for kind, expected, position in self.errors.pop(index, ()):
+            _discount(self.counts, kind)
+            _discount(self.error_positions, position)
+            if expected is not None:
+                _discount(self.error_analysis, expected)
+        self.wrong_inputs.discard(index)
+        return True
+
+    def finish(self) -> None:
+        """结束输入，按当前最优位置确认剩余的待确认输入"""
+        if self.pending:
+            self._commit(len(self.pending), self._best_column())
+
+    # ----------- 编辑距离 ----------- #
+
+    def _cell(self, row:int, column:int) -> float:
+        start, values = self.rows[row]
+        offset = column - start
+        if 0 <= offset < len(values):
+            return values[offset]
+        return _INFINITY
+
+    def _add_row(self) -> None:
+        """计算新输入字符对应的一行（只计算带内的列）"""
+        origin = self.origin
+        pending = self.pending
+        row = len(pending)
+        char = pending[-1]
+        previous_char = pending[-2] if row > 1 else None
+        start = max(0, row - self.window)
+        # segment[k] 为第 k 列（k >= 1）对应的文本字符
+        segment = " " + self.text[origin:origin + row + self.window]
+        end = len(segment) - 1
+        rows = self.rows
+        above_start, above = rows[row - 1]
+        above_end = above_start + len(above)
+        if row > 1:
+            diagonal_start, diagonal = rows[row - 2]
+            diagonal_end = diagonal_start + len(diagonal)
+
+        values = []
+        left = _INFINITY
+        for column in range(start, end + 1):
+            # 多打：输入前进，文本不动；漏打：文本前进，输入不动
+            best = (above[column - above_start] if above_start <= column < above_end else _INFINITY) + 1
+            if left + 1 < best:
+                best = left + 1
+            if column > 0:
+                expected = segment[column]
+                # 匹配或打错
+                if above_start < column <= above_end:
+                    cost = above[column - 1 - above_start] + (char != expected)
+                    if cost < best:
+                        best = cost
+                # 相邻交换
+                if (
+                    previous_char is not None and column > 1 and char == segment[column - 1]
+                    and previous_char == expected and diagonal_start < column - 1 <= diagonal_end
+                ):
+                    cost = diagonal[column - 2 - diagonal_start] + 1
+                    if cost < best:
+                        best = cost
+            values.append(best)
+            left = best
+        rows.append((start, values))
+
+    def _best_column(self) -> int:
+        """当前行代价最小的列（相同时取最接近对角线的列）"""
+        row = len(self.pending)
+        start, values = self.rows[row]
+        return min(
+            range(start, start + len(values)),
+            key=lambda column: (values[column - start], abs(column - row))
+        )
+
+    def _is_confirmed(self, row:int, column:int) -> bool:
+        """最优路径末尾是否连续 confirm 个字符匹配"""
+        if row < self.confirm or column < self.confirm:
+            return False
+        text = self.text
+        origin = self.origin
+        cost = self._cell(row, column)
+        for step in range(1, self.confirm + 1):
+            if (
+                self.pending[row - step] != text[origin + column - step]
+                or self._cell(row - step, column - step) != cost
+            ):
+                return False
+        return True
+
+    def _commit(self, row:int, column:int) -> None:
+        """回溯最优路径，记录错误类型并把同步点移到 column"""
+        text = self.text
+        origin = self.origin
+        pending = self.pending
+        cell = self._cell
+
+        # 回溯得到逆序的操作：(类型, 消耗的输入字符数, 期望字符)，匹配的类型为 None
+        operations = []
+        while row > 0 or column > 0:
+            cost = cell(row, column)
+            expected = text[origin + column - 1] if column > 0 else None
+            if row > 0 and column > 0 and cost == cell(row - 1, column - 1) + (pending[row - 1] != expected):
+                operations.append((None if pending[row - 1] == expected else SUBSTITUTION, 1, expected))
+                row -= 1
+                column -= 1
+            elif (
+                row > 1 and column > 1
+                and pending[row - 1] == text[origin + column - 2] and pending[row - 2] == expected
+                and cost == cell(row - 2, column - 2) + 1
+            ):
+                operations.append((TRANSPOSITION, 2, text[origin + column - 2]))
+                row -= 2
+                column -= 2
+            elif row > 0 and cost == cell(row - 1, column) + 1:
+                next_expected = text[origin + column:origin + column + 1] or None
+                operations.append((INSERTION, 1, next_expected))
+                row -= 1
+            else:
+                operations.append((OMISSION, 0, expected))
+                column -= 1
+
+        # 按输入字符记录：漏打记在其后的第一个输入字符上
+        position = origin
+        errors = []
+        for kind, consumed, expected in reversed(operations):
+            if kind is not None:
+                errors.append((kind, expected, position))
+                self.counts[kind] += 1
+                self.error_positions[position] += 1
+                if expected is not None:
+                    self.error_analysis[expected] += 1
+            if kind == OMISSION:
+                position += 1
+                continue
+            for _ in range(consumed):
+                if kind != INSERTION:
+                    position += 1
+                if kind is not None:
+                    self.wrong_inputs.add(len(self.positions))
+                if errors:
+                    self.errors[len(self.positions)] = tuple(errors)
+                    errors = []
+                self.positions.append(position)
+        if errors:
+            # 末尾的漏打（强制确认时）记在最后一个输入字符上
+            index = len(self.positions) - 1
+            self.errors[index] = self.errors.get(index, ()) + tuple(errors)
+
+        self.origin = position
+        self.pending = []
+        self.rows = []
+
+
+def _discount(counts:dict, key) -> None:
+    """计数减一，减到 0 时删除该键（统计中不出现 0 次的条目）"""
+    count = counts[key] - 1
+    if count:
+        counts[key] = count
+    else:
+        del counts[key]
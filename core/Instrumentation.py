@@ -0,0 +1,231 @@
+import atexit
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# 设置该环境变量即开启埋点，值为导出文件路径（.json 导出 JSON，其他扩展名导出 Prometheus 文本格式）
+ENV_PROFILE = 'JTYPEWRITER_PROFILE'
+# 采样间隔：每个阶段每 N 次调用计时一次，默认每次都计时
+ENV_SAMPLE = 'JTYPEWRITER_PROFILE_SAMPLE'
+
+# 输入管线的各个阶段
+CAPTURE = 0         # 捕获到投递线程取出
+PROCESS_INPUT = 1   # 引擎处理输入
+STATS = 2           # 计算统计快照
+RENDER = 3          # 状态推送与界面渲染
+DB_WRITE = 4        # 写入线程提交一个事务
+STAGES = ('capture', 'process_input', 'stats', 'render', 'db_write')
+
+# 桶上界（纳秒）：1us 起每档翻倍，共 24 档（约 8.4 秒），最后一个桶存放超出的样本
+BOUNDS = tuple(1000 << i for i in range(24))
+BUCKETS = len(BOUNDS) + 1
+
+
+class Instrumentation:
+    """输入管线埋点
+
+    记录各阶段耗时的对数直方图，支持按阶段采样。未开启时 shared() 返回 None，
+    埋点处只多一次 `is not None` 判断；开启后每个被采样的调用多两次 perf_counter_ns()
+    和一次 bisect。可导出为 JSON 或 Prometheus 文本格式。
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+    _shared_loaded = False
+
+    def __init__(self, sample_every:int = 1):
+        """初始化埋点
+        Args:
+            sample_every(int): 每个阶段每隔多少次调用计时一次
+        """
+        self.sample_every = max(1, sample_every)
+        self.counts = [[0] * BUCKETS for _ in STAGES]
+        self.totals = [0] * len(STAGES)
+        # 各阶段距离下一次采样还剩的调用次数
+        self.skips = [1] * len(STAGES)
+        self.lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> 'Instrumentation':
+        """获取全局埋点（首次调用时按环境变量决定是否开启）
+        Returns:
+            instrumentation(Instrumentation): 未开启时为 None
+        """
+        if not cls._shared_loaded:
+            with cls._shared_lock:
+                if not cls._shared_loaded:
+                    path = os.environ.get(ENV_PROFILE)
+                    if path:
+                        cls.enable(path, int(os.environ.get(ENV_SAMPLE, 1)))
+                    cls._shared_loaded = True
+        return cls._shared
+
+    @classmethod
+    def enable(cls, path:str = None, sample_every:int = 1) -> 'Instrumentation':
+        """开启全局埋点（需在创建引擎、监听线程和写入器之前调用）
+        Args:
+            path(str): 导出文件路径，不为空时在进程退出时导出
+            sample_every(int): 采样间隔
+        Returns:
+            instrumentation(Instrumentation): 全局埋点
+        """
+        instrumentation = cls(sample_every)
+        if path:
+            atexit.register(instrumentation.export, path)
+        cls._shared = instrumentation
+        cls._shared_loaded = True
+        return instrumentation
+
+    @classmethod
+    def disable(cls) -> None:
+        """关闭全局埋点（此后创建的对象不再计时）"""
+        cls._shared = None
+        cls._shared_loaded = True
+
+    # ----------- 记录 ----------- #
+
+    def begin(self, stage:int) -> int:
+        """阶段开始
+        Args:
+            stage(int): 阶段
+        Returns:
+            start(int): 开始时刻（纳秒），本次未被采样时为 0
+        """
+        skip = self.skips[stage] - 1
+        if skip:
+            self.skips[stage] = skip
+            return 0
+        self.skips[stage] = self.sample_every
+        return time.perf_counter_ns()
+
+    def end(self, stage:int, start:int) -> None:
+        """阶段结束（start 为 begin() 的返回值）"""
+        if start:
+            self.record(stage, time.perf_counter_ns() - start)
+
+    def record(self, stage:int, elapsed:int) -> None:
+        """直接记录一次耗时（不经过采样）
+        Args:
+            stage(int): 阶段
+            elapsed(int): 耗时（纳秒）
+        """
+        bucket = bisect_left(BOUNDS, elapsed)
+        with self.lock:
+            self.counts[stage][bucket] += 1
+            self.totals[stage] += elapsed
+
+    # ----------- 查询 ----------- #
+
+    def count(self, stage:int) -> int:
+        return sum(self.counts[stage])
+
+    def percentile(self, stage:int, point:float) -> float:
+        """阶段耗时的分位数（取所在桶的上界）
+        Args:
+            stage(int): 阶段
+            point(float): 分位点（0~100）
+        Returns:
+            latency(float): 耗时（毫秒），没有样本时为 0
+        """
+        counts = self.counts[stage]
+        total = sum(counts)
+        if total == 0:
+            return 0.0
+        rank = total * point / 100
+        seen = 0
+        for bucket, count in enumerate(counts):
+            seen += count
+            if seen >= rank and count:
+                return BOUNDS[min(bucket, len(BOUNDS) - 1)] / 1e6
+        return BOUNDS[-1] / 1e6
+
+    def summary(self) -> dict:
+        """各阶段的样本数、平均耗时与分位数（毫秒）"""
+        result = {}
+        for stage, name in enumerate(STAGES):
+            count = self.count(stage)
+            result[name] = {
+                'count': count,
+                'mean_ms': self.totals[stage] / count / 1e6 if count else 0.0,
+                'p50_ms': self.percentile(stage, 50),
+                'p99_ms': self.percentile(stage, 99),
+            }
+        return result
+
+    # ----------- 导出 ----------- #
+
+    def to_json(self) -> dict:
+        summary = self.summary()
+        return {
+            'sample_every': self.sample_every,
+            'bounds_ns': list(BOUNDS),
+            'stages': {
+                name: {
+                    'buckets': list(self.counts[stage]),
+                    'sum_ns': self.totals[stage],
+                    **summary[name],
+                }
+                for stage, name in enumerate(STAGES)
+            },
+        }
+
+    def to_prometheus(self) -> str:
+        """Prometheus 文本格式（histogram，单位为秒）"""
+        metric = 'jtypewriter_stage_latency_seconds'
+        lines = [
+            f'# HELP {metric} Latency of each typing pipeline stage.',
+            f'# TYPE {metric} histogram',
+        ]
+        for stage, name in enumerate(STAGES):
+            cumulative = 0
+            counts = self.counts[stage]
+            for bound, count in zip(BOUNDS, counts):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{stage="{name}",le="{bound / 1e9:g}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'{metric}_bucket{{stage="{name}",le="+Inf"}} {cumulative}')
+            lines.append(f'{metric}_sum{{stage="{name}"}} {self.totals[stage] / 1e9:.9f}')
+            lines.append(f'{metric}_count{{stage="{name}"}} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+    def export(self, path:str) -> None:
+        """导出到文件（.json 为 JSON，其他扩展名为 Prometheus 文本格式）"""
+        with self.lock:
+            if path.endswith('.json'):
+                content = json.dumps(self.to_json(), ensure_ascii=False, indent=2)
+            else:
+                content = self.to_prometheus()
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(content)
+
+
+@contextmanager
+def profile_window(path:str, memory:bool = False, top:int = 30):
+    """在一段时间内采集 cProfile（及可选的 tracemalloc）数据
+    cProfile 只采集调用该函数的线程。
+    Args:
+        path(str): cProfile 结果路径（可用 python -m pstats 查看）
+        memory(bool): 是否同时采集内存分配，结果写入 path + '.memory.txt'
+        top(int): 内存分配报告保留的条目数
+    """
+    import cProfile
+    import tracemalloc
+
+    profiler = cProfile.Profile()
+    if memory:
+        tracemalloc.start()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        if memory:
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            with open(path + '.memory.txt', 'w', encoding='utf-8') as file:
+                for statistic in snapshot.statistics('lineno')[:top]:
+                    file.write(f'{statistic}\n')
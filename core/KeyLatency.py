@@ -0,0 +1,396 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from itertools import repeat
+from operator import sub
+from struct import pack, error as StructError
+from sys import byteorder
+
+from core.Clock import NS_PER_SECOND
+
+# 直方图分桶上界（纳秒）：约 10ms 起每 1/4 个倍频程一个桶，最后一个桶收纳 8.6s 以上的间隔。
+# 上界取 2 的幂乘以 16/16、19/16、23/16、27/16，二进制只有最高 5 位可能非零，
+# 批量输入可直接按间隔的字节分桶（见 _interval_buckets）。
+# 桶 i 覆盖 [BOUNDS[i - 1], BOUNDS[i])，相对误差不超过 21%。
+_MANTISSAS = (16, 19, 23, 27)
+BOUNDS = tuple(_MANTISSAS[(i + 1) % 4] << (19 + (i + 1) // 4) for i in range(40))
+BUCKETS = len(BOUNDS) + 1
+# 各桶的代表值（毫秒，取上下界的几何平均）
+BUCKET_VALUES = tuple(
+    (BOUNDS[0] / 2 if i == 0 else (BOUNDS[i - 1] * BOUNDS[min(i, len(BOUNDS) - 1)]) ** 0.5) / 1e6
+    for i in range(BUCKETS)
+)
+_EMPTY = bytes(array('I', [0]) * BUCKETS)
+_BIG_ENDIAN = byteorder == 'big'
+
+
+class KeyLatency:
+    """按键间隔统计
+
+    为每个字符与每个相邻字符对（bigram）维护一个固定分桶的计数直方图，
+    按键时只做一次二分查找与一次计数加一。直方图数量只取决于出现过的字符种类，
+    与按键次数无关，可直接逐桶相加以合并多个会话。
+
+    只统计连续两次都输入正确的按键之间的间隔；输入错误、退格、暂停都会中断计时，
+    超过 idle 的间隔视为停顿，不计入统计。
+
+    批量输入（record_many）每批立即累加到直方图，不保留原始按键时刻：
+    ASCII 文本的间隔在字节层面整体分桶，再按 (前一字符, 当前字符, 桶号) 的编码计数。
+    """
+
+    __slots__ = ('keys', 'bigrams', 'previous', 'last_time', 'bounds', 'tables')
+
+    DEFAULT_IDLE = 5 * NS_PER_SECOND
+    # 计算最慢字符对时要求的最少样本数
+    MIN_SAMPLES = 5
+
+    def __init__(self, idle:int = DEFAULT_IDLE):
+        """初始化统计
+        Args:
+            idle(int): 视为停顿的间隔（纳秒），取不小于它的最近一个分桶上界
+        """
+        # 在 idle 处截断的分桶上界：落在最后一个桶之外的间隔即为停顿
+        self.bounds, self.tables = _truncated_bounds(idle)
+        self.keys = {}
+        self.bigrams = {}
+        self.previous = None
+        self.last_time = 0
+
+    def reset(self) -> None:
+        """清空所有统计"""
+        self.keys.clear()
+        self.bigrams.clear()
+        self.previous = None
+
+    # ----------- 增量更新 ----------- #
+
+    def record(self, expected:str, timestamp:int) -> None:
+        """记录一次正确的按键
+        Args:
+            expected(str): 应输入的字符
+            timestamp(int): 按键时间（纳秒）
+        """
+        previous = self.previous
+        if previous is not None:
+            bucket = bisect_right(self.bounds, timestamp - self.last_time)
+            if bucket < len(self.bounds):
+                histogram = self.keys.get(expected)
+                if histogram is None:
+                    histogram = self.keys[expected] = array('I', _EMPTY)
+                histogram[bucket] += 1
+                bigram = previous + expected
+                histogram = self.bigrams.get(bigram)
+                if histogram is None:
+                    histogram = self.bigrams[bigram] = array('I', _EMPTY)
+                histogram[bucket] += 1
+        self.previous = expected
+        self.last_time = timestamp
+
+    def record_many(self, expected:str, timestamps, error_offsets = ()) -> None:
+        """批量记录按键
+        Args:
+            expected(str): 应输入的字符
+            timestamps(list): 每次按键的时间（非负整数纳秒，非递减）
+            error_offsets(list): 输入错误的按键下标（升序）
+        """
+        count = len(expected)
+        if count == 0:
+            return
+        previous = self.previous
+        if previous is not None:
+            # 与上一批最后一个按键之间的间隔
+            self._count(previous + expected, [self.last_time, *timestamps], [offset + 1 for offset in error_offsets])
+        else:
+            self._count(expected, timestamps, error_offsets)
+        if error_offsets and error_offsets[-1] == count - 1:
+            self.previous = None
+        else:
+            self.previous = expected[-1]
+            self.last_time = timestamps[count - 1]
+
+    def _count(self, expected:str, timestamps, error_offsets) -> None:
+        """按 (前一字符, 当前字符, 桶号) 计数后累加到直方图"""
+        count = len(expected)
+        if count < 2:
+            return
+        tables = self.tables
+        buckets = None
+        if tables is not None and expected.isascii():
+            buckets = _interval_buckets(tables, timestamps, count)
+        if buckets is None:
+            self._count_generic(expected, timestamps, error_offsets)
+            return
+
+        # 与错误按键相邻的间隔记为停顿，不计入
+        idle = len(self.bounds)
+        for offset in error_offsets:
+            if offset > 0:
+                buckets[offset - 1] = idle
+            if offset < count - 1:
+                buckets[offset] = idle
+
+        # 每个间隔编码为 桶号 << 16 | 前一字符 << 8 | 当前字符 的 32 位整数后计数
+        size = count - 1
+        codes = bytearray(4 * size)
+        codes[0::4] = expected[1:].encode('ascii')
+        codes[1::4] = expected[:-1].encode('ascii')
+        codes[2::4] = buckets
+        packed = array('I')
+        packed.frombytes(codes)
+        if _BIG_ENDIAN:
+            packed.byteswap()
+
+        keys = self.keys
+        bigrams = self.bigrams
+        for code, number in Counter(packed).items():
+            bucket = code >> 16
+            if bucket >= idle:
+                continue
+            char = chr(code & 255)
+            histogram = keys.get(char)
+            if histogram is None:
+                histogram = keys[char] = array('I', _EMPTY)
+            histogram[bucket] += number
+            bigram = chr(code >> 8 & 255) + char
+            histogram = bigrams.get(bigram)
+            if histogram is None:
+                histogram = bigrams[bigram] = array('I', _EMPTY)
+            histogram[bucket] += number
+
+    def _count_generic(self, expected:str, timestamps, error_offsets) -> None:
+        """非 ASCII 文本或间隔超出字节分桶范围时的计数，分桶与计数的循环都在 C 层完成"""
+        count = len(expected)
+        intervals = map(sub, timestamps[1:], timestamps[:-1])
+        buckets = list(map(bisect_right, repeat(self.bounds, count - 1), intervals))
+        triples = Counter(zip(expected[:-1], expected[1:], buckets))
+        # 与错误按键相邻的间隔不计入
+        excluded = {i for offset in error_offsets for i in (offset - 1, offset)}
+        for i in excluded:
+            if 0 <= i < count - 1:
+                triples[expected[i], expected[i + 1], buckets[i]] -= 1
+
+        idle = len(self.bounds)
+        keys = self.keys
+        bigrams = self.bigrams
+        for (previous, char, bucket), number in triples.items():
+            if number <= 0 or bucket >= idle:
+                continue
+            histogram = keys.get(char)
+            if histogram is None:
+                histogram = keys[char] = array('I', _EMPTY)
+            histogram[bucket] += number
+            bigram = previous + char
+            histogram = bigrams.get(bigram)
+            if histogram is None:
+                histogram = bigrams[bigram] = array('I', _EMPTY)
+            histogram[bucket] += number
+
+    def interrupt(self) -> None:
+        """中断计时（输入错误、退格或暂停后，下一次按键不计算间隔）"""
+        self.previous = None
+
+    # ----------- 查询 ----------- #
+
+    def histogram(self, gram:str) -> array:
+        """获取字符（长度 1）或字符对（长度 2）的直方图，不存在时为 None"""
+        return (self.keys if len(gram) == 1 else self.bigrams).get(gram)
+
+    def percentile(self, gram:str, point:float) -> float:
+        """计算间隔的分位数
+        Args:
+            gram(str): 字符或字符对
+            point(float): 分位点（0-100）
+        Returns:
+            latency(float): 间隔（毫秒），没有样本时为 None
+        """
+        histogram = self.histogram(gram)
+        return None if histogram is None else _percentile(histogram, point)
+
+    def key_percentiles(self, points:tuple = (50, 95)) -> dict:
+        """每个字符的间隔分位数
+        Returns:
+            percentiles(dict): 字符 -> {分位点: 间隔（毫秒）}
+        """
+        return {
+            key: {point: _percentile(histogram, point) for point in points}
+            for key, histogram in self.keys.items()
+        }
+
+    def slowest_bigrams(self, limit:int = 10, point:float = 50, min_samples:int = MIN_SAMPLES) -> list:
+        """最慢的字符对
+        Args:
+            limit(int): 返回数量
+            point(float): 按哪个分位数排序
+            min_samples(int): 最少样本数，样本过少的字符对不参与排序
+        Returns:
+            rows(list): [(字符对, 间隔（毫秒）, 样本数), ...]，从慢到快
+        """
+        rows = []
+        for bigram, histogram in self.bigrams.items():
+            samples = sum(histogram)
+            if samples >= min_samples:
+                rows.append((bigram, _percentile(histogram, point), samples))
+        rows.sort(key=lambda row: row[1], reverse=True)
+        return rows[:limit]
+
+    # ----------- 合并与持久化 ----------- #
+
+    def rows(self, user_id:int) -> list:
+        """导出非零的桶，用于累加到数据库
+        Returns:
+            rows(list): [(user_id, 字符或字符对, 桶号, 次数), ...]
+        """
+        user_id = user_id or 0
+        return [
+            (user_id, gram, bucket, count)
+            for table in (self.keys, self.bigrams)
+            for gram, histogram in table.items()
+            for bucket, count in enumerate(histogram) if count
+        ]
+
+    def add_rows(self, rows) -> None:
+        """累加 (字符或字符对, 桶号, 次数) 形式的数据"""
+        for gram, bucket, count in rows:
+            table = self.keys if len(gram) == 1 else self.bigrams
+            histogram = table.get(gram)
+            if histogram is None:
+                histogram = table[gram] = array('I', _EMPTY)
+            histogram[bucket] += count
+
+    def merge(self, other:'KeyLatency') -> None:
+        """合并另一份统计"""
+        for table, others in ((self.keys, other.keys), (self.bigrams, other.bigrams)):
+            for gram, histogram in others.items():
+                mine = table.get(gram)
+                if mine is None:
+                    table[gram] = array('I', histogram)
+                else:
+                    for bucket, count in enumerate(histogram):
+                        mine[bucket] += count
+
+    @classmethod
+    def load(cls, database, user_id:int) -> 'KeyLatency':
+        """从数据库读取用户全部会话累计的统计
+        Args:
+            database(DatabaseManger): 数据库管理器
+            user_id(int): 用户编号
+        Returns:
+            latency(KeyLatency): 累计统计
+        """
+        latency = cls()
+        latency.add_rows(database.query(
+            "SELECT gram, bucket, count FROM key_latency WHERE user_id = ?", (user_id or 0,)
+        ))
+        return latency
+
+
+_bounds_cache = {}
+
+def _truncated_bounds(idle:int) -> tuple:
+    """在 idle 处截断的分桶上界与字节分桶表（同一 idle 的实例共享）
+    idle 在 BOUNDS 范围内时取不小于它的最近一个上界，使所有上界都能由间隔的最高 5 个二进制位判定；
+    超出范围时只能逐个二分查找，分桶表为 None。
+    """
+    cached = _bounds_cache.get(idle)
+    if cached is None:
+        cut = idle
+        if BOUNDS[0] <= idle <= BOUNDS[-1]:
+            cut = BOUNDS[bisect_left(BOUNDS, idle)]
+        bounds = tuple(bound for bound in BOUNDS if bound < cut) + (cut,)
+        cached = _bounds_cache[idle] = (bounds, _bucket_tables(bounds) if cut in BOUNDS else None)
+    return cached
+
+
+def _bucket_tables(bounds:tuple) -> tuple:
+    """按间隔的字节查桶号的转换表（bytes.translate 使用），超过 idle 的桶号为 len(bounds)
+    间隔 x 按 4 号字节 b4、3 号字节 b3、2 号字节 b2（小端序）分为四种情况，每种情况
+    由一个字节确定 x 的最高 5 个二进制位，取该区间的下端查桶号：
+        b4 == 1:                 [2^32, 2^33)，b3 的高 4 位
+        b4 == 0, b3 >= 16:       [2^28, 2^32)，b3 的最高 5 位
+        b4 == 0, 1 <= b3 < 16:   [2^24, 2^28)，b3 << 4 | b2 >> 4 的最高 5 位
+        b4 == 0, b3 == 0:        [0, 2^24)，b2 的高 5 位（小于 2^23 的间隔都落在 0 号桶）
+    b4 >= 2 时间隔不小于 2^33，一定超过 idle。
+    """
+    idle = len(bounds)
+
+    def bucket(low:int) -> int:
+        return min(bisect_right(bounds, low), idle)
+
+    def top5(value:int, shift:int) -> int:
+        drop = max(0, value.bit_length() - 5)
+        return bucket((value >> drop << drop) << shift)
+
+    return (
+        bytes(bucket((16 + (value >> 4)) << 28) for value in range(256)),
+        bytes(top5(value, 24) if value >= 16 else 0 for value in range(256)),
+        bytes(top5(value, 20) if value >= 16 else 0 for value in range(256)),
+        bytes(top5(value, 16) for value in range(256)),
+        bytes(idle if value >= 2 else 0 for value in range(256)),
+    )
+
+
+def _table(function) -> bytes:
+    return bytes(function(value) & 255 for value in range(256))
+
+_IS_ZERO = _table(lambda value: 255 if value == 0 else 0)
+_IS_ONE = _table(lambda value: 255 if value == 1 else 0)
+_IS_LOW_NIBBLE = _table(lambda value: 255 if 1 <= value < 16 else 0)
+_SHL4 = _table(lambda value: value << 4)
+_SHR4 = _table(lambda value: value >> 4)
+
+
+def _interval_buckets(tables:tuple, timestamps, count:int) -> bytearray:
+    """把相邻按键的间隔整体分桶
+    按键时刻打包为 64 位整数拼接成的大整数，错开一个字段相减即得到全部间隔（时刻非递减，不会借位），
+    再取出各间隔的 2、3、4 号字节查表，用大整数的按位与、或在各情况之间选择。
+    Returns:
+        buckets(bytearray): 每个间隔的桶号；时刻为负、递减或相邻间隔超过 2^40 纳秒时为 None
+    """
+    size = count - 1
+    if timestamps[0] < 0:
+        return None
+    try:
+        raw = pack('<%dq' % count, *timestamps)
+    except StructError:
+        return None
+    packed = int.from_bytes(raw, 'little')
+    # 右移一个字段后减去去掉最高字段的自身
+    diff = (packed >> 64) - packed + (int.from_bytes(raw[-8:], 'little') << (64 * size))
+    if diff < 0:
+        return None
+    data = diff.to_bytes(8 * size, 'little')
+    if data[5::8].count(0) != size or data[6::8].count(0) != size or data[7::8].count(0) != size:
+        return None
+
+    high, top, middle, low, over = tables
+    b2 = data[2::8]
+    b3 = data[3::8]
+    b4 = data[4::8]
+    merged = (
+        int.from_bytes(b3.translate(_SHL4), 'little') | int.from_bytes(b2.translate(_SHR4), 'little')
+    ).to_bytes(size, 'little')
+    below = (
+        int.from_bytes(b3.translate(top), 'little')
+        | int.from_bytes(merged.translate(middle), 'little') & int.from_bytes(b3.translate(_IS_LOW_NIBBLE), 'little')
+        | int.from_bytes(b2.translate(low), 'little') & int.from_bytes(b3.translate(_IS_ZERO), 'little')
+    )
+    buckets = (
+        below & int.from_bytes(b4.translate(_IS_ZERO), 'little')
+        | int.from_bytes(b3.translate(high), 'little') & int.from_bytes(b4.translate(_IS_ONE), 'little')
+        | int.from_bytes(b4.translate(over), 'little')
+    )
+    return bytearray(buckets.to_bytes(size, 'little'))
+
+
+def _percentile(histogram:array, point:float) -> float:
+    """由直方图计算分位数（毫秒）"""
+    total = sum(histogram)
+    if total == 0:
+        return None
+    rank = max(1, total * point / 100)
+    seen = 0
+    for bucket, count in enumerate(histogram):
+        seen += count
+        if seen >= rank:
+            return BUCKET_VALUES[bucket]
+    return BUCKET_VALUES[-1]
@@ -1,13 +1,266 @@
-from threading import Thread
-import queue
+from threading import Thread, Condition
+from collections import deque, namedtuple
+import time
+
+from core.Instrumentation import Instrumentation, CAPTURE, RENDER
+
+# 一次按键事件：char 为输入的字符（特殊键为 None），key 为按键名称，
+# timestamp 为捕获时刻的 perf_counter_ns()
+KeyEvent = namedtuple('KeyEvent', ('char', 'key', 'timestamp'))
+
+BACKSPACE = 'backspace'
+
+
+class KeyEventBuffer:
+    """有界按键事件缓冲区
+
+    捕获线程写入、投递线程批量取出。写入方永远不会被阻塞（阻塞系统键盘钩子会拖慢整个系统的输入）：
+    缓冲区已满时拒绝新事件并返回 False，被拒绝的按键数记录在 dropped_keystrokes 中。
+    已缓存的事件不会被覆盖，投递给引擎的始终是按键序列的前缀。
+    """
+
+    def __init__(self, capacity:int = 4096):
+        """初始化缓冲区
+        Args:
+            capacity(int): 最多缓存的事件数
+        """
+        self.capacity = capacity
+        self.events = deque()
+        self.condition = Condition()
+        self.dropped_keystrokes = 0
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def put(self, event:KeyEvent) -> bool:
+        """写入一个事件（不阻塞）
+        Returns:
+            is_queued(bool): 是否写入成功，缓冲区已满时为 False
+        """
+        with self.condition:
+            if len(self.events) >= self.capacity:
+                self.dropped_keystrokes += 1
+                return False
+            self.events.append(event)
+            self.condition.notify()
+            return True
+
+    def get_batch(self, max_items:int, timeout:float = None) -> list:
+        """取出一批事件，没有事件时最多等待 timeout 秒
+        Args:
+            max_items(int): 一批最多取出的事件数
+            timeout(float): 等待时间（秒），为空时一直等待
+        Returns:
+            batch(list): 事件列表，超时时为空列表
+        """
+        with self.condition:
+            if not self.events:
+                self.condition.wait(timeout)
+            events = self.events
+            return [events.popleft() for _ in range(min(max_items, len(events)))]
+
+    def wake(self) -> None:
+        """唤醒正在等待的投递线程"""
+        with self.condition:
+            self.condition.notify_all()
+
+
+class LatencyRecorder:
+    """延迟记录器：保留最近的若干个样本，按需计算分位数"""
+
+    def __init__(self, capacity:int = 10000):
+        self.samples = deque(maxlen=capacity)
+
+    def record(self, latency_ns:int) -> None:
+        self.samples.append(latency_ns)
+
+    def percentiles(self, points:tuple = (50, 95, 99)) -> dict:
+        """计算延迟分位数
+        Args:
+            points(tuple): 需要的分位点
+        Returns:
+            percentiles(dict): 分位点 -> 延迟（毫秒）
+        """
+        samples = sorted(self.samples)
+        if not samples:
+            return {point: 0.0 for point in points}
+        return {
+            point: samples[min(len(samples) - 1, len(samples) * point // 100)] / 1e6
+            for point in points
+        }
+
+
+class PynputSource:
+    """通过 pynput 捕获系统键盘（需要安装 pynput）"""
+
+    def __init__(self):
+        self.listener = None
+
+    def start(self, capture) -> None:
+        """开始捕获
+        Args:
+            capture(callable): 收到按键时调用 capture(char, key, timestamp)
+        """
+        from pynput import keyboard
+
+        def on_press(key):
+            timestamp = time.perf_counter_ns()
+            if key == keyboard.Key.backspace:
+                capture(None, BACKSPACE, timestamp)
+            elif isinstance(key, keyboard.KeyCode) and key.char is not None:
+                capture(key.char, key.char, timestamp)
+            elif key == keyboard.Key.space:
+                capture(' ', 'space', timestamp)
+            elif key == keyboard.Key.enter:
+                capture('\n', 'enter', timestamp)
+            elif key == keyboard.Key.tab:
+                capture('\t', 'tab', timestamp)
+
+        self.listener = keyboard.Listener(on_press=on_press)
+        self.listener.start()
+
+    def stop(self) -> None:
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+
+class SyntheticSource:
+    """无界面的模拟输入源，用于测试与基准测试"""
+
+    def __init__(self):
+        self.capture = None
+
+    def start(self, capture) -> None:
+        self.capture = capture
+
+    def stop(self) -> None:
+        self.capture = None
+
+    def type(self, text:str) -> None:
+        """模拟依次按下 text 中的字符（'\\b' 表示退格）"""
+        for char in text:
+            timestamp = time.perf_counter_ns()
+            if char == '\b':
+                self.capture(None, BACKSPACE, timestamp)
+            else:
+                self.capture(char, char, timestamp)
+
 
 class KeyboardListener(Thread):
-    def __init__(self, group = None, target = None, name = None, args = ..., kwargs = None, *, daemon = None):
-        super().__init__(group, target, name, args, kwargs, daemon=daemon)
-        self.event_queue = queue.Queue()
+    """键盘监听线程
+
+    输入源在捕获时刻用 perf_counter_ns() 打上时间戳并写入缓冲区，
+    本线程按批取出事件交给打字引擎（与引擎默认的 MonotonicClock 同一时间轴），
+    因此 WPM 只取决于按键时刻，
+    与界面繁忙程度无关。每批处理并渲染完成后记录捕获到渲染的延迟。
+    缓冲区已满而丢弃的按键在下一批投递时计入引擎的 dropped_keystrokes，随会话统计一起保存。
+    """
+
+    def __init__(
+        self,
+        engine = None,
+        source = None,
+        capacity:int = 4096,
+        batch_size:int = 64,
+        on_render = None,
+        daemon:bool = True
+    ):
+        """初始化监听线程
+        Args:
+            engine(TypingEngine): 接收按键的打字引擎
+            source(PynputSource | SyntheticSource): 输入源，默认使用 pynput
+            capacity(int): 事件缓冲区容量
+            batch_size(int): 每批最多投递的事件数
+            on_render(callable): 每批处理完成后调用的渲染函数
+        """
+        super().__init__(name="KeyboardListener", daemon=daemon)
+        self.engine = engine
+        self.source = source or PynputSource()
+        self.events = KeyEventBuffer(capacity)
+        self.batch_size = batch_size
+        self.on_render = on_render
+        self.latency = LatencyRecorder()
+        self.probe = Instrumentation.shared()
         self.listener = None
         self.listening = False
+        # 已计入引擎的丢弃按键数
+        self.reported_drops = 0
+
+    # ----------- 捕获 ----------- #
+
+    def capture(self, char:str, key:str, timestamp:int) -> bool:
+        """输入源回调：记录一次按键（在捕获线程上执行，只做入队）
+        Returns:
+            is_queued(bool): 是否写入成功，缓冲区已满时为 False
+        """
+        return self.events.put(KeyEvent(char, key, timestamp))
+
+    @property
+    def dropped_keystrokes(self) -> int:
+        """缓冲区已满而丢弃的按键数"""
+        return self.events.dropped_keystrokes
+
+    def start(self) -> None:
+        """启动输入源与投递线程"""
+        self.listening = True
+        self.source.start(self.capture)
+        self.listener = getattr(self.source, 'listener', None)
+        super().start()
+
+    def stop(self) -> None:
+        """停止监听（剩余事件会在退出前处理完）"""
+        self.listening = False
+        self.source.stop()
+        self.events.wake()
+
+    # ----------- 投递 ----------- #
+
+    def run(self) -> None:
+        while self.listening or len(self.events):
+            batch = self.events.get_batch(self.batch_size, timeout=0.5)
+            if batch:
+                self.deliver(batch)
+
+    def deliver(self, batch:list) -> None:
+        """把一批事件交给引擎，渲染后记录延迟
+        连续的字符按键合并为一次 process_inputs 调用，退格单独处理。
+        """
+        probe = self.probe
+        if probe is not None:
+            dequeued = probe.begin(CAPTURE)
+            if dequeued:
+                for event in batch:
+                    probe.record(CAPTURE, dequeued - event.timestamp)
+
+        engine = self.engine
+        if engine is not None:
+            dropped = self.events.dropped_keystrokes
+            if dropped != self.reported_drops:
+                engine.dropped_keystrokes += dropped - self.reported_drops
+                self.reported_drops = dropped
+            chars = []
+            timestamps = []
+            for event in batch:
+                if event.key == BACKSPACE:
+                    if chars:
+                        engine.process_inputs("".join(chars), timestamps)
+                        chars, timestamps = [], []
+                    engine.backspace()
+                elif event.char is not None:
+                    chars.append(event.char)
+                    timestamps.append(event.timestamp)
+            if chars:
+                engine.process_inputs("".join(chars), timestamps)
 
-    
+        if self.on_render is not None:
+            if probe is None:
+                self.on_render()
+            else:
+                started = probe.begin(RENDER)
+                self.on_render()
+                probe.end(RENDER, started)
 
-    
\ No newline at end of file
+        rendered = time.perf_counter_ns()
+        for event in batch:
+            self.latency.record(rendered - event.timestamp)
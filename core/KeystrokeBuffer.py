@@ -0,0 +1,131 @@
+import sys
+from array import array
+
+class KeystrokeBuffer:
+    """按键缓冲区
+
+    使用码位数组保存用户输入，并用位图记录每个位置是否输入正确。
+    追加与退格均为 O(1)，字符串形式仅在需要时才生成。
+    """
+
+    __slots__ = ('_codes', '_bitmap', '_cache')
+
+    # 码位数组使用 4 字节无符号整数，可直接按 UTF-32 解码
+    _TYPECODE = 'I' if array('I').itemsize == 4 else 'L'
+    _ENCODING = 'utf-32-le' if sys.byteorder == 'little' else 'utf-32-be'
+
+    def __init__(self):
+        """初始化缓冲区"""
+        self._codes = array(KeystrokeBuffer._TYPECODE)
+        self._bitmap = bytearray()
+        self._cache = ""
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def __str__(self) -> str:
+        return self.text
+
+    # ----------- 写入 ----------- #
+
+    def append(self, char:str, is_correct:bool) -> None:
+        """追加一个字符
+        Args:
+            char(str): 输入的字符
+            is_correct(bool): 该字符是否输入正确
+        """
+        index = len(self._codes)
+        self._codes.append(ord(char))
+
+        byte_index = index >> 3
+        if byte_index >= len(self._bitmap):
+            # 按倍数扩容，保证均摊 O(1)
+            self._bitmap.extend(bytes(len(self._bitmap) + 1))
+        mask = 1 << (index & 7)
+        if is_correct:
+            self._bitmap[byte_index] |= mask
+        else:
+            self._bitmap[byte_index] &= ~mask & 0xFF
+        self._cache = None
+
+    def extend(self, chars:str, error_offsets = ()) -> None:
+        """批量追加字符
+        Args:
+            chars(str): 输入的字符
+            error_offsets(iterable): chars 中输入错误的字符下标，其余均为正确
+        """
+        if not chars:
+            return
+        start = len(self._codes)
+        end = start + len(chars)
+        self._codes.frombytes(chars.encode(KeystrokeBuffer._ENCODING))
+
+        bitmap = self._bitmap
+        needed = ((end - 1) >> 3) + 1
+        if needed > len(bitmap):
+            bitmap.extend(bytes(max(needed - len(bitmap), len(bitmap))))
+
+        # 先把整个区间置为正确：首尾不完整的字节逐位处理，中间整字节赋值
+        first_full = (start + 7) >> 3
+        last_full = end >> 3
+        if first_full < last_full:
+            for index in range(start, first_full << 3):
+                bitmap[index >> 3] |= 1 << (index & 7)
+            bitmap[first_full:last_full] = b'\xff' * (last_full - first_full)
+            tail_start = last_full << 3
+        else:
+            tail_start = start
+        for index in range(tail_start, end):
+            bitmap[index >> 3] |= 1 << (index & 7)
+
+        for offset in error_offsets:
+            index = start + offset
+            bitmap[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+        self._cache = None
+
+    def pop(self) -> tuple:
+        """删除最后一个字符（退格）
+        Returns:
+            (char, is_correct)(tuple): 被删除的字符及其是否正确
+        """
+        if not self._codes:
+            raise IndexError("缓冲区为空！")
+        index = len(self._codes) - 1
+        char = chr(self._codes.pop())
+        self._cache = None
+        return char, self._bit(index)
+
+    def clear(self) -> None:
+        """清空缓冲区"""
+        self._codes = array(KeystrokeBuffer._TYPECODE)
+        self._bitmap = bytearray()
+        self._cache = ""
+
+    # ----------- 读取 ----------- #
+
+    def is_correct_at(self, index:int) -> bool:
+        """查询某位置是否输入正确
+        Args:
+            index(int): 位置
+        Returns:
+            is_correct(bool): 是否正确
+        """
+        if not 0 <= index < len(self._codes):
+            raise IndexError(index)
+        return self._bit(index)
+
+    def _bit(self, index:int) -> bool:
+        return bool(self._bitmap[index >> 3] & (1 << (index & 7)))
+
+    def last(self) -> str:
+        """获取最后一个输入的字符"""
+        if not self._codes:
+            return ""
+        return chr(self._codes[-1])
+
+    @property
+    def text(self) -> str:
+        """以字符串形式获取已输入内容（惰性生成并缓存）"""
+        if self._cache is None:
+            self._cache = self._codes.tobytes().decode(KeystrokeBuffer._ENCODING)
+        return self._cache
@@ -0,0 +1,209 @@
+"""数据库版本迁移
+
+每个迁移为 (版本号, SQL 语句列表)，按版本号递增执行，
+当前版本记录在 PRAGMA user_version 中。新增迁移只能追加到末尾，
+已发布的迁移不要修改。
+"""
+
+MIGRATIONS = (
+    # 1: 用户表（旧版本数据库中已存在）
+    (1, (
+        '''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            level TEXT DEFAULT 'beginner'
+        )
+        ''',
+    )),
+
+    # 2: 练习数据表与按键记录
+    (2, (
+        '''
+        CREATE TABLE IF NOT EXISTS sessions (
+            id INTEGER PRIMARY KEY,
+            user_id INTEGER,
+            started_at REAL,
+            ended_at REAL,
+            duration REAL,
+            total_chars INTEGER,
+            typed_chars INTEGER,
+            correct_chars INTEGER,
+            error_counts INTEGER,
+            wpm REAL,
+            raw_wpm REAL,
+            accuracy REAL,
+            error_analysis TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS keystrokes (
+            session_id INTEGER NOT NULL,
+            user_id INTEGER,
+            position INTEGER NOT NULL,
+            char TEXT NOT NULL,
+            expected TEXT,
+            is_correct INTEGER,
+            timestamp REAL NOT NULL
+        )
+        ''',
+    )),
+
+    # 3: 成就与应用设置
+    (3, (
+        '''
+        CREATE TABLE IF NOT EXISTS achievements (
+            user_id INTEGER NOT NULL,
+            code TEXT NOT NULL,
+            state TEXT,
+            unlocked_at REAL,
+            PRIMARY KEY (user_id, code)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS settings (
+            user_id INTEGER NOT NULL DEFAULT 0,
+            key TEXT NOT NULL,
+            value TEXT,
+            PRIMARY KEY (user_id, key)
+        ) WITHOUT ROWID
+        ''',
+    )),
+
+    # 4: 历史查询的覆盖索引
+    (4, (
+        # 按时间查询用户历史成绩（进度图表）
+        '''
+        CREATE INDEX IF NOT EXISTS idx_sessions_user_started
+        ON sessions (user_id, started_at, wpm, accuracy, duration)
+        ''',
+        # 按字符查询用户错误趋势（char 为应输入的字符）
+        '''
+        CREATE INDEX IF NOT EXISTS idx_keystrokes_user_char
+        ON keystrokes (user_id, expected, timestamp, is_correct)
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS idx_keystrokes_session
+        ON keystrokes (session_id)
+        ''',
+    )),
+
+    # 5: 进度与错误汇总表（由 ProgressRollup 维护），并从已有会话回填
+    (5, (
+        '''
+        CREATE TABLE IF NOT EXISTS progress_daily (
+            user_id INTEGER NOT NULL,
+            bucket TEXT NOT NULL,
+            sessions INTEGER NOT NULL,
+            duration REAL NOT NULL,
+            typed_chars INTEGER NOT NULL,
+            correct_chars INTEGER NOT NULL,
+            wpm_sum REAL NOT NULL,
+            best_wpm REAL NOT NULL,
+            accuracy_sum REAL NOT NULL,
+            PRIMARY KEY (user_id, bucket)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS progress_weekly (
+            user_id INTEGER NOT NULL,
+            bucket TEXT NOT NULL,
+            sessions INTEGER NOT NULL,
+            duration REAL NOT NULL,
+            typed_chars INTEGER NOT NULL,
+            correct_chars INTEGER NOT NULL,
+            wpm_sum REAL NOT NULL,
+            best_wpm REAL NOT NULL,
+            accuracy_sum REAL NOT NULL,
+            PRIMARY KEY (user_id, bucket)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS char_errors (
+            user_id INTEGER NOT NULL,
+            char TEXT NOT NULL,
+            errors INTEGER NOT NULL,
+            PRIMARY KEY (user_id, char)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        INSERT INTO progress_daily
+        SELECT COALESCE(user_id, 0), date(started_at, 'unixepoch', 'localtime'),
+               COUNT(*), SUM(COALESCE(duration, 0)), SUM(COALESCE(typed_chars, 0)),
+               SUM(COALESCE(correct_chars, 0)), SUM(COALESCE(wpm, 0)), MAX(COALESCE(wpm, 0)),
+               SUM(COALESCE(accuracy, 0))
+        FROM sessions GROUP BY 1, 2
+        ''',
+        '''
+        INSERT INTO progress_weekly
+        SELECT COALESCE(user_id, 0), date(started_at, 'unixepoch', 'localtime', 'weekday 0', '-6 days'),
+               COUNT(*), SUM(COALESCE(duration, 0)), SUM(COALESCE(typed_chars, 0)),
+               SUM(COALESCE(correct_chars, 0)), SUM(COALESCE(wpm, 0)), MAX(COALESCE(wpm, 0)),
+               SUM(COALESCE(accuracy, 0))
+        FROM sessions GROUP BY 1, 2
+        ''',
+        '''
+        INSERT INTO char_errors
+        SELECT COALESCE(sessions.user_id, 0), errors.key, SUM(errors.value)
+        FROM sessions, json_each(sessions.error_analysis) AS errors
+        WHERE errors.value > 0
+        GROUP BY 1, 2
+        ''',
+    )),
+
+    # 6: 按键间隔直方图（gram 为单个字符或相邻字符对，bucket 见 KeyLatency.BOUNDS）
+    (6, (
+        '''
+        CREATE TABLE IF NOT EXISTS key_latency (
+            user_id INTEGER NOT NULL,
+            gram TEXT NOT NULL,
+            bucket INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (user_id, gram, bucket)
+        ) WITHOUT ROWID
+        ''',
+    )),
+
+    # 7: 记单词卡片（间隔重复），按 (user_id, deck, next_due) 索引取出到期卡片
+    (7, (
+        '''
+        CREATE TABLE IF NOT EXISTS cards (
+            id INTEGER PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            deck TEXT NOT NULL,
+            word TEXT NOT NULL,
+            meaning TEXT,
+            repetitions INTEGER NOT NULL DEFAULT 0,
+            interval REAL NOT NULL DEFAULT 0,
+            ease REAL NOT NULL DEFAULT 2.5,
+            lapses INTEGER NOT NULL DEFAULT 0,
+            next_due REAL NOT NULL,
+            reviewed_at REAL,
+            UNIQUE (user_id, deck, word)
+        )
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS idx_cards_due
+        ON cards (user_id, deck, next_due)
+        ''',
+    )),
+
+    # 8: 会话编号分配表（AUTOINCREMENT 保证多个写入器、多个进程分配的编号不重复），
+    #    从已有的最大会话编号继续分配，表中只保留最近分配的一行
+    (8, (
+        '''
+        CREATE TABLE IF NOT EXISTS session_ids (
+            id INTEGER PRIMARY KEY AUTOINCREMENT
+        )
+        ''',
+        '''
+        INSERT INTO session_ids (id) SELECT MAX(
+            COALESCE((SELECT MAX(id) FROM sessions), 0),
+            COALESCE((SELECT MAX(session_id) FROM keystrokes), 0)
+        )
+        ''',
+    )),
+)
+
+LATEST_VERSION = MIGRATIONS[-1][0]
@@ -0,0 +1,271 @@
+import hashlib
+import marshal
+import os
+import random
+import re
+from array import array
+from itertools import accumulate
+
+from core.KeyLatency import KeyLatency
+from core.ProgressRollup import ProgressRollup
+
+# 单词：由字母组成，可包含撇号或连字符（don't, well-known）
+WORD_PATTERN = re.compile(r"[^\W\d_]+(?:['-][^\W\d_]+)*")
+
+
+def word_grams(word:str) -> set:
+    """单词包含的字符与字符对（含与前后空格组成的字符对）"""
+    padded = f" {word} "
+    return set(word) | {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+
+class CorpusIndex:
+    """语料库索引
+
+    扫描语料目录下的 .txt 文件，维护词表、词频以及「字符/字符对 -> 单词」的倒排表，
+    并缓存到磁盘。refresh() 只重新读取修改过的文件，新单词追加到词表末尾，
+    不再出现的单词词频归零，因此已有的单词编号与倒排表始终有效。
+    缓存放在应用的缓存目录中（以语料目录的绝对路径的哈希命名），不向语料目录写入任何文件，
+    只读的语料目录同样可用。
+    """
+
+    CACHE_VERSION = 2
+    CACHE_DIR = '.corpus_cache'
+    # 缓存文件头：格式标识与版本号
+    CACHE_HEADER = b'JTCORPUS%d\n' % CACHE_VERSION
+    EXTENSIONS = ('.txt',)
+
+    def __init__(self, corpus_dir:str, cache_dir:str = None):
+        """初始化索引（优先读取磁盘缓存）
+        Args:
+            corpus_dir(str): 语料目录
+            cache_dir(str): 缓存目录，默认为 CACHE_DIR
+        """
+        self.corpus_dir = corpus_dir
+        self.cache_dir = cache_dir or CorpusIndex.CACHE_DIR
+        digest = hashlib.sha1(os.path.abspath(corpus_dir).encode('utf-8', 'surrogatepass')).hexdigest()
+        self.cache_path = os.path.join(self.cache_dir, digest + '.index')
+        # 文件路径 -> (修改时间, 大小, {单词: 次数})
+        self.files = {}
+        self.words = []
+        self.word_ids = {}
+        self.counts = array('I')
+        self.postings = {}
+        self.cumulative = []
+        self.load()
+        self.refresh()
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    # ----------- 缓存 ----------- #
+
+    def load(self) -> bool:
+        """读取磁盘缓存
+
+        缓存以 marshal 保存，只包含字典、列表、元组、字符串、整数与字节串，
+        读取后逐项校验类型与编号范围，不会执行其中的任何内容。
+        读取或校验失败（文件损坏、版本不符、结构不对）时一律丢弃缓存，由 refresh() 重建。
+        Returns:
+            is_loaded(bool): 缓存存在且有效时为 True
+        """
+        try:
+            with open(self.cache_path, 'rb') as file:
+                if file.read(len(CorpusIndex.CACHE_HEADER)) != CorpusIndex.CACHE_HEADER:
+                    return False
+                files, words, counts, postings = marshal.loads(file.read())
+            if not (
+                type(files) is dict and type(words) is list and type(postings) is dict
+                and all(type(word) is str for word in words)
+                and all(
+                    type(path) is str and type(entry) is tuple and len(entry) == 3
+                    and type(entry[0]) is int and type(entry[1]) is int and type(entry[2]) is dict
+                    and all(type(word) is str and type(count) is int for word, count in entry[2].items())
+                    for path, entry in files.items()
+                )
+                and all(type(gram) is str for gram in postings)
+            ):
+                return False
+            counts = array('I', counts)
+            postings = {gram: array('I', ids) for gram, ids in postings.items()}
+            if len(counts) != len(words) or any(ids and max(ids) >= len(words) for ids in postings.values()):
+                return False
+        except Exception:
+            return False
+        self.files = files
+        self.words = words
+        self.counts = counts
+        self.postings = postings
+        self.word_ids = {word: i for i, word in enumerate(words)}
+        self.cumulative = list(accumulate(counts))
+        return True
+
+    def save(self) -> None:
+        """写入磁盘缓存（先写临时文件再替换，避免中断时损坏缓存）"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = self.cache_path + '.tmp'
+        with open(temp_path, 'wb') as file:
+            file.write(CorpusIndex.CACHE_HEADER)
+            file.write(marshal.dumps((
+                self.files,
+                self.words,
+                self.counts.tobytes(),
+                {gram: ids.tobytes() for gram, ids in self.postings.items()},
+            )))
+        os.replace(temp_path, self.cache_path)
+
+    # ----------- 增量更新 ----------- #
+
+    def scan(self) -> dict:
+        """列出语料文件
+        Returns:
+            files(dict): 文件路径 -> (修改时间, 大小)
+        """
+        found = {}
+        for root, _, names in os.walk(self.corpus_dir):
+            for name in names:
+                if name.endswith(CorpusIndex.EXTENSIONS):
+                    path = os.path.join(root, name)
+                    stat = os.stat(path)
+                    found[path] = (stat.st_mtime_ns, stat.st_size)
+        return found
+
+    def refresh(self) -> int:
+        """重新读取新增、修改或删除的语料文件并更新缓存
+        Returns:
+            changed(int): 发生变化的文件数
+        """
+        found = self.scan()
+        changed = 0
+        for path in list(self.files):
+            if path not in found:
+                self._add_counts(self.files.pop(path)[2], -1)
+                changed += 1
+        for path, signature in found.items():
+            entry = self.files.get(path)
+            if entry is not None and entry[:2] == signature:
+                continue
+            if entry is not None:
+                self._add_counts(entry[2], -1)
+            with open(path, encoding='utf-8', errors='replace') as file:
+                counts = {}
+                for word in WORD_PATTERN.findall(file.read()):
+                    counts[word] = counts.get(word, 0) + 1
+            self._add_counts(counts, 1)
+            self.files[path] = (*signature, counts)
+            changed += 1
+
+        if changed or not os.path.exists(self.cache_path):
+            self.cumulative = list(accumulate(self.counts))
+            try:
+                self.save()
+            except OSError:
+                # 缓存目录不可写时只是每次重新建立索引
+                pass
+        return changed
+
+    def _add_counts(self, counts:dict, sign:int) -> None:
+        word_ids = self.word_ids
+        for word, count in counts.items():
+            word_id = word_ids.get(word)
+            if word_id is None:
+                word_id = word_ids[word] = len(self.words)
+                self.words.append(word)
+                self.counts.append(0)
+                for gram in word_grams(word):
+                    postings = self.postings.get(gram)
+                    if postings is None:
+                        postings = self.postings[gram] = array('I')
+                    postings.append(word_id)
+            self.counts[word_id] += sign * count
+
+
+class PracticeGenerator:
+    """针对薄弱环节的练习文本生成器
+
+    按用户的出错字符与慢速字符对加权抽取单词：一部分单词来自包含薄弱字符的倒排表，
+    其余按词频抽取，保证练习文本仍然自然。抽样只访问少量倒排表，与语料大小基本无关。
+    """
+
+    # 每个薄弱字符/字符对最多考察的候选单词数
+    MAX_CANDIDATES = 2000
+    # 最多参与加权的薄弱字符/字符对数量
+    MAX_WEAK_GRAMS = 20
+
+    def __init__(self, index:CorpusIndex, seed:int = None):
+        """初始化生成器
+        Args:
+            index(CorpusIndex): 语料库索引
+            seed(int): 随机种子，便于复现
+        """
+        self.index = index
+        self.random = random.Random(seed)
+
+    def generate(
+        self,
+        words:int = 500,
+        error_analysis:dict = None,
+        slow_bigrams = None,
+        focus:float = 0.6
+    ) -> str:
+        """生成一段练习文本
+        Args:
+            words(int): 单词数
+            error_analysis(dict): 字符 -> 出错次数（TypingEngine.error_analysis）
+            slow_bigrams(list): KeyLatency.slowest_bigrams() 的结果 [(字符对, 间隔, 样本数), ...]
+            focus(float): 来自薄弱环节的单词比例
+        Returns:
+            text(str): 以空格分隔的练习文本
+        """
+        index = self.index
+        if not index.cumulative or index.cumulative[-1] == 0:
+            raise ValueError("语料库为空！")
+        rng = self.random
+
+        weights = _normalize(error_analysis or {})
+        for gram, weight in _normalize({row[0]: row[1] for row in slow_bigrams or ()}).items():
+            weights[gram] = weights.get(gram, 0) + weight
+
+        # 候选单词得分 = 所含薄弱字符/字符对的权重之和
+        scores = {}
+        counts = index.counts
+        for gram, weight in sorted(weights.items(), key=lambda item: -item[1])[:PracticeGenerator.MAX_WEAK_GRAMS]:
+            postings = index.postings.get(gram)
+            if not postings:
+                continue
+            if len(postings) > PracticeGenerator.MAX_CANDIDATES:
+                start = rng.randrange(len(postings) - PracticeGenerator.MAX_CANDIDATES + 1)
+                postings = postings[start:start + PracticeGenerator.MAX_CANDIDATES]
+            for word_id in postings:
+                if counts[word_id]:
+                    scores[word_id] = scores.get(word_id, 0) + weight
+
+        focused = round(words * focus) if scores else 0
+        chosen = rng.choices(range(len(index.words)), cum_weights=index.cumulative, k=words - focused)
+        if focused:
+            chosen += rng.choices(list(scores), weights=list(scores.values()), k=focused)
+        rng.shuffle(chosen)
+        return " ".join([index.words[word_id] for word_id in chosen])
+
+
+def weak_spots(database, user_id:int, limit:int = PracticeGenerator.MAX_WEAK_GRAMS) -> tuple:
+    """读取用户历史上的薄弱环节
+    Args:
+        database(DatabaseManger): 数据库管理器
+        user_id(int): 用户编号
+        limit(int): 字符与字符对各取多少个
+    Returns:
+        (error_analysis, slow_bigrams)(tuple): 可直接传给 PracticeGenerator.generate
+    """
+    error_analysis = dict(ProgressRollup(database).common_errors(user_id, limit))
+    slow_bigrams = KeyLatency.load(database, user_id).slowest_bigrams(limit)
+    return error_analysis, slow_bigrams
+
+
+def _normalize(values:dict) -> dict:
+    """把数值缩放到 (0, 1]，忽略非正数"""
+    values = {key: value for key, value in values.items() if value and value > 0}
+    if not values:
+        return {}
+    largest = max(values.values())
+    return {key: value / largest for key, value in values.items()}
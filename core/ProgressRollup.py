@@ -0,0 +1,185 @@
+import math
+import sys
+
+from core.DatabaseManager import DatabaseManger
+
+class ProgressRollup:
+    """进度汇总表维护
+
+    每保存一次会话，就把它累加进按日、按周的成绩汇总表和按字符的错误汇总表，
+    图表查询只需读取 O(桶数) 行，不再扫描全部会话。
+    汇总表可随时由 rebuild() 从 sessions 重新生成，由 check() 校验一致性。
+    """
+
+    # 汇总表名 -> 分桶表达式（本地时间，周从周一开始）
+    BUCKETS = {
+        'progress_daily': "date(started_at, 'unixepoch', 'localtime')",
+        'progress_weekly': "date(started_at, 'unixepoch', 'localtime', 'weekday 0', '-6 days')",
+    }
+
+    # 汇总列 -> (单个会话的取值, 合并方式)
+    COLUMNS = {
+        'sessions': ("1", "{0} + excluded.{0}"),
+        'duration': ("COALESCE(duration, 0)", "{0} + excluded.{0}"),
+        'typed_chars': ("COALESCE(typed_chars, 0)", "{0} + excluded.{0}"),
+        'correct_chars': ("COALESCE(correct_chars, 0)", "{0} + excluded.{0}"),
+        'wpm_sum': ("COALESCE(wpm, 0)", "{0} + excluded.{0}"),
+        'best_wpm': ("COALESCE(wpm, 0)", "MAX({0}, excluded.{0})"),
+        'accuracy_sum': ("COALESCE(accuracy, 0)", "{0} + excluded.{0}"),
+    }
+    # 重新生成时各列的聚合函数
+    AGGREGATES = {
+        'sessions': "COUNT(*)",
+        'best_wpm': "MAX({})",
+    }
+
+    CHAR_ERRORS_UPSERT = '''
+        INSERT INTO char_errors (user_id, char, errors)
+        SELECT COALESCE(sessions.user_id, 0), errors.key, errors.value
+        FROM sessions, json_each(sessions.error_analysis) AS errors
+        WHERE sessions.id = ? AND errors.value > 0
+        ON CONFLICT (user_id, char) DO UPDATE SET errors = errors + excluded.errors
+    '''
+    CHAR_ERRORS_SELECT = '''
+        SELECT COALESCE(sessions.user_id, 0), errors.key, SUM(errors.value)
+        FROM sessions, json_each(sessions.error_analysis) AS errors
+        WHERE errors.value > 0
+        GROUP BY 1, 2
+    '''
+
+    def __init__(self, database:DatabaseManger):
+        """初始化汇总维护
+        Args:
+            database(DatabaseManger): 数据库管理器
+        """
+        self.database = database
+        columns = ", ".join(ProgressRollup.COLUMNS)
+        self.upserts = []
+        self.rebuilds = []
+        for table, bucket in ProgressRollup.BUCKETS.items():
+            values = ", ".join(value for value, _ in ProgressRollup.COLUMNS.values())
+            merges = ", ".join(
+                f"{column} = " + merge.format(column)
+                for column, (_, merge) in ProgressRollup.COLUMNS.items()
+            )
+            self.upserts.append(f'''
+                INSERT INTO {table} (user_id, bucket, {columns})
+                SELECT COALESCE(user_id, 0), {bucket}, {values} FROM sessions WHERE id = ?
+                ON CONFLICT (user_id, bucket) DO UPDATE SET {merges}
+            ''')
+            aggregates = ", ".join(
+                ProgressRollup.AGGREGATES.get(column, "SUM({})").format(value)
+                for column, (value, _) in ProgressRollup.COLUMNS.items()
+            )
+            self.rebuilds.append((table, f'''
+                SELECT COALESCE(user_id, 0), {bucket}, {aggregates}
+                FROM sessions GROUP BY 1, 2
+            '''))
+
+    # ----------- 增量维护 ----------- #
+
+    def apply(self, conn, session_ids:list) -> None:
+        """把新保存的会话累加进汇总表（应与会话写入处于同一事务中）
+        Args:
+            conn(sqlite3.Connection): 当前事务所在的连接
+            session_ids(list): 新保存的会话编号
+        """
+        parameters = [(session_id,) for session_id in session_ids]
+        for upsert in self.upserts:
+            conn.executemany(upsert, parameters)
+        conn.executemany(ProgressRollup.CHAR_ERRORS_UPSERT, parameters)
+
+    def rebuild(self) -> None:
+        """从 sessions 重新生成全部汇总表"""
+        columns = ", ".join(ProgressRollup.COLUMNS)
+        with self.database.transaction() as conn:
+            for table, select in self.rebuilds:
+                conn.execute(f"DELETE FROM {table}")
+                conn.execute(f"INSERT INTO {table} (user_id, bucket, {columns}) {select}")
+            conn.execute("DELETE FROM char_errors")
+            conn.execute(
+                "INSERT INTO char_errors (user_id, char, errors) " + ProgressRollup.CHAR_ERRORS_SELECT
+            )
+
+    def check(self) -> list:
+        """校验汇总表与 sessions 是否一致
+        Returns:
+            mismatches(list): 不一致的条目 [(表名, 键, 汇总值, 实际值), ...]，一致时为空
+        """
+        columns = ", ".join(ProgressRollup.COLUMNS)
+        mismatches = []
+        for table, select in self.rebuilds:
+            stored = {
+                row[:2]: row[2:]
+                for row in self.database.query(f"SELECT user_id, bucket, {columns} FROM {table}")
+            }
+            expected = {row[:2]: row[2:] for row in self.database.query(select)}
+            mismatches.extend(_compare(table, stored, expected))
+
+        stored = {row[:2]: row[2:] for row in self.database.query("SELECT user_id, char, errors FROM char_errors")}
+        expected = {row[:2]: row[2:] for row in self.database.query(ProgressRollup.CHAR_ERRORS_SELECT)}
+        mismatches.extend(_compare('char_errors', stored, expected))
+        return mismatches
+
+    # ----------- 图表查询 ----------- #
+
+    def progress(self, user_id:int, weekly:bool = False, since:str = None) -> list:
+        """获取用户的进度曲线数据
+        Args:
+            user_id(int): 用户编号
+            weekly(bool): 按周（True）或按日（False）汇总
+            since(str): 起始日期（YYYY-MM-DD），为空时返回全部
+        Returns:
+            rows(list): [(日期, 练习次数, 平均WPM, 最高WPM, 平均准确率), ...]
+        """
+        table = 'progress_weekly' if weekly else 'progress_daily'
+        return self.database.query(f'''
+            SELECT bucket, sessions, wpm_sum / sessions, best_wpm, accuracy_sum / sessions
+            FROM {table} WHERE user_id = ? AND bucket >= ? ORDER BY bucket
+        ''', (user_id or 0, since or ''))
+
+    def common_errors(self, user_id:int, limit:int = 10) -> list:
+        """获取用户最常出错的字符
+        Args:
+            user_id(int): 用户编号
+            limit(int): 返回数量
+        Returns:
+            rows(list): [(字符, 错误次数), ...]
+        """
+        return self.database.query('''
+            SELECT char, errors FROM char_errors
+            WHERE user_id = ? ORDER BY errors DESC LIMIT ?
+        ''', (user_id or 0, limit))
+
+
+def _compare(table:str, stored:dict, expected:dict) -> list:
+    """比较两组汇总值（浮点数按相对误差比较）"""
+    mismatches = []
+    for key in stored.keys() | expected.keys():
+        actual = stored.get(key)
+        wanted = expected.get(key)
+        if actual is None or wanted is None or not all(
+            math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-6) for a, b in zip(actual, wanted)
+        ):
+            mismatches.append((table, key, actual, wanted))
+    return mismatches
+
+
+# ----------- 命令行 ----------- #
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else 'check'
+    database = DatabaseManger(sys.argv[2] if len(sys.argv) > 2 else None)
+    rollup = ProgressRollup(database)
+    if command == 'rebuild':
+        rollup.rebuild()
+        print("汇总表已重新生成！")
+    elif command == 'check':
+        mismatches = rollup.check()
+        for mismatch in mismatches:
+            print("不一致:", *mismatch)
+        print("汇总表一致！" if not mismatches else f"共 {len(mismatches)} 处不一致！")
+        sys.exit(1 if mismatches else 0)
+    else:
+        print("用法: python -m core.ProgressRollup [rebuild|check] [数据库路径]")
+        sys.exit(2)
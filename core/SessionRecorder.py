@@ -0,0 +1,222 @@
+import json
+import time
+
+from core.Clock import VirtualClock, NS_PER_SECOND
+
+# 录制文件格式：
+#   MAGIC | 版本(1 字节) | varint(元数据长度) | 元数据(JSON, UTF-8) | 事件...
+# 每个事件为 varint(标记) + varint(距上一事件的纳秒数)。
+# 标记的最低位区分两类事件：字符为 码位 << 1，控制事件为 (事件 << 1) | 1，
+# 因此任何码位（包括 U+0000、U+0008）都能原样回放。
+# 版本 1 中字符直接以码位记录，码位 0/1/2/8 与控制事件共用，只读兼容。
+MAGIC = b'JTRC'
+VERSION = 2
+LEGACY_VERSION = 1
+
+# 控制事件：会话结束、暂停、恢复、退格
+END = 0
+PAUSE = 1
+RESUME = 2
+BACKSPACE = 8
+
+
+def write_varint(buffer:bytearray, value:int) -> None:
+    """以 LEB128 变长编码写入非负整数"""
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def read_varint(data:bytes, offset:int) -> tuple:
+    """读取一个变长编码的整数
+    Returns:
+        (value, offset)(tuple): 解码出的整数及下一个字节的位置
+    """
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+
+
+def read_varints(data:bytes, offset:int = 0):
+    """从 offset 开始依次读取变长编码的整数
+    Yields:
+        value(int): 解码出的整数
+    """
+    value = shift = 0
+    for byte in memoryview(data)[offset:]:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            yield value
+            value = shift = 0
+
+
+class SessionRecorder:
+    """会话录制器
+
+    记录每次按键的码位与时间间隔，事件在内存中以变长编码追加，
+    会话结束时一次性写入文件，不影响输入处理。
+    字符与控制事件的标记用最低位区分，互不冲突。
+    """
+
+    def __init__(self, path:str, metadata:dict = None):
+        """初始化录制器
+        Args:
+            path(str): 录制文件路径
+            metadata(dict): 附加信息（例如练习文本、用户编号）
+        """
+        self.path = path
+        self.metadata = dict(metadata or {})
+        self.events = bytearray()
+        self.last_ns = None
+        self.count = 0
+
+    def start(self, timestamp:int) -> None:
+        """开始录制
+        Args:
+            timestamp(int): 会话开始时刻（纳秒）
+        """
+        self.events.clear()
+        self.count = 0
+        self.metadata['started_at'] = timestamp
+        self.last_ns = timestamp
+
+    def record_char(self, char:str, timestamp:int) -> None:
+        """记录一次字符输入
+        Args:
+            char(str): 输入的字符
+            timestamp(int): 按键时刻（纳秒）
+        """
+        events = self.events
+        write_varint(events, ord(char) << 1)
+        write_varint(events, max(0, timestamp - self.last_ns))
+        self.last_ns = timestamp
+        self.count += 1
+
+    def record(self, event:int, timestamp:int) -> None:
+        """记录一个控制事件
+        Args:
+            event(int): 控制事件（END/PAUSE/RESUME/BACKSPACE）
+            timestamp(int): 事件时刻（纳秒）
+        """
+        events = self.events
+        write_varint(events, event << 1 | 1)
+        write_varint(events, max(0, timestamp - self.last_ns))
+        self.last_ns = timestamp
+        self.count += 1
+
+    def finish(self, timestamp:int) -> None:
+        """记录会话结束并写入文件
+        Args:
+            timestamp(int): 会话结束时刻（纳秒）
+        """
+        self.record(END, timestamp)
+        self.save()
+
+    def save(self) -> None:
+        """把录制内容写入文件"""
+        metadata = json.dumps(self.metadata, ensure_ascii=False).encode('utf-8')
+        header = bytearray(MAGIC)
+        header.append(VERSION)
+        write_varint(header, len(metadata))
+        with open(self.path, 'wb') as file:
+            file.write(header)
+            file.write(metadata)
+            file.write(self.events)
+
+
+class SessionReplayer:
+    """会话回放器
+
+    读取录制文件，以虚拟时钟驱动 TypingEngine：
+    可以不等待地全速回放，也可以按录制时的节奏实时回放。
+    """
+
+    def __init__(self, path:str):
+        """读取录制文件
+        Args:
+            path(str): 录制文件路径
+        """
+        with open(path, 'rb') as file:
+            data = file.read()
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError("不是有效的录制文件！")
+        version = data[len(MAGIC)]
+        if version not in (VERSION, LEGACY_VERSION):
+            raise ValueError(f"不支持的录制文件版本: {version}")
+
+        metadata_length, offset = read_varint(data, len(MAGIC) + 1)
+        self.metadata = json.loads(data[offset:offset + metadata_length].decode('utf-8'))
+
+        # 事件列表 [(字符或控制事件, 相对会话开始的纳秒数), ...]，字符为 str，控制事件为 int
+        self.events = []
+        elapsed = 0
+        values = read_varints(data, offset + metadata_length)
+        for tag in values:
+            elapsed += next(values)
+            if version == LEGACY_VERSION:
+                code = tag if tag in (END, PAUSE, RESUME, BACKSPACE) else chr(tag)
+            else:
+                code = tag >> 1 if tag & 1 else chr(tag >> 1)
+            self.events.append((code, elapsed))
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def replay(self, engine, realtime:bool = False, batch:bool = True) -> None:
+        """回放到引擎中
+        Args:
+            engine(TypingEngine): 已加载文本的打字引擎
+            realtime(bool): 是否按录制时的节奏回放
+            batch(bool): 全速回放时是否把连续字符合并为一次 process_inputs
+        """
+        clock = VirtualClock(self.metadata.get('started_at', 0))
+        engine.clock = clock
+        engine.start_session()
+        base = engine.start_time
+        real_start = time.perf_counter_ns()
+
+        chars = []
+        timestamps = []
+
+        def flush():
+            if chars:
+                engine.process_inputs("".join(chars), timestamps)
+                chars.clear()
+                timestamps.clear()
+
+        for code, elapsed in self.events:
+            timestamp = base + elapsed
+            if realtime:
+                delay = elapsed - (time.perf_counter_ns() - real_start)
+                if delay > 0:
+                    time.sleep(delay / NS_PER_SECOND)
+
+            is_char = isinstance(code, str)
+            if is_char and batch and not realtime:
+                chars.append(code)
+                timestamps.append(timestamp)
+                continue
+            flush()
+            clock.now = timestamp
+
+            if is_char:
+                engine.process_input(code, timestamp)
+            elif code == END:
+                engine.end_session()
+            elif code == PAUSE:
+                engine.pause_session()
+            elif code == RESUME:
+                engine.resume_session()
+            elif code == BACKSPACE:
+                engine.backspace()
+        if chars:
+            clock.now = timestamps[-1]
+            flush()
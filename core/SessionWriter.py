@@ -0,0 +1,335 @@
+import json
+import queue
+import threading
+import time
+from collections import deque
+
+from core.DatabaseManager import DatabaseManger
+from core.Instrumentation import Instrumentation, DB_WRITE
+from core.ProgressRollup import ProgressRollup
+
+class SessionWriter:
+    """练习数据后台写入器
+
+    输入线程只把事件放入有界队列（不会等待磁盘 I/O），
+    由唯一的写入线程按批量大小或刷新间隔合并提交（group commit）。
+    队列已满时按键记录方法立即返回 False，作为背压信号交给调用方处理，
+    被丢弃的按键数记录在 dropped_keystrokes 中。
+    提交失败时该批数据被丢弃，错误在下一次 flush() 或 close() 时抛出。
+    会话编号也由写入线程按块预先申请，开始会话时不在调用线程中开启写事务。
+    """
+
+    DEFAULT_FLUSH_INTERVAL = 0.5
+    DEFAULT_BATCH_SIZE = 1000
+    DEFAULT_MAX_PENDING = 100_000
+    # 每次向数据库申请的会话编号数，剩余不足 ID_LOW_WATER 个时提前补充
+    ID_BLOCK = 16
+    ID_LOW_WATER = 4
+
+    INSERT_KEYSTROKE = '''
+        INSERT INTO keystrokes (session_id, user_id, position, char, expected, is_correct, timestamp)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    '''
+    INSERT_SESSION = '''
+        INSERT INTO sessions (
+            id, user_id, started_at, ended_at, duration, total_chars, typed_chars,
+            correct_chars, error_counts, wpm, raw_wpm, accuracy, error_analysis
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+    NEW_SESSION_ID = "INSERT INTO session_ids DEFAULT VALUES"
+    RESERVE_SESSION_IDS = "INSERT INTO session_ids (id) VALUES (?)"
+    TRIM_SESSION_IDS = "DELETE FROM session_ids WHERE id < ?"
+    UPSERT_LATENCY = '''
+        INSERT INTO key_latency (user_id, gram, bucket, count) VALUES (?, ?, ?, ?)
+        ON CONFLICT (user_id, gram, bucket) DO UPDATE SET count = count + excluded.count
+    '''
+
+    # 队列中的事件类型
+    _KEYSTROKE = 0
+    _KEYSTROKES = 1
+    _SESSION = 2
+    _FLUSH = 3
+    _STOP = 4
+    _LATENCY = 5
+    _RESERVE = 6
+
+    def __init__(
+        self,
+        database:DatabaseManger,
+        flush_interval:float = DEFAULT_FLUSH_INTERVAL,
+        batch_size:int = DEFAULT_BATCH_SIZE,
+        max_pending:int = DEFAULT_MAX_PENDING
+    ):
+        """初始化写入器并启动写入线程
+        Args:
+            database(DatabaseManger): 数据库管理器
+            flush_interval(float): 最长刷新间隔（秒）
+            batch_size(int): 累计多少条事件后立即提交
+            max_pending(int): 队列容量上限
+        """
+        self.database = database
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.events = queue.Queue(maxsize=max_pending)
+        # 队列已满而被丢弃的事件数与按键数
+        self.dropped = 0
+        self.dropped_keystrokes = 0
+        # 写入线程中最近一次提交失败的错误，以及因提交失败而丢弃的按键数与会话数
+        self.error = None
+        self.lost_keystrokes = 0
+        self.lost_sessions = 0
+        # 写入线程预先申请的会话编号，以及申请失败的错误
+        self.session_ids = deque()
+        self.ids_ready = threading.Condition()
+        self.ids_requested = True
+        self.id_error = None
+        # 表结构由 DatabaseManger.migrate 创建
+        self.rollup = ProgressRollup(database)
+
+        self.thread = threading.Thread(target=self._run, name="SessionWriter", daemon=True)
+        self.thread.start()
+
+    # ----------- 生产者接口（不阻塞） ----------- #
+
+    def new_session_id(self) -> int:
+        """分配一个新的会话编号
+        编号由写入线程按块向数据库的 AUTOINCREMENT 申请，多个写入器或多个进程同时使用
+        同一个数据库时也不会重复（未用完的编号在关闭后留空）。调用方只从本地取出一个，
+        只有写入线程还没来得及申请时才等待它，不会在调用线程中等待数据库的写锁。
+        Raises:
+            RuntimeError: 写入器已关闭，或写入线程申请编号失败
+        """
+        with self.ids_ready:
+            if not self.session_ids:
+                if not self.thread.is_alive():
+                    raise RuntimeError("写入器已关闭，无法分配会话编号！")
+                self.id_error = None
+                self._request_ids()
+                while not self.session_ids and self.id_error is None:
+                    self.ids_ready.wait()
+                if not self.session_ids:
+                    error, self.id_error = self.id_error, None
+                    raise RuntimeError("会话编号分配失败！") from error
+            session_id = self.session_ids.popleft()
+            if len(self.session_ids) < SessionWriter.ID_LOW_WATER:
+                self._request_ids()
+        return session_id
+
+    def _request_ids(self) -> None:
+        """通知写入线程补充会话编号（持有 ids_ready 时调用）"""
+        if self.ids_requested:
+            return
+        self.ids_requested = True
+        try:
+            self.events.put_nowait((SessionWriter._RESERVE, None))
+        except queue.Full:
+            # 写入线程正忙，处理下一个事件时就会看到请求
+            pass
+
+    def record_keystroke(
+        self, session_id:int, user_id:int, position:int,
+        char:str, expected:str, is_correct, timestamp:float
+    ) -> bool:
+        """记录一次按键
+        Returns:
+            is_accepted(bool): 队列已满时返回 False
+        """
+        return self._offer((SessionWriter._KEYSTROKE, (
+            session_id, user_id, position, char, expected, is_correct, timestamp
+        )), 1)
+
+    def record_keystrokes(self, rows:list) -> bool:
+        """批量记录按键（整批只占用一个队列位置）
+        Args:
+            rows(list): [(session_id, user_id, position, char, expected, is_correct, timestamp), ...]
+        Returns:
+            is_accepted(bool): 队列已满时返回 False
+        """
+        return self._offer((SessionWriter._KEYSTROKES, rows), len(rows))
+
+    def record_session(self, session_id:int, user_id:int, stats:dict) -> None:
+        """记录一次会话汇总（每个会话只记录一次，队列已满时等待而不丢弃）
+        Args:
+            session_id(int): 会话编号
+            user_id(int): 用户编号
+            stats(dict): TypingEngine.get_stats() 返回的统计信息
+        """
+        self.events.put((SessionWriter._SESSION, (
+            session_id,
+            user_id,
+            stats['start_time'],
+            stats['end_time'],
+            stats['duration_time'],
+            stats['total_chars'],
+            stats['typed_chars'],
+            stats['correct_chars'],
+            stats['error_counts'],
+            stats['wpm'],
+            stats['raw_wpm'],
+            stats['accuracy'],
+            json.dumps(stats['error_analysis'], ensure_ascii=False)
+        )))
+
+    def record_latency(self, rows:list) -> None:
+        """累加一次会话的按键间隔直方图（队列已满时等待而不丢弃）
+        Args:
+            rows(list): KeyLatency.rows() 导出的 [(user_id, gram, bucket, count), ...]
+        """
+        self.events.put((SessionWriter._LATENCY, rows))
+
+    def _offer(self, event:tuple, keystrokes:int) -> bool:
+        try:
+            self.events.put_nowait(event)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            self.dropped_keystrokes += keystrokes
+            return False
+
+    # ----------- 同步接口 ----------- #
+
+    def flush(self, durable:bool = True, timeout:float = None) -> bool:
+        """等待此前的所有事件写入数据库
+        Args:
+            durable(bool): 是否以 synchronous=FULL 提交，确保断电后数据不丢失
+            timeout(float): 最长等待时间（秒）
+        Returns:
+            is_flushed(bool): 是否在超时前完成
+        Raises:
+            RuntimeError: 此前有提交失败（该批数据已丢弃）
+        """
+        done = threading.Event()
+        self.events.put((SessionWriter._FLUSH, (done, durable)))
+        is_flushed = done.wait(timeout)
+        self._raise_error()
+        return is_flushed
+
+    def close(self) -> None:
+        """写入剩余事件并停止写入线程
+        Raises:
+            RuntimeError: 此前有提交失败（该批数据已丢弃）
+        """
+        if self.thread.is_alive():
+            self.events.put((SessionWriter._STOP, None))
+            self.thread.join()
+        self._raise_error()
+
+    def _raise_error(self) -> None:
+        """抛出写入线程记录的提交错误（每个错误只抛出一次）"""
+        error = self.error
+        if error is None:
+            return
+        self.error = None
+        raise RuntimeError(
+            f"练习数据写入失败，累计丢弃 {self.lost_keystrokes} 条按键、{self.lost_sessions} 个会话！"
+        ) from error
+
+    # ----------- 写入线程 ----------- #
+
+    def _run(self) -> None:
+        keystrokes = []
+        sessions = []
+        latencies = []
+        deadline = None
+        probe = Instrumentation.shared()
+        while True:
+            if self.ids_requested:
+                self._reserve_ids()
+            try:
+                if deadline is None:
+                    # 没有待写入的数据时一直等待，不做空轮询
+                    kind, payload = self.events.get()
+                else:
+                    kind, payload = self.events.get(timeout=max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                kind, payload = None, None
+            if kind == SessionWriter._RESERVE:
+                # 只用于唤醒写入线程，编号在循环开头申请
+                continue
+
+            if kind == SessionWriter._KEYSTROKE:
+                keystrokes.append(payload)
+            elif kind == SessionWriter._KEYSTROKES:
+                keystrokes.extend(payload)
+            elif kind == SessionWriter._SESSION:
+                sessions.append(payload)
+            elif kind == SessionWriter._LATENCY:
+                latencies.extend(payload)
+            if deadline is None and kind in (
+                SessionWriter._KEYSTROKE, SessionWriter._KEYSTROKES,
+                SessionWriter._SESSION, SessionWriter._LATENCY
+            ):
+                deadline = time.monotonic() + self.flush_interval
+
+            is_due = (
+                kind is None
+                or kind in (SessionWriter._FLUSH, SessionWriter._STOP)
+                or len(keystrokes) + len(sessions) >= self.batch_size
+                or time.monotonic() >= deadline
+            )
+            if not is_due:
+                continue
+
+            durable = kind == SessionWriter._STOP or (kind == SessionWriter._FLUSH and payload[1])
+            if probe is None:
+                self._commit(keystrokes, sessions, latencies, durable)
+            else:
+                started = probe.begin(DB_WRITE)
+                self._commit(keystrokes, sessions, latencies, durable)
+                probe.end(DB_WRITE, started)
+            keystrokes = []
+            sessions = []
+            latencies = []
+            deadline = None
+
+            if kind == SessionWriter._FLUSH:
+                payload[0].set()
+            elif kind == SessionWriter._STOP:
+                return
+
+    def _reserve_ids(self) -> None:
+        """申请一块连续的会话编号（写入线程中执行的短事务）"""
+        first = last = error = None
+        try:
+            with self.database.transaction() as conn:
+                first = conn.execute(SessionWriter.NEW_SESSION_ID).lastrowid
+                last = first + SessionWriter.ID_BLOCK - 1
+                conn.execute(SessionWriter.RESERVE_SESSION_IDS, (last,))
+                conn.execute(SessionWriter.TRIM_SESSION_IDS, (last,))
+        except Exception as exception:
+            error = exception
+        with self.ids_ready:
+            self.ids_requested = False
+            self.id_error = error
+            if error is None:
+                self.session_ids.extend(range(first, last + 1))
+            self.ids_ready.notify_all()
+
+    def _commit(self, keystrokes:list, sessions:list, latencies:list, durable:bool) -> None:
+        """在一个事务中批量写入"""
+        conn = self.database.get_connection()
+        if not keystrokes and not sessions and not latencies:
+            if durable:
+                # 没有新数据时，把此前以 NORMAL 模式提交的 WAL 落盘
+                conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+            return
+        try:
+            if durable:
+                conn.execute("PRAGMA synchronous = FULL")
+            with self.database.transaction():
+                if keystrokes:
+                    conn.executemany(SessionWriter.INSERT_KEYSTROKE, keystrokes)
+                if sessions:
+                    conn.executemany(SessionWriter.INSERT_SESSION, sessions)
+                    # 同一事务内更新进度汇总表
+                    self.rollup.apply(conn, [session[0] for session in sessions])
+                if latencies:
+                    conn.executemany(SessionWriter.UPSERT_LATENCY, latencies)
+        except Exception as error:
+            # 写入线程不能退出，记录错误，由 flush() 或 close() 抛给调用方
+            self.lost_keystrokes += len(keystrokes)
+            self.lost_sessions += len(sessions)
+            self.error = error
+        finally:
+            if durable:
+                conn.execute("PRAGMA synchronous = NORMAL")
@@ -0,0 +1,180 @@
+import threading
+from bisect import bisect_left
+from collections import deque, namedtuple
+
+from core.Clock import NS_PER_SECOND
+
+StatsSnapshot = namedtuple('StatsSnapshot', (
+    'typed_chars',
+    'correct_chars',
+    'error_counts',
+    'duration_time',
+    'wpm',
+    'raw_wpm',
+    'window_wpm',
+    'accuracy',
+    'error_rate'
+))
+StatsSnapshot.__doc__ = "统计快照（不可变，数值未经舍入，duration_time 单位为秒）"
+_new_snapshot = tuple.__new__
+
+
+class StatsAccumulator:
+    """统计累加器
+
+    每次按键时增量更新计数，快照的生成为 O(1)，
+    在数据未变化时直接复用上一次的快照对象。
+
+    按键由输入线程记录，快照可能由调度线程获取：滚动窗口队列的修改与读取都在 lock 内进行，
+    缓存的快照与其键放在同一个元组中整体替换。
+    """
+
+    __slots__ = (
+        'window', 'typed_chars', 'correct_chars', 'error_counts',
+        'recent', 'lock', 'version', '_snapshot'
+    )
+
+    DEFAULT_WINDOW = 10 * NS_PER_SECOND
+
+    # 每分钟 5 个字符记为 1 个单词：WPM = 字符数 * 12 / 秒数
+    WPM_FACTOR = 12 * NS_PER_SECOND
+
+    def __init__(self, window:int = DEFAULT_WINDOW):
+        """初始化统计累加器
+        Args:
+            window(int): 滚动窗口长度（纳秒），用于计算近期 WPM
+        """
+        self.window = window
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """清空所有统计"""
+        self.typed_chars = 0
+        self.correct_chars = 0
+        self.error_counts = 0
+        # 滚动窗口内正确按键的时间戳
+        self.recent = deque()
+        self.version = 0
+        # (键, 快照)
+        self._snapshot = (None, None)
+
+    # ----------- 增量更新 ----------- #
+
+    def record(self, is_correct:bool, timestamp:int) -> None:
+        """记录一次按键
+        Args:
+            is_correct(bool): 是否输入正确
+            timestamp(int): 按键时间（纳秒）
+        """
+        self.typed_chars += 1
+        self.version += 1
+        if is_correct:
+            self.correct_chars += 1
+            recent = self.recent
+            with self.lock:
+                recent.append(timestamp)
+                if recent[0] < timestamp - self.window:
+                    self._expire(timestamp)
+        else:
+            self.error_counts += 1
+
+    def record_many(self, timestamps, error_offsets = ()) -> None:
+        """批量记录按键
+        Args:
+            timestamps(list): 每次按键的时间（纳秒），按时间顺序
+            error_offsets(list): 输入错误的按键下标
+        """
+        count = len(timestamps)
+        if count == 0:
+            return
+        errors = len(error_offsets)
+        self.typed_chars += count
+        self.correct_chars += count - errors
+        self.error_counts += errors
+
+        # 只有落在滚动窗口内的按键需要进入队列
+        first = bisect_left(timestamps, timestamps[-1] - self.window)
+        if errors:
+            is_error = set(error_offsets)
+            tail = [timestamps[i] for i in range(first, count) if i not in is_error]
+        else:
+            tail = timestamps[first:]
+        with self.lock:
+            self.recent.extend(tail)
+            if self.recent:
+                self._expire(timestamps[-1])
+        self.version += 1
+
+    def undo(self, was_correct:bool) -> None:
+        """撤销最后一次按键（退格）
+        Args:
+            was_correct(bool): 被撤销的按键是否正确
+        """
+        self.typed_chars -= 1
+        if was_correct:
+            self.correct_chars -= 1
+            with self.lock:
+                if self.recent:
+                    self.recent.pop()
+        else:
+            self.error_counts -= 1
+        self.version += 1
+
+    def _expire(self, now:int) -> None:
+        """移除滚动窗口之外的按键（调用方需持有 lock）"""
+        recent = self.recent
+        deadline = now - self.window
+        while recent and recent[0] < deadline:
+            recent.popleft()
+
+    # ----------- 快照 ----------- #
+
+    def snapshot(self, duration_time:int, now:int = None) -> StatsSnapshot:
+        """获取统计快照
+        Args:
+            duration_time(int): 会话已用时间（纳秒）
+            now(int): 当前时间（纳秒），用于淘汰滚动窗口，为空时不淘汰
+        Returns:
+            snapshot(StatsSnapshot): 统计快照
+        """
+        recent = self.recent
+        if now is not None:
+            with self.lock:
+                if recent and recent[0] < now - self.window:
+                    self._expire(now)
+        window_chars = len(recent)
+
+        key = (self.version, duration_time, window_chars)
+        cached_key, cached = self._snapshot
+        if key == cached_key:
+            return cached
+
+        typed_chars = self.typed_chars
+        if duration_time > 0 and typed_chars > 0:
+            per_minute = StatsAccumulator.WPM_FACTOR / duration_time
+            wpm = self.correct_chars * per_minute
+            raw_wpm = typed_chars * per_minute
+            window_wpm = window_chars * StatsAccumulator.WPM_FACTOR / min(duration_time, self.window)
+        else:
+            wpm = raw_wpm = window_wpm = 0
+        if typed_chars > 0:
+            accuracy = self.correct_chars / typed_chars * 100
+            error_rate = self.error_counts / typed_chars * 100
+        else:
+            accuracy = error_rate = 0
+
+        # 绕过 namedtuple 的 Python 层 __new__，减少每次快照的开销
+        snapshot = _new_snapshot(StatsSnapshot, (
+            typed_chars,
+            self.correct_chars,
+            self.error_counts,
+            duration_time / NS_PER_SECOND,
+            wpm,
+            raw_wpm,
+            window_wpm,
+            accuracy,
+            error_rate
+        ))
+        self._snapshot = (key, snapshot)
+        return snapshot
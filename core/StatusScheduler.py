@@ -0,0 +1,159 @@
+import threading
+import time
+
+class StatusScheduler:
+    """状态推送调度器
+
+    所有打字引擎共用一个调度器（一个线程、Tk 的 after 循环或 asyncio 事件循环），
+    按帧间隔合并状态推送，且只在状态发生变化时才推送。
+    没有活动会话时线程处于等待状态，不占用 CPU。
+    """
+
+    DEFAULT_FRAME_INTERVAL = 0.1
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, frame_interval:float = DEFAULT_FRAME_INTERVAL):
+        """初始化调度器
+        Args:
+            frame_interval(float): 帧间隔（秒），即两次推送之间的最短间隔
+        """
+        self.frame_interval = frame_interval
+        self.engines = set()
+        self.condition = threading.Condition()
+        self.thread = None
+        # 外部定时器 timer(delay, callback) 及其取消函数 cancel(job)，设置后不再使用后台线程
+        self.timer = None
+        self.cancel_timer = None
+        self.timer_job = None
+
+    @classmethod
+    def shared(cls) -> 'StatusScheduler':
+        """获取全局共享的调度器"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    # ----------- 注册 ----------- #
+
+    def register(self, engine) -> None:
+        """注册引擎，开始为其定时推送状态
+        Args:
+            engine(TypingEngine): 打字引擎
+        """
+        with self.condition:
+            self.engines.add(engine)
+            if self.timer is not None:
+                self._schedule_timer()
+            elif self.thread is None:
+                self._start_thread()
+            self.condition.notify()
+
+    def unregister(self, engine) -> None:
+        """注销引擎，并推送其最终状态
+        Args:
+            engine(TypingEngine): 打字引擎
+        """
+        with self.condition:
+            self.engines.discard(engine)
+        engine.push_status()
+
+    # ----------- 驱动方式 ----------- #
+
+    def attach_tk(self, root) -> None:
+        """改由 Tk 的 after 循环驱动，不再使用后台线程
+        Args:
+            root(tk.Tk): Tk 根窗口
+        """
+        self.attach_timer(
+            lambda delay, callback: root.after(int(delay * 1000), callback),
+            root.after_cancel
+        )
+
+    def attach_loop(self, loop) -> None:
+        """改由 asyncio 事件循环驱动（之后只能在该事件循环所在线程中注册引擎）
+        Args:
+            loop(asyncio.AbstractEventLoop): 事件循环
+        """
+        self.attach_timer(loop.call_later, lambda handle: handle.cancel())
+
+    def attach_timer(self, timer, cancel = None) -> None:
+        """改由外部定时器驱动，不再使用后台线程
+        Args:
+            timer(callable): timer(delay, callback) 在 delay 秒后于界面或事件循环线程调用 callback，返回定时任务
+            cancel(callable): cancel(job) 取消 timer 返回的定时任务，为空时 detach 后定时任务仍会触发一次（不做任何事）
+        """
+        with self.condition:
+            self.timer = timer
+            self.cancel_timer = cancel
+            self.timer_job = None
+            self.condition.notify()
+            if self.engines:
+                self._schedule_timer()
+
+    def detach(self) -> None:
+        """停止外部定时器驱动（窗口关闭、事件循环结束前调用）
+        取消尚未触发的定时任务；之后仍有引擎注册时改回后台线程驱动。
+        """
+        with self.condition:
+            if self.timer is None:
+                return
+            job = self.timer_job
+            cancel = self.cancel_timer
+            self.timer = None
+            self.cancel_timer = None
+            self.timer_job = None
+            if self.engines and self.thread is None:
+                self._start_thread()
+        if job is not None and cancel is not None:
+            cancel(job)
+
+    def tick(self) -> None:
+        """推送一帧：为所有已注册引擎推送发生变化的状态"""
+        with self.condition:
+            engines = tuple(self.engines)
+        for engine in engines:
+            engine.push_status()
+
+    def _start_thread(self) -> None:
+        self.thread = threading.Thread(target=self._run, name="StatusScheduler", daemon=True)
+        self.thread.start()
+
+    def _schedule_timer(self) -> None:
+        if self.timer_job is None:
+            self.timer_job = self.timer(self.frame_interval, self._timer_tick)
+
+    def _timer_tick(self) -> None:
+        with self.condition:
+            if self.timer is None:
+                # 已 detach
+                return
+            self.timer_job = None
+        self.tick()
+        with self.condition:
+            if self.engines and self.timer is not None:
+                self._schedule_timer()
+
+    def _run(self) -> None:
+        """后台线程：有活动引擎时按帧推送，否则一直等待"""
+        next_frame = time.monotonic()
+        while True:
+            with self.condition:
+                while not self.engines or self.timer is not None:
+                    if self.timer is not None:
+                        self.thread = None
+                        return
+                    self.condition.wait()
+                    next_frame = time.monotonic()
+                timeout = next_frame - time.monotonic()
+                if timeout > 0:
+                    self.condition.wait(timeout)
+                    continue
+            self.tick()
+            next_frame += self.frame_interval
+            now = time.monotonic()
+            if next_frame < now:
+                # 处理过慢时直接跳过落后的帧，避免连续补帧
+                next_frame = now + self.frame_interval
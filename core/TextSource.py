@@ -0,0 +1,229 @@
+import mmap
+from array import array
+from bisect import bisect_right
+
+class TextSource:
+    """练习文本来源
+
+    引擎通过 len()、下标、切片及 find() 访问文本，
+    不同实现可以把文本放在内存中，也可以按需从文件中读取。
+    """
+
+    __slots__ = ()
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def __getitem__(self, key) -> str:
+        raise NotImplementedError
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def estimated_length(self) -> int:
+        """文本长度的估计值（用于进度显示），默认即为准确长度"""
+        return len(self)
+
+    def find(self, sub:str, start:int = 0, end:int = None) -> int:
+        """查找子串，语义同 str.find"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """释放资源"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class StringTextSource(TextSource):
+    """内存文本来源"""
+
+    __slots__ = ('text',)
+
+    def __init__(self, text:str):
+        """初始化文本来源
+        Args:
+            text(str): 文本
+        """
+        self.text = text
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def __getitem__(self, key) -> str:
+        return self.text[key]
+
+    def __str__(self) -> str:
+        return self.text
+
+    def find(self, sub:str, start:int = 0, end:int = None) -> int:
+        return self.text.find(sub, start, len(self.text) if end is None else end)
+
+
+class MmapTextSource(TextSource):
+    """内存映射的 UTF-8 文件文本来源
+
+    文件按约 BLOCK_SIZE 字节分块（块边界对齐到字符边界），只为每一块记录
+    字节偏移和起始字符位置，构成稀疏索引。索引随访问位置按需向后扩展，
+    读取时只解码所在的块并缓存最近使用的块，内存占用与文件大小无关。
+    """
+
+    BLOCK_SIZE = 64 * 1024
+    CACHED_BLOCKS = 4
+
+    # UTF-8 续字节 0x80 ~ 0xBF，不计入字符数
+    _CONTINUATION = bytes(range(0x80, 0xC0))
+
+    def __init__(self, path:str):
+        """打开文件
+        Args:
+            path(str): UTF-8 文本文件路径
+        """
+        self.path = path
+        self.file = open(path, 'rb')
+        self.size = self.file.seek(0, 2)
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+
+        # 稀疏索引：第 i 块的起始字节偏移与起始字符位置
+        self.byte_offsets = array('Q', [0])
+        self.char_offsets = array('Q', [0])
+        self.length = None
+
+        # 最近解码的块：块号 -> 文本
+        self.cache = {}
+        # 最近访问的块 (起始字符位置, 结束字符位置, 文本)，顺序输入时直接命中
+        self.current = (0, 0, "")
+
+    # ----------- 索引 ----------- #
+
+    def _extend_index(self) -> bool:
+        """向后扩展一块索引
+        Returns:
+            is_extended(bool): 是否还有新的块
+        """
+        start = self.byte_offsets[-1]
+        if start >= self.size:
+            return False
+        end = min(start + MmapTextSource.BLOCK_SIZE, self.size)
+        # 块边界不能落在多字节字符中间
+        while end < self.size and 0x80 <= self.data[end] < 0xC0:
+            end += 1
+        chars = len(self.data[start:end].translate(None, MmapTextSource._CONTINUATION))
+        self.byte_offsets.append(end)
+        self.char_offsets.append(self.char_offsets[-1] + chars)
+        if end >= self.size:
+            self.length = self.char_offsets[-1]
+        return True
+
+    def _block_of(self, index:int) -> int:
+        """获取字符位置所在的块号，必要时扩展索引"""
+        while self.char_offsets[-1] <= index and self._extend_index():
+            pass
+        return bisect_right(self.char_offsets, index) - 1
+
+    def _decode(self, block:int) -> str:
+        """解码某一块（带缓存）"""
+        text = self.cache.get(block)
+        if text is None:
+            if len(self.cache) >= MmapTextSource.CACHED_BLOCKS:
+                self.cache.pop(next(iter(self.cache)))
+            start = self.byte_offsets[block]
+            text = self.data[start:self.byte_offsets[block + 1]].decode('utf-8')
+            self.cache[block] = text
+        return text
+
+    # ----------- 访问 ----------- #
+
+    def __len__(self) -> int:
+        while self.length is None and self._extend_index():
+            pass
+        return self.length or 0
+
+    def __bool__(self) -> bool:
+        return self.size > 0
+
+    def estimated_length(self) -> int:
+        """文本长度的估计值
+
+        索引已扩展到文件末尾时为准确长度；否则按已索引部分的平均字符宽度
+        估计剩余部分，不为此扫描整个文件。
+        """
+        if not self.size:
+            return 0
+        if self.length is None and len(self.byte_offsets) == 1:
+            self._extend_index()
+        if self.length is not None:
+            return self.length
+        indexed_bytes = self.byte_offsets[-1]
+        indexed_chars = self.char_offsets[-1]
+        return indexed_chars + round((self.size - indexed_bytes) * indexed_chars / indexed_bytes)
+
+    def __getitem__(self, key) -> str:
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self)) if _needs_length(key) else (key.start or 0, key.stop, 1)
+            if step != 1:
+                return self[start:stop][::step]
+            return self._slice(start, stop)
+
+        block_start, block_end, text = self.current
+        if block_start <= key < block_end:
+            return text[key - block_start]
+
+        if key < 0:
+            key += len(self)
+        block = self._block_of(key)
+        if key < 0 or block + 1 >= len(self.char_offsets):
+            raise IndexError("文本位置超出范围！")
+        block_start = self.char_offsets[block]
+        text = self._decode(block)
+        self.current = (block_start, self.char_offsets[block + 1], text)
+        return text[key - block_start]
+
+    def _slice(self, start:int, stop:int) -> str:
+        """获取 [start, stop) 的文本，只解码涉及的块"""
+        parts = []
+        position = start
+        while position < stop:
+            block = self._block_of(position)
+            if block + 1 >= len(self.char_offsets):
+                break
+            block_start = self.char_offsets[block]
+            block_end = self.char_offsets[block + 1]
+            parts.append(self._decode(block)[position - block_start:min(stop, block_end) - block_start])
+            position = block_end
+        return "".join(parts)
+
+    def find(self, sub:str, start:int = 0, end:int = None) -> int:
+        position = start
+        overlap = len(sub) - 1
+        while end is None or position < end:
+            block = self._block_of(position)
+            if block + 1 >= len(self.char_offsets):
+                return -1
+            block_end = self.char_offsets[block + 1]
+            stop = block_end + overlap if end is None else min(block_end + overlap, end)
+            index = self._slice(position, stop).find(sub)
+            if index != -1:
+                return position + index
+            position = block_end
+        return -1
+
+    def close(self) -> None:
+        self.cache.clear()
+        self.current = (0, 0, "")
+        if self.size:
+            self.data.close()
+        self.file.close()
+
+
+def _needs_length(key:slice) -> bool:
+    """切片是否用到了负数或缺省的结束位置，需要知道文本总长度"""
+    return (
+        key.stop is None
+        or (key.start is not None and key.start < 0)
+        or key.stop < 0
+        or (key.step is not None and key.step != 1)
+    )
@@ -1,22 +1,72 @@
+import threading
 import tkinter as tk
 
+from core.StatusScheduler import StatusScheduler
+
 class TyperApplication:
-    def __init__(self):
-        """初始化程序及初始化配置"""
+    # 检查数据库是否加载完成的间隔（毫秒）
+    DATABASE_POLL_INTERVAL = 50
+
+    def __init__(self, database_path:str = None):
+        """初始化程序及初始化配置
+        Args:
+            database_path(str): 数据库文件路径，默认为 DatabaseManger.DATABASE_PATH
+        """
         self.root = tk.Tk()
         self.root.title("JTypewriter")
         self.root.geometry(
             f"{self.root.winfo_screenwidth()}x{self.root.winfo_screenheight()}"
         )
         self.root.minsize(
-            int(self.root.winfo_screenwidth()/2), 
+            int(self.root.winfo_screenwidth()/2),
             int(self.root.winfo_screenheight()/2)
         )
         self.root.maxsize(
             self.root.winfo_screenwidth(),
             self.root.winfo_screenheight()
         )
+
+        # 状态推送改由 Tk 主循环驱动，关闭窗口时解除
+        StatusScheduler.shared().attach_tk(self.root)
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+
+        # 数据库（包括表结构迁移）在后台线程中加载，窗口无需等待
+        self.database_path = database_path
+        self.database = None
+        self.database_error = None
+        self.database_ready = threading.Event()
+
+    def load_database(self) -> None:
+        """在后台线程中打开数据库，完成后在主循环中调用 on_database_ready"""
+        def load():
+            try:
+                from core.DatabaseManager import DatabaseManger
+                self.database = DatabaseManger(self.database_path)
+            except Exception as error:
+                self.database_error = error
+            self.database_ready.set()
+
+        threading.Thread(target=load, name="DatabaseLoader", daemon=True).start()
+        self.root.after(TyperApplication.DATABASE_POLL_INTERVAL, self._poll_database)
+
+    def _poll_database(self) -> None:
+        if self.database_ready.is_set():
+            self.on_database_ready()
+        else:
+            self.root.after(TyperApplication.DATABASE_POLL_INTERVAL, self._poll_database)
+
+    def on_database_ready(self) -> None:
+        """数据库加载完成（在 Tk 主循环中调用）"""
+        if self.database_error is not None:
+            self.root.title(f"JTypewriter - 数据库加载失败: {self.database_error}")
+
+    def close(self) -> None:
+        """关闭窗口：先取消调度器在 Tk 中的定时任务，再销毁窗口"""
+        StatusScheduler.shared().detach()
+        self.root.destroy()
+
     def run(self) -> None:
-        """运行应用"""
+        """运行应用：先显示窗口，再加载数据库"""
+        self.root.after_idle(self.load_database)
         self.root.mainloop()
-        
\ No newline at end of file
+
@@ -1,186 +1,576 @@
+import re
 import time
-import threading
 from collections import defaultdict
+from functools import wraps
+
+from core.Clock import MonotonicClock, NS_PER_SECOND
+from core.ErrorAligner import KINDS
+from core.Instrumentation import Instrumentation, PROCESS_INPUT, STATS, RENDER
+from core.KeyLatency import KeyLatency
+from core.KeystrokeBuffer import KeystrokeBuffer
+from core.SessionRecorder import PAUSE, RESUME, BACKSPACE
+from core.StatsAccumulator import StatsAccumulator, StatsSnapshot
+from core.StatusScheduler import StatusScheduler
+from core.TextSource import TextSource
+
+
+def _exclusive(method):
+    """挑战进行中时，与挑战的定时回调（可能在调度线程中结束会话）互斥执行
+    没有挑战时直接调用，只多一次 is None 检查。
+    """
+    @wraps(method)
+    def exclusive(self, *args, **kwargs):
+        challenge = self.challenge
+        if challenge is None:
+            return method(self, *args, **kwargs)
+        with challenge.lock:
+            return method(self, *args, **kwargs)
+    return exclusive
+
 
 class TypingEngine:
 
+    # 会话状态全部放在固定槽位中，不创建实例 __dict__，便于同时运行大量会话。
+    # status_update 也是槽位，可以按实例替换为界面的回调
+    __slots__ = (
+        'text', 'input_buffer', 'current_position',
+        'stats', 'error_positions', 'error_analysis', 'latency',
+        'is_active', 'is_completed',
+        'clock', 'scheduler', 'last_status_key', 'start_time', 'end_time',
+        'writer', 'user_id', 'session_id', 'dropped_keystrokes', 'recorder', 'status_update', 'probe',
+        'aligner', 'challenge'
+    )
+
     # ----------- 初始化 ----------- #
 
-    def __init__(self):
-        """初始化输入引擎"""
-        # 文本
+    def __init__(
+        self,
+        scheduler:StatusScheduler = None,
+        writer = None,
+        user_id:int = None,
+        recorder = None,
+        clock = None,
+        aligner = None
+    ):
+        """初始化输入引擎
+        Args:
+            scheduler(StatusScheduler): 状态推送调度器，默认使用全局共享调度器
+            writer(SessionWriter): 练习数据写入器，为空时不保存练习数据
+            user_id(int): 当前用户编号
+            recorder(SessionRecorder): 会话录制器，为空时不录制
+            clock(MonotonicClock | VirtualClock): 时钟，默认使用单调时钟
+            aligner(ErrorAligner): 错误对齐器，不为空时错误统计、准确率与文本位置均按对齐结果计算（漏打、多打不会让后续输入全部算错）
+        """
+        # 文本（str 或 TextSource）
         self.text = ""
-        self.expected_text = ""
-        
+
         # 用户输入情况
-        self.user_input = ""
+        self.input_buffer = KeystrokeBuffer()
         self.current_position = 0
 
         # 统计
-        self.total_chars = 0
-        self.correct_chars = 0
-        self.error_counts = 0
-        self.error_positions = set()
+        self.stats = StatsAccumulator()
+        # 对齐模式下为对齐器的 文本位置 -> 错误数
+        self.error_positions = set() if aligner is None else aligner.error_positions
         self.error_analysis = defaultdict(int)
+        self.latency = KeyLatency()
+        self.aligner = aligner
+        # 挑战模式（定时或定量，由 Challenge.start 设置）
+        self.challenge = None
 
         # 打字机状态
         self.is_active = False
         self.is_completed = False
 
-        # 计时器
-        self.timer = None
+        # 计时器（所有时间均为 clock 的读数，单位为整数纳秒）
+        self.clock = clock or MonotonicClock()
+        self.scheduler = scheduler or StatusScheduler.shared()
+        self.last_status_key = None
         self.start_time = None
         self.end_time = None
 
-    def load_text(self,text:str) -> None:
+        # 数据保存
+        self.writer = writer
+        self.user_id = user_id
+        self.session_id = None
+        # 写入队列或按键缓冲区已满而未能保存的按键数（本次会话）
+        self.dropped_keystrokes = 0
+        self.recorder = recorder
+
+        # 状态推送回调，默认输出到终端
+        self.status_update = self.print_status
+
+        # 埋点（未通过环境变量开启时为空）
+        self.probe = Instrumentation.shared()
+
+    def load_text(self, text) -> None:
         """加载文本
         Args: 
-            text(str): 文本
+            text(str | TextSource): 文本，大文件可使用 MmapTextSource 按需读取
         """
+        if not isinstance(text, (str, TextSource)):
+            raise TypeError("文本必须是 str 或 TextSource！")
         self.text = text
-        self.expected_text = text
+
+    def extend_text(self, text:str) -> None:
+        """在文本末尾追加内容（定时挑战中文本按需延长）
+        Args:
+            text(str): 追加的文本
+        """
+        if not isinstance(self.text, str):
+            raise TypeError("只能延长 str 文本！")
+        self.text += text
+        if self.aligner is not None:
+            self.aligner.text = self.text
 
     def reset_engine(self) -> None:
         """重制打字引擎状态"""
-        self.user_input = ""
+        self.input_buffer.clear()
         self.current_position = 0
         self.start_time = None
         self.end_time = None
-        self.total_chars = len(self.text)
-        self.correct_chars = 0
-        self.error_counts = 0
+        self.stats.reset()
+        self.error_positions.clear()
+        self.error_analysis.clear()
+        self.latency.reset()
+        if self.aligner is not None:
+            self.aligner.reset(self.text)
+            self.error_positions = self.aligner.error_positions
         self.is_active = False
         self.is_completed = False
-        self.timer = None
+        self.last_status_key = None
+        self.challenge = None
+        self.dropped_keystrokes = 0
 
     # ----------- 引擎状态控制 ----------- #
 
-    def start_session(self) -> None:
-        """启动打字会话"""
+    def start_session(self, session_id:int = None) -> None:
+        """启动打字会话
+        Args:
+            session_id(int): 预先分配的会话编号（异步宿主在线程池中分配），为空时由 writer 分配
+        """
         if not self.text:
             raise ValueError("文本未加载！")
         self.reset_engine()
-        self.start_time = time.time()
+        self.start_time = self.clock()
         self.is_active = True
-
-        # 启动计时器
-        self.timer = threading.Thread(target=self.update_timer, daemon = True)
-        self.timer.start()
+        if self.recorder is not None:
+            self.recorder.start(self.start_time)
+        if session_id is not None:
+            self.session_id = session_id
+        elif self.writer is not None:
+            self.session_id = self.writer.new_session_id()
+
+        # 由调度器定时推送状态
+        self.scheduler.register(self)
     
+    @_exclusive
     def pause_session(self) -> None:
         """暂停打字会话"""
         if self.is_active:
             self.is_active = False
-            if self.start_time and not self.end_time:
-                self.end_time = time.time()
+            if self.start_time is not None and self.end_time is None:
+                self.end_time = self.clock()
+            self.scheduler.unregister(self)
+            self.latency.interrupt()
+            if self.recorder is not None:
+                self.recorder.record(PAUSE, self.end_time)
     
+    @_exclusive
     def resume_session(self) -> None:
         """恢复打字会话"""
         if not self.is_completed and not self.is_active:
-            pause_duration = time.time() - self.end_time
-            self.start_time += pause_duration
+            now = self.clock()
+            self.start_time += now - self.end_time
             self.end_time = None
             self.is_active = True
-    
-            self.timer = threading.Thread(target=self.update_timer, daemon = True)
-            self.timer.start()
-
-    def end_session(self) -> None:
-        """结束练习会话"""
+            self.scheduler.register(self)
+            if self.recorder is not None:
+                self.recorder.record(RESUME, now)
+            if self.challenge is not None:
+                self.challenge.resume()
+
+    @_exclusive
+    def end_session(self, flush:bool = True, end_time:int = None) -> None:
+        """结束练习会话
+        Args:
+            flush(bool): 是否等待练习数据落盘（同时托管大量会话时可由调用方统一刷新）
+            end_time(int): 结束时刻（纳秒），为空时取当前时间（定时挑战传入截止时刻）
+        """
         if self.is_active:
             self.is_active = False
-            self.end_time = time.time()
+            self.end_time = self.clock() if end_time is None else end_time
             self.is_completed = True
+            self.scheduler.unregister(self)
+            if self.recorder is not None:
+                self.recorder.finish(self.end_time)
+            if self.aligner is not None:
+                self.aligner.finish()
+                self.current_position = self.aligner.cursor
+
+            # 保存会话汇总，并等待此前的数据全部落盘
+            if self.writer is not None:
+                self.writer.record_session(self.session_id, self.user_id, self.get_stats())
+                self.writer.record_latency(self.latency.rows(self.user_id))
+                if flush:
+                    self.writer.flush()
 
     # ----------- 用户输入处理 ----------- #
 
-    def process_input(self, char:str):
+    @_exclusive
+    def process_input(self, char:str, timestamp:int = None):
         """用户输入字符处理
         Args:
             char(str): 输入的字符
+            timestamp(int): 按键时刻（clock 读数，整数纳秒），为空时取当前时间
         """
+        self._input(char, self.clock() if timestamp is None else timestamp)
 
-        expected_char = self.text[self.current_position]
+    def _input(self, char:str, timestamp:int) -> bool:
+        """处理一个输入字符（调用方负责与挑战回调互斥）
+        Returns:
+            is_admitted(bool): 输入是否计入（挑战截止或超出定量时不计入）
+        """
+        position = self.current_position
+        challenge = self.challenge
+        if challenge is not None and (
+            timestamp >= challenge.deadline or position >= challenge.quota
+        ):
+            # 截止时刻之后或超出定量的输入不计入
+            challenge.admit(position, (timestamp,), 1)
+            challenge.advance(position, None)
+            return False
+
+        probe = self.probe
+        if probe is not None:
+            started = probe.begin(PROCESS_INPUT)
+
+        # 对齐模式下 position 是对齐器给出的当前文本位置，正误仅为输入当时的判断
+        expected_char = self.text[position]
         is_correct = char == expected_char
 
-        self.user_input += char
+        self.input_buffer.append(char, is_correct)
+        self.stats.record(is_correct, timestamp)
+        if self.recorder is not None:
+            self.recorder.record_char(char, timestamp)
+        if self.writer is not None and not self.writer.record_keystroke(
+            self.session_id, self.user_id, position,
+            char, expected_char, is_correct, self.clock.to_epoch(timestamp)
+        ):
+            self.dropped_keystrokes += 1
 
         if is_correct:
-            self.correct_chars += 1
+            self.latency.record(expected_char, timestamp)
         else:
-            self.error_counts += 1
-            self.error_positions.add(self.current_position)
-            self.error_analysis[expected_char] += 1
+            self.latency.interrupt()
 
-        self.current_position += 1
-        self.status_update(self.get_current_status())
+        if self.aligner is None:
+            if not is_correct:
+                self.error_positions.add(position)
+                self.error_analysis[expected_char] += 1
+            self.current_position = position + 1
+        else:
+            # 多打时文本位置不前进，漏打时跳过漏掉的字符
+            self.aligner.feed(char)
+            self.current_position = self.aligner.cursor
+        if probe is not None:
+            probe.end(PROCESS_INPUT, started)
+        if challenge is not None and self.current_position >= challenge.checkpoint:
+            challenge.advance(self.current_position, timestamp)
+        return True
+
+    @_exclusive
+    def process_inputs(self, chars:str, timestamps = None) -> int:
+        """批量处理输入（粘贴文本、回放记录、监听线程的一批按键）
+        整段与文本切片比较，只在不一致处逐个定位错误，最后只推送一次状态。
+        Args:
+            chars(str): 输入的字符
+            timestamps(list): 每个字符的按键时刻（clock 读数，整数纳秒，非递减），为空时全部取当前时间
+        Returns:
+            count(int): 实际处理的字符数（超出文本末尾的部分被忽略）
+        """
+        if self.aligner is not None:
+            return self._process_aligned(chars, timestamps)
+        position = self.current_position
+        expected = self.text[position:position + len(chars)]
+        count = len(expected)
+        if count == 0:
+            return 0
+        if count < len(chars):
+            chars = chars[:count]
+        probe = self.probe
+        if probe is not None:
+            started = probe.begin(PROCESS_INPUT)
+        if timestamps is None:
+            timestamps = (self.clock(),) * count
+        challenge = self.challenge
+        if challenge is not None:
+            # 截止时刻之后与超出定量的输入不计入
+            count = challenge.admit(position, timestamps, count)
+            if count == 0:
+                challenge.advance(position, None)
+                if probe is not None:
+                    probe.end(PROCESS_INPUT, started)
+                return 0
+            chars = chars[:count]
+            expected = expected[:count]
+
+        error_offsets = _mismatches(chars, expected)
+        self.input_buffer.extend(chars, error_offsets)
+
+        if len(timestamps) > count:
+            timestamps = timestamps[:count]
+        self.stats.record_many(timestamps, error_offsets)
+        self.latency.record_many(expected, timestamps, error_offsets)
+        if self.recorder is not None:
+            record_char = self.recorder.record_char
+            for char, timestamp in zip(chars, timestamps):
+                record_char(char, timestamp)
+        for offset in error_offsets:
+            self.error_positions.add(position + offset)
+            self.error_analysis[expected[offset]] += 1
+
+        if self.writer is not None:
+            is_error = set(error_offsets)
+            epoch_offset = self.clock.epoch_offset
+            if not self.writer.record_keystrokes([
+                (
+                    self.session_id, self.user_id, position + i,
+                    chars[i], expected[i], i not in is_error,
+                    (timestamps[i] + epoch_offset) / NS_PER_SECOND
+                )
+                for i in range(count)
+            ]):
+                self.dropped_keystrokes += count
+
+        self.current_position = position + count
+        if probe is not None:
+            probe.end(PROCESS_INPUT, started)
+        if challenge is not None:
+            challenge.advance(self.current_position, timestamps[count - 1])
+        self.push_status()
+        return count
+
+    def _process_aligned(self, chars:str, timestamps) -> int:
+        """对齐模式下的批量输入
+        多打、漏打会改变文本位置，无法预先按位置切片比较，因此逐个字符交给对齐器，
+        直到文本输入完毕。
+        """
+        if timestamps is None:
+            timestamps = (self.clock(),) * len(chars)
+        text = self.text
+        count = 0
+        for char, timestamp in zip(chars, timestamps):
+            position = self.current_position
+            if not text[position:position + 1] or not self._input(char, timestamp):
+                break
+            count += 1
+        if count:
+            self.push_status()
+        return count
+
+    @_exclusive
+    def backspace(self) -> bool:
+        """退格处理
+        Returns:
+            is_success(bool): 是否成功回退
+        """
+        if not self.input_buffer:
+            return False
+
+        _, was_correct = self.input_buffer.pop()
+        self.stats.undo(was_correct)
+        self.latency.interrupt()
+        if self.aligner is None:
+            self.current_position -= 1
+        else:
+            self.aligner.pop()
+            self.current_position = self.aligner.cursor
+        if self.recorder is not None:
+            self.recorder.record(BACKSPACE, self.clock())
+        if self.writer is not None:
+            # 退格以 '\b' 记录，是否正确留空
+            if not self.writer.record_keystroke(
+                self.session_id, self.user_id, self.current_position,
+                '\b', self.text[self.current_position], None, self.clock.to_epoch(self.clock())
+            ):
+                self.dropped_keystrokes += 1
+
+        if not was_correct and self.aligner is None:
+            expected_char = self.text[self.current_position]
+            self.error_positions.discard(self.current_position)
+            self.error_analysis[expected_char] = max(0, self.error_analysis[expected_char] - 1)
+
+        return True
+
+    @property
+    def user_input(self) -> str:
+        """用户已输入的内容（按需生成）"""
+        return self.input_buffer.text
+
+    @property
+    def total_chars(self) -> int:
+        """文本总字符数（按需读取的大文件在读到末尾前为估计值，避免扫描整个文件）"""
+        text = self.text
+        return len(text) if isinstance(text, str) else text.estimated_length()
+
+    @property
+    def correct_chars(self) -> int:
+        """正确字符数（对齐模式下为已输入字符数减去对齐后判为错误的输入）"""
+        if self.aligner is None:
+            return self.stats.correct_chars
+        return self.stats.typed_chars - len(self.aligner.wrong_inputs)
+
+    @property
+    def error_counts(self) -> int:
+        """错误数（对齐模式下为对齐得到的各类错误之和）"""
+        if self.aligner is None:
+            return self.stats.error_counts
+        return sum(self.aligner.counts.values())
 
     # ----------- 状态记录与更新 ----------- #
 
-    def update_timer(self) -> None:
-        """计时器更新"""
-        while self.is_active and not self.is_completed:
-            time.sleep(0.1)
-            self.status_update(self.get_current_status())
+    def push_status(self) -> bool:
+        """推送当前状态（仅在显示内容发生变化时推送），由调度器按帧调用
+        Returns:
+            is_pushed(bool): 是否进行了推送
+        """
+        probe = self.probe
+        if probe is not None:
+            started = probe.begin(STATS)
+        snapshot = self.get_snapshot()
+        if probe is not None:
+            probe.end(STATS, started)
+        status_key = (
+            snapshot.typed_chars,
+            snapshot.error_counts,
+            round(snapshot.wpm, 1),
+            round(snapshot.accuracy, 1),
+            int(snapshot.duration_time)
+        )
+        if status_key == self.last_status_key:
+            return False
+        self.last_status_key = status_key
+        if probe is None:
+            self.status_update(self.get_current_status(snapshot))
+        else:
+            started = probe.begin(RENDER)
+            self.status_update(self.get_current_status(snapshot))
+            probe.end(RENDER, started)
+        return True
+
+    def get_snapshot(self) -> StatsSnapshot:
+        """获取统计快照（O(1)，数据未变化时复用同一对象，对齐模式下按对齐结果替换计数）
+        Returns:
+            snapshot(StatsSnapshot): 统计快照
+        """
+        if self.is_active:
+            now = self.clock()
+            snapshot = self.stats.snapshot(now - self.start_time, now)
+        else:
+            snapshot = self.stats.snapshot(self.get_duration_ns())
+        if self.aligner is None or snapshot.typed_chars == 0:
+            return snapshot
+
+        # 对齐模式：正确数、错误数及由其计算的指标按对齐结果替换
+        typed_chars = snapshot.typed_chars
+        correct_chars = self.correct_chars
+        error_counts = self.error_counts
+        return snapshot._replace(
+            correct_chars=correct_chars,
+            error_counts=error_counts,
+            wpm=snapshot.raw_wpm * correct_chars / typed_chars,
+            accuracy=correct_chars / typed_chars * 100,
+            error_rate=error_counts / typed_chars * 100
+        )
 
-    def get_current_status(self) -> dict:
+    def get_current_status(self, snapshot:StatsSnapshot = None) -> dict:
         """获取当前状态信息
+        Args:
+            snapshot(StatsSnapshot): 统计快照，为空时重新获取
         Returns:
             status(dict): 包含当前所有信息的字典
         """
-        duration = self.get_duration()
-        statistic_info = self.calculate_statistic_info()
+        if snapshot is None:
+            snapshot = self.get_snapshot()
 
+        total_chars = self.total_chars
         return {
             'current_position': self.current_position,
-            'total_chars': self.total_chars,
-            'progress': self.current_position / self.total_chars * 100,
-            'correct_chars': self.correct_chars,
-            'error_counts': self.error_counts,
-            'duration_time': duration,
-            'wpm': statistic_info['wpm'],
-            'accuracy': statistic_info['accuracy']
+            'total_chars': total_chars,
+            'progress': min(100, self.current_position / total_chars * 100) if total_chars else 0,
+            'correct_chars': snapshot.correct_chars,
+            'error_counts': snapshot.error_counts,
+            'duration_time': snapshot.duration_time,
+            'wpm': round(snapshot.wpm, 1),
+            'accuracy': round(snapshot.accuracy, 1)
+        }
+
+    def get_stats(self) -> dict:
+        """获取完整的统计信息（包括错误分析）
+        Returns:
+            stats(dict): 完整的统计信息（start_time/end_time 为 Unix 时间（秒））
+        """
+        snapshot = self.get_snapshot()
+        stats = {
+            field: round(value, 1) if isinstance(value, float) else value
+            for field, value in zip(snapshot._fields, snapshot)
         }
+        aligner = self.aligner
+        stats.update({
+            'total_chars': self.total_chars,
+            'error_analysis': dict(self.error_analysis if aligner is None else aligner.error_analysis),
+            'start_time': self._epoch(self.start_time),
+            'end_time': self._epoch(self.end_time),
+            'is_completed': self.is_completed,
+            'dropped_keystrokes': self.dropped_keystrokes
+        })
+        if aligner is not None:
+            stats['alignment'] = {kind: aligner.counts[kind] for kind in KINDS}
+        return stats
 
     # ----------- 辅助计算函数 ----------- #
 
-    def get_duration(self) -> float:
+    def get_duration_ns(self) -> int:
         """获取经过的时间
         Returns:
-            duration(float): 已用时间
+            duration(int): 已用时间（纳秒）
         """
         if self.start_time is None :
             return 0
         if self.end_time is not None :
             return self.end_time - self.start_time
-        return time.time() - self.start_time
+        return self.clock() - self.start_time
+
+    def get_duration(self) -> float:
+        """获取经过的时间
+        Returns:
+            duration(float): 已用时间（秒）
+        """
+        return self.get_duration_ns() / NS_PER_SECOND
 
-    def calculate_statistic_info(self) -> dict:
+    def _epoch(self, timestamp:int) -> float:
+        """把时钟读数换算为 Unix 时间（秒），为空时返回 None"""
+        return None if timestamp is None else self.clock.to_epoch(timestamp)
+
+    def calculate_statistic_info(self, duration_time:int = None) -> dict:
         """计算统计信息
+        Args:
+            duration_time(int): 已用时间（纳秒），为空时重新计算
         Returns:
             statistic_info(dict): 包含统计信息的字典
         """
-        duration_time = self.get_duration()
-
-        # 计算WPM
-        if duration_time > 0 and self.current_position > 0:
-            minuntes = duration_time / 60
-            wpm = (self.correct_chars / 5) / minuntes
+        if duration_time is None:
+            snapshot = self.get_snapshot()
         else:
-            wpm = 0
+            snapshot = self.stats.snapshot(duration_time)
 
-        # 计算准确率
-        if self.current_position > 0:
-            accuracy = (self.correct_chars / self.current_position) * 100
-        else:
-            accuracy = 0
-        
         return {
-            'wpm': round(wpm, 1),
-            'accuracy': round(accuracy,1)
+            'wpm': round(snapshot.wpm, 1),
+            'accuracy': round(snapshot.accuracy, 1)
         }
 
-    def status_update(self, status: dict):
+    def print_status(self, status: dict):
         print(
             f"\r进度: {status['progress']:.1f}% | "
             f"速度: {status['wpm']} WPM | "
@@ -197,6 +587,39 @@ class TypingEngine:
         seconds = int(seconds) % 60
         return f"{minutes:02d}:{seconds:02d}"
 
+# ----------- 辅助函数 ----------- #
+
+def _mismatches(chars:str, expected:str) -> list:
+    """找出两个等长字符串中所有不一致的下标
+    把两段文本编码为定长字节后整体按位异或，再用正则在 C 层定位非零字节，
+    避免在 Python 层逐字符比较。
+    """
+    if chars == expected:
+        return []
+    if chars.isascii() and expected.isascii():
+        width = 1
+        chars_bytes = chars.encode('ascii')
+        expected_bytes = expected.encode('ascii')
+    else:
+        width = 4
+        chars_bytes = chars.encode('utf-32-le')
+        expected_bytes = expected.encode('utf-32-le')
+
+    diff = (
+        int.from_bytes(chars_bytes, 'little') ^ int.from_bytes(expected_bytes, 'little')
+    ).to_bytes(len(chars_bytes), 'little')
+    if width == 1:
+        return [match.start() for match in _NONZERO_BYTE.finditer(diff)]
+
+    mismatches = []
+    for match in _NONZERO_BYTE.finditer(diff):
+        index = match.start() >> 2
+        if not mismatches or mismatches[-1] != index:
+            mismatches.append(index)
+    return mismatches
+
+_NONZERO_BYTE = re.compile(b'[^\x00]')
+
 # ----------- 测试 ----------- #
 
 if __name__ == "__main__":
@@ -216,4 +639,5 @@ if __name__ == "__main__":
     user_input = "The quick_brown fox jumps pver the lazy dog."
     for char in user_input:
         is_correct = engine.process_input(char)
-        time.sleep(0.1)  # 模拟输入延迟
\ No newline at end of file
+        time.sleep(0.1)  # 模拟输入延迟
+    engine.end_session()
\ No newline at end of file
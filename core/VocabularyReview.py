@@ -0,0 +1,266 @@
+import heapq
+import time
+
+DAY = 86400
+
+
+class Card:
+    """单词卡片（SM-2 复习状态）"""
+
+    __slots__ = (
+        'id', 'word', 'meaning', 'repetitions', 'interval',
+        'ease', 'lapses', 'next_due', 'reviewed_at'
+    )
+
+    COLUMNS = "id, word, meaning, repetitions, interval, ease, lapses, next_due, reviewed_at"
+
+    def __init__(
+        self, id:int, word:str, meaning:str = None, repetitions:int = 0, interval:float = 0,
+        ease:float = 2.5, lapses:int = 0, next_due:float = 0, reviewed_at:float = None
+    ):
+        self.id = id
+        self.word = word
+        self.meaning = meaning
+        self.repetitions = repetitions
+        self.interval = interval
+        self.ease = ease
+        self.lapses = lapses
+        self.next_due = next_due
+        self.reviewed_at = reviewed_at
+
+    def __repr__(self) -> str:
+        return f"Card({self.word!r}, due={self.next_due}, interval={self.interval})"
+
+
+def sm2(card:Card, grade:int, now:float) -> None:
+    """按 SM-2 算法更新卡片
+    Args:
+        card(Card): 卡片
+        grade(int): 回忆质量 0-5，低于 3 视为遗忘
+        now(float): 当前时间（Unix 秒）
+    """
+    if grade < 3:
+        # 遗忘：重新学习，短时间后再次出现
+        card.repetitions = 0
+        card.interval = 0
+        card.lapses += 1
+        card.next_due = now + ReviewScheduler.RELEARN_DELAY
+    else:
+        card.repetitions += 1
+        if card.repetitions == 1:
+            card.interval = 1
+        elif card.repetitions == 2:
+            card.interval = 6
+        else:
+            card.interval = round(card.interval * card.ease, 2)
+        card.next_due = now + card.interval * DAY
+    card.ease = max(1.3, card.ease + 0.1 - (5 - grade) * (0.08 + (5 - grade) * 0.02))
+    card.reviewed_at = now
+
+
+class ReviewScheduler:
+    """复习调度器
+
+    内存中的最小堆只保存按 (next_due, id) 排序最靠前的一批卡片，
+    堆空时沿 idx_cards_due 索引继续读取下一批。取卡与记录结果都是 O(log n)：
+    一次堆操作加一次按主键的 UPDATE。复习后到期时间超出已读取范围的卡片
+    不放回堆中，之后会被下一批读取重新取出。
+    """
+
+    # 每次从数据库读取的卡片数
+    BATCH_SIZE = 256
+    # 遗忘后再次出现的间隔（秒）
+    RELEARN_DELAY = 600
+
+    UPDATE_CARD = '''
+        UPDATE cards SET repetitions = ?, interval = ?, ease = ?, lapses = ?,
+                         next_due = ?, reviewed_at = ?
+        WHERE id = ?
+    '''
+
+    def __init__(self, database, user_id:int, deck:str = 'default'):
+        """初始化调度器
+        Args:
+            database(DatabaseManger): 数据库管理器
+            user_id(int): 用户编号
+            deck(str): 词库名称
+        """
+        self.database = database
+        self.user_id = user_id or 0
+        self.deck = deck
+        self.heap = []
+        # 已读入内存的最大 (next_due, id)；为空表示尚未读取
+        self.boundary = None
+        self.exhausted = False
+
+    def __len__(self) -> int:
+        """词库中的卡片总数"""
+        return self.database.query(
+            "SELECT COUNT(*) FROM cards WHERE user_id = ? AND deck = ?", (self.user_id, self.deck)
+        )[0][0]
+
+    # ----------- 导入 ----------- #
+
+    def import_words(self, words, now:float = None) -> int:
+        """在一个事务中批量导入单词（已存在的单词保留原有进度）
+        Args:
+            words(iterable): 单词，或 (单词, 释义)
+            now(float): 新卡片的到期时间，默认为当前时间
+        Returns:
+            count(int): 实际新增的卡片数
+        """
+        due = time.time() if now is None else now
+        rows = (
+            (self.user_id, self.deck, word, None, due) if isinstance(word, str)
+            else (self.user_id, self.deck, word[0], word[1], due)
+            for word in words
+        )
+        with self.database.transaction() as conn:
+            before = conn.total_changes
+            conn.executemany('''
+                INSERT INTO cards (user_id, deck, word, meaning, next_due) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (user_id, deck, word) DO NOTHING
+            ''', rows)
+            count = conn.total_changes - before
+        # 新卡片可能排在已读取范围之前，重新从索引读取
+        self.heap.clear()
+        self.boundary = None
+        self.exhausted = False
+        return count
+
+    def import_file(self, path:str, now:float = None) -> int:
+        """导入单词表文件（每行一个单词，可用制表符分隔释义）
+        Args:
+            path(str): 文件路径
+            now(float): 新卡片的到期时间，默认为当前时间
+        Returns:
+            count(int): 实际新增的卡片数
+        """
+        with open(path, encoding='utf-8') as file:
+            entries = [line.rstrip('\n').split('\t', 1) for line in file if line.strip()]
+        return self.import_words(
+            ((entry[0].strip(), entry[1].strip() if len(entry) > 1 else None) for entry in entries),
+            now=now
+        )
+
+    # ----------- 调度 ----------- #
+
+    def _refill(self) -> None:
+        """沿到期时间索引读取下一批卡片"""
+        if self.boundary is None:
+            rows = self.database.query(f'''
+                SELECT {Card.COLUMNS} FROM cards WHERE user_id = ? AND deck = ?
+                ORDER BY next_due, id LIMIT ?
+            ''', (self.user_id, self.deck, ReviewScheduler.BATCH_SIZE))
+        else:
+            rows = self.database.query(f'''
+                SELECT {Card.COLUMNS} FROM cards WHERE user_id = ? AND deck = ? AND (next_due, id) > (?, ?)
+                ORDER BY next_due, id LIMIT ?
+            ''', (self.user_id, self.deck, *self.boundary, ReviewScheduler.BATCH_SIZE))
+        if len(rows) < ReviewScheduler.BATCH_SIZE:
+            self.exhausted = True
+        for row in rows:
+            card = Card(*row)
+            heapq.heappush(self.heap, (card.next_due, card.id, card))
+        if rows:
+            last = rows[-1]
+            self.boundary = (last[7], last[0])
+
+    def peek(self) -> Card:
+        """到期时间最早的卡片（不论是否到期），词库为空时为 None"""
+        if not self.heap and not self.exhausted:
+            self._refill()
+        return self.heap[0][2] if self.heap else None
+
+    def next_card(self, now:float = None) -> Card:
+        """取出下一张已到期的卡片
+        Args:
+            now(float): 当前时间，默认为当前时间
+        Returns:
+            card(Card): 卡片，没有到期的卡片时为 None
+        """
+        card = self.peek()
+        if card is None or card.next_due > (time.time() if now is None else now):
+            return None
+        heapq.heappop(self.heap)
+        return card
+
+    def answer(self, card:Card, grade:int, now:float = None) -> None:
+        """记录一次复习结果并重新安排卡片
+        Args:
+            card(Card): next_card() 取出的卡片
+            grade(int): 回忆质量 0-5
+            now(float): 当前时间，默认为当前时间
+        """
+        sm2(card, grade, time.time() if now is None else now)
+        self.database.execute(ReviewScheduler.UPDATE_CARD, (
+            card.repetitions, card.interval, card.ease, card.lapses,
+            card.next_due, card.reviewed_at, card.id
+        ))
+        # 仍在已读取范围内的卡片放回堆中，否则留给之后的批量读取
+        if self.boundary is not None and (card.next_due, card.id) <= self.boundary:
+            heapq.heappush(self.heap, (card.next_due, card.id, card))
+        else:
+            self.exhausted = False
+
+    def due_count(self, now:float = None) -> int:
+        """已到期的卡片数"""
+        return self.database.query(
+            "SELECT COUNT(*) FROM cards WHERE user_id = ? AND deck = ? AND next_due <= ?",
+            (self.user_id, self.deck, time.time() if now is None else now)
+        )[0][0]
+
+
+class VocabularyReview:
+    """记单词模式
+
+    每张卡片是一次独立的小练习：把单词交给 TypingEngine 输入，
+    输入完成后按准确率与速度评分，再交给 ReviewScheduler 安排下次复习。
+    """
+
+    # 达到该速度且全部正确时评为 5 分
+    FLUENT_WPM = 30
+
+    def __init__(self, engine, scheduler:ReviewScheduler):
+        """初始化记单词模式
+        Args:
+            engine(TypingEngine): 打字引擎
+            scheduler(ReviewScheduler): 复习调度器
+        """
+        self.engine = engine
+        self.scheduler = scheduler
+        self.card = None
+
+    def next(self, now:float = None) -> Card:
+        """开始下一张到期卡片的练习
+        Returns:
+            card(Card): 当前卡片，没有到期的卡片时为 None
+        """
+        self.card = self.scheduler.next_card(now)
+        if self.card is not None:
+            self.engine.load_text(self.card.word)
+            self.engine.start_session()
+        return self.card
+
+    def grade(self) -> int:
+        """根据本次输入评分（0-5）"""
+        stats = self.engine.get_snapshot()
+        if self.engine.current_position < self.engine.total_chars:
+            return 0
+        if stats.accuracy >= 100:
+            return 5 if stats.wpm >= VocabularyReview.FLUENT_WPM else 4
+        if stats.accuracy >= 80:
+            return 3
+        return 2 if stats.accuracy >= 50 else 1
+
+    def finish(self, now:float = None) -> int:
+        """结束当前卡片的练习并记录结果
+        Returns:
+            grade(int): 本次评分
+        """
+        engine = self.engine
+        engine.end_session()
+        grade = self.grade()
+        self.scheduler.answer(self.card, grade, now)
+        self.card = None
+        return grade
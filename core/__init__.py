@@ -1,4 +1,38 @@
-from core.DatabaseManager import DatabaseManger
-from core.TyperApplication import TyperApplication
-from core.TypingEngine import TypingEngine
-from core.KeyboardListener import KeyboardListener
\ No newline at end of file
+import importlib
+import sys
+import types
+
+# 包级导出按需加载：首次访问时才导入对应模块，
+# 因此 import core 不会导入 tkinter（TyperApplication）或 sqlite3（DatabaseManger）
+_EXPORTS = {
+    'DatabaseManger': 'core.DatabaseManager',
+    'TyperApplication': 'core.TyperApplication',
+    'TypingEngine': 'core.TypingEngine',
+    'KeyboardListener': 'core.KeyboardListener',
+}
+
+__all__ = list(_EXPORTS)
+
+
+class _LazyPackage(types.ModuleType):
+
+    def __getattr__(self, name):
+        module = _EXPORTS.get(name)
+        if module is None:
+            raise AttributeError(f"module {self.__name__!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module), name)
+        super().__setattr__(name, value)
+        return value
+
+    def __setattr__(self, name, value):
+        # 与类同名的子模块导入完成时，导入系统会把子模块写入包属性；
+        # 这里改为写入类本身，保持 from core import TypingEngine 得到类
+        if isinstance(value, types.ModuleType) and _EXPORTS.get(name) == value.__name__:
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | set(_EXPORTS))
+
+
+sys.modules[__name__].__class__ = _LazyPackage
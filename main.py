@@ -1,5 +1,86 @@
-from core import TyperApplication
+import sys
+
+USAGE = """用法:
+    python main.py                              启动图形界面
+    python main.py --headless [文本文件] [--database 路径]
+                                                终端练习模式（不导入 tkinter）
+    python main.py --profile 路径 ...             开启输入管线埋点，退出时导出
+                                                （.json 为 JSON，其他为 Prometheus 文本格式）
+"""
+
+
+def run_headless(text_path:str = None, database_path:str = None) -> None:
+    """终端练习模式：逐行读取输入，结束后输出统计"""
+    from core.TypingEngine import TypingEngine
+
+    if text_path is None:
+        text = "The quick brown fox jumps over the lazy dog."
+    else:
+        with open(text_path, encoding='utf-8') as file:
+            text = file.read().strip()
+
+    writer = database = None
+    if database_path is not None:
+        from core.DatabaseManager import DatabaseManger
+        from core.SessionWriter import SessionWriter
+        database = DatabaseManger(database_path)
+        writer = SessionWriter(database)
+
+    engine = TypingEngine(writer=writer)
+    # 状态在每行输入后输出，避免后台推送打断终端输入
+    engine.status_update = lambda status: None
+    engine.load_text(text)
+    print(text)
+    engine.start_session()
+    try:
+        while engine.current_position < engine.total_chars:
+            line = sys.stdin.readline()
+            if not line:
+                break
+            # 换行视为空格
+            engine.process_inputs(line.rstrip('\n'))
+            if engine.current_position < engine.total_chars:
+                engine.process_inputs(' ')
+            engine.print_status(engine.get_current_status())
+            print()
+    except KeyboardInterrupt:
+        pass
+    engine.end_session()
+
+    stats = engine.get_stats()
+    print(f"\n速度: {stats['wpm']} WPM | 准确率: {stats['accuracy']}% | 错误: {stats['error_counts']}")
+    if database is not None:
+        from core.Achievements import AchievementEngine
+        achievements = AchievementEngine(database)
+        for code in achievements.record(stats):
+            print(f"解锁成就: {achievements.rules[code].title}")
+    if writer is not None:
+        writer.close()
+        database.close()
+
+
+def main(argv:list) -> None:
+    if argv and argv[0] == '--profile':
+        # 与设置环境变量 JTYPEWRITER_PROFILE 等价
+        from core.Instrumentation import Instrumentation
+        Instrumentation.enable(argv[1])
+        argv = argv[2:]
+
+    if argv and argv[0] in ('-h', '--help'):
+        print(USAGE)
+    elif argv and argv[0] == '--headless':
+        args = argv[1:]
+        database_path = None
+        if '--database' in args:
+            index = args.index('--database')
+            database_path = args[index + 1]
+            del args[index:index + 2]
+        run_headless(args[0] if args else None, database_path)
+    else:
+        from core import TyperApplication
+        app = TyperApplication()
+        app.run()
+
 
 if __name__ == "__main__":
-    app = TyperApplication()
-    app.run()
\ No newline at end of file
+    main(sys.argv[1:])
@@ -0,0 +1,88 @@
+from core.Achievements import (
+    AchievementEngine, BestAverageRule, CumulativeRule, StreakRule, ThresholdRule
+)
+from core.DatabaseManager import DatabaseManger
+from core.StatusScheduler import StatusScheduler
+from core.TypingEngine import TypingEngine
+
+DAY = 86400
+NOON = 1_700_000_000 - 1_700_000_000 % DAY + DAY // 2
+
+RULES = (
+    ThresholdRule('fast', "fast", wpm=60, accuracy=95),
+    CumulativeRule('chars', "chars", 'typed_chars', 1000),
+    StreakRule('streak', "streak", 3),
+    BestAverageRule('steady', "steady", 'wpm', 3, 50),
+)
+
+def session(day, wpm, typed_chars=300, accuracy=97.0):
+    start = NOON + day * DAY
+    return {'wpm': wpm, 'typed_chars': typed_chars, 'accuracy': accuracy,
+            'start_time': start, 'end_time': start + 60}
+
+def test_rules_unlock_incrementally(tmp_path):
+    database = DatabaseManger(str(tmp_path / "test.db"))
+    achievements = AchievementEngine(database, 1, RULES)
+    assert achievements.record(session(0, 30)) == []
+    assert achievements.record(session(1, 55)) == []
+    # 隔一天：连续天数重新计算
+    assert achievements.record(session(3, 52)) == []
+    assert achievements.states['streak']['streak'] == 1
+    assert set(achievements.record(session(4, 61))) == {'fast', 'chars', 'steady'}
+    assert achievements.record(session(5, 40)) == ['streak']
+    assert achievements.unlocked['streak'] == session(5, 40)['end_time']
+
+def test_state_persists_without_history_scan(tmp_path):
+    database = DatabaseManger(str(tmp_path / "test.db"))
+    achievements = AchievementEngine(database, 1, RULES)
+    for day in range(2):
+        achievements.record(session(day, 48))
+
+    reloaded = AchievementEngine(database, 1, RULES)
+    assert reloaded.states == achievements.states
+    assert set(reloaded.record(session(2, 56))) == {'streak', 'steady'}
+    assert not AchievementEngine(database, 2, RULES).unlocked
+    # 已达成的规则不再计算，也不再写入
+    rows = database.query("SELECT code, unlocked_at FROM achievements WHERE user_id = 1 ORDER BY code")
+    assert [code for code, _ in rows] == ['chars', 'steady', 'streak']
+
+def test_only_dependent_rules_are_evaluated(tmp_path):
+    database = DatabaseManger(str(tmp_path / "test.db"))
+    achievements = AchievementEngine(database, 1, RULES)
+    achievements.record({'typed_chars': 600})
+    assert achievements.states['chars'] == {'total': 600}
+    assert achievements.states['streak']['streak'] == 0
+    assert achievements.states['steady']['recent'] == []
+
+def test_fed_by_engine_stats(tmp_path):
+    database = DatabaseManger(str(tmp_path / "test.db"))
+    achievements = AchievementEngine(database)
+    engine = TypingEngine(StatusScheduler())
+    engine.status_update = lambda status: None
+    engine.load_text("hello world")
+    engine.start_session()
+    engine.process_inputs("hello world")
+    engine.end_session()
+    assert 'first_session' in achievements.record(engine.get_stats())
+
+def test_unchanged_inputs_and_states_are_skipped(tmp_path, monkeypatch):
+    database = DatabaseManger(str(tmp_path / "test.db"))
+    calls = []
+
+    class CountingRule(ThresholdRule):
+        def update(self, state, stats):
+            calls.append(stats['wpm'])
+            return super().update(state, stats)
+
+    achievements = AchievementEngine(database, 1, RULES + (CountingRule('counted', "counted", wpm=100),))
+    achievements.record(session(0, 30))
+    achievements.record(session(0, 30))
+    achievements.record(session(0, 40))
+    # 无状态规则只在输入变化时计算
+    assert calls == [30, 40]
+
+    writes = []
+    monkeypatch.setattr(database, 'executemany', lambda sql, rows: writes.append([row[1] for row in rows]))
+    # 同一天、0 字符：连续天数与累计字符都不变，只有最近 N 次平均的状态变化
+    achievements.record(session(0, 30, typed_chars=0))
+    assert writes == [['steady']]
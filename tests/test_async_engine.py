@@ -0,0 +1,86 @@
+import asyncio
+import threading
+from core.AsyncEngine import AsyncDatabase, AsyncEngineHost
+from core.SessionWriter import SessionWriter
+
+def test_async_sessions(tmp_path):
+    async def main():
+        database = await AsyncDatabase.open(str(tmp_path / "test.db"))
+        writer = SessionWriter(database.database)
+        host = AsyncEngineHost(writer, frame_interval=0.01)
+        # 开始、结束会话只用宿主的一个线程池线程，不为每个会话启动线程
+        threads = threading.active_count() + 1
+
+        async def typist(user_id):
+            session = await host.open(user_id, "async typing")
+            statuses = []
+
+            async def watch():
+                async for status in session.statuses():
+                    statuses.append(status)
+            watcher = asyncio.create_task(watch())
+            for char in "async typxng":
+                await session.feed(char)
+                await asyncio.sleep(0.002)
+            stats = await session.end(flush=False)
+            await watcher
+            return stats, statuses
+
+        results = await asyncio.gather(*(typist(i) for i in range(1, 201)))
+        assert threading.active_count() <= threads
+        for stats, statuses in results:
+            assert stats['typed_chars'] == 12 and stats['error_counts'] == 1
+            assert statuses and statuses[-1]['current_position'] == 12
+
+        await host.flush()
+        rows = await database.query("SELECT COUNT(*), SUM(typed_chars) FROM sessions")
+        assert rows == [(200, 2400)]
+        writer.close()
+        await database.close()
+
+    asyncio.run(main())
+
+def test_open_and_end_do_not_block_loop(tmp_path, monkeypatch):
+    import time
+    from core.DatabaseManager import DatabaseManger
+
+    database = DatabaseManger(str(tmp_path / "test.db"))
+    writer = SessionWriter(database)
+    new_session_id = writer.new_session_id
+    record_session = writer.record_session
+
+    def slow_new_session_id():
+        time.sleep(0.2)
+        return new_session_id()
+
+    def slow_record_session(*args):
+        time.sleep(0.2)
+        record_session(*args)
+
+    # 模拟写锁被长时间占用、写入队列已满
+    monkeypatch.setattr(writer, "new_session_id", slow_new_session_id)
+    monkeypatch.setattr(writer, "record_session", slow_record_session)
+
+    async def main():
+        host = AsyncEngineHost(writer, frame_interval=0.01)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+        task = asyncio.create_task(ticker())
+        session = await host.open(1, "abc")
+        await session.feed("abc")
+        stats = await session.end()
+        task.cancel()
+        await host.close_all()
+        return ticks, stats
+
+    ticks, stats = asyncio.run(main())
+    assert ticks >= 10
+    assert stats['typed_chars'] == 3
+    assert database.query("SELECT typed_chars FROM sessions") == [(3,)]
+    writer.close()
+    database.close()
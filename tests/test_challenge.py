@@ -0,0 +1,129 @@
+import itertools
+import time
+
+from core.Challenge import TimedChallenge, QuotaChallenge
+from core.Clock import VirtualClock
+from core.DeadlineScheduler import DeadlineScheduler
+from core.StatusScheduler import StatusScheduler
+from core.TypingEngine import TypingEngine
+
+SECOND = 1_000_000_000
+MS = 1_000_000
+
+def make_engine(text="", clock=None):
+    engine = TypingEngine(StatusScheduler(), clock=clock)
+    engine.status_update = lambda status: None
+    if text:
+        engine.load_text(text)
+    return engine
+
+def manual_scheduler():
+    # 由测试以虚拟时钟的读数调用 run_due 驱动
+    scheduler = DeadlineScheduler()
+    scheduler.attach_timer(lambda delay, callback: None)
+    return scheduler
+
+def test_deadline_scheduler_wakes_at_deadline():
+    scheduler = DeadlineScheduler()
+    fired = []
+    now = time.perf_counter_ns()
+    scheduler.schedule(now + 30 * MS, lambda: fired.append(time.perf_counter_ns()))
+    cancelled = scheduler.schedule(now + 10 * MS, lambda: fired.append(None))
+    scheduler.cancel(cancelled)
+    time.sleep(0.1)
+    assert len(fired) == 1
+    assert now + 30 * MS <= fired[0] < now + 60 * MS
+
+def test_timed_challenge_ends_exactly_at_deadline():
+    clock = VirtualClock(10 * SECOND)
+    scheduler = manual_scheduler()
+    engine = make_engine(clock=clock)
+    stream = itertools.repeat("the quick brown fox")
+    challenge = TimedChallenge(engine, 60, stream, scheduler)
+    challenge.start()
+    start = engine.start_time
+
+    typed = 0
+    while clock() < start + 61 * SECOND:
+        # 文本按需延长，永远不会用完
+        assert engine.current_position < len(engine.text)
+        engine.process_inputs(engine.text[engine.current_position:engine.current_position + 10],
+                              [clock.advance(100 * MS) for _ in range(10)])
+        typed += 10
+    scheduler.run_due(clock())
+
+    stats = engine.get_stats()
+    assert stats['is_completed']
+    assert engine.get_duration_ns() == 60 * SECOND
+    # 截止之后才处理的按键不计入
+    assert engine.current_position == 599
+    assert len(engine.text) < 600 + 2 * TimedChallenge.LOOKAHEAD
+
+def test_timed_challenge_pause_moves_deadline():
+    clock = VirtualClock()
+    scheduler = manual_scheduler()
+    engine = make_engine("hello world " * 100, clock=clock)
+    challenge = TimedChallenge(engine, 10, scheduler=scheduler)
+    challenge.start()
+    clock.advance(4 * SECOND)
+    engine.pause_session()
+    clock.advance(5 * SECOND)
+    engine.resume_session()
+    clock.advance(5 * SECOND)
+    scheduler.run_due(clock())
+    assert engine.is_active
+    clock.advance(1 * SECOND)
+    scheduler.run_due(clock())
+    assert engine.is_completed
+    assert engine.get_duration_ns() == 10 * SECOND
+
+def test_quota_challenge():
+    clock = VirtualClock()
+    engine = make_engine("one two three four five", clock=clock)
+    challenge = QuotaChallenge(engine, words=3)
+    assert challenge.quota == len("one two three")
+    challenge.start()
+    for char in "one two ":
+        engine.process_input(char, clock.advance(200 * MS))
+    assert engine.is_active
+    engine.process_inputs("three four", [clock.advance(200 * MS) for _ in range(10)])
+    assert engine.is_completed
+    assert engine.current_position == len("one two three")
+    assert engine.get_duration_ns() == len("one two three") * 200 * MS
+    assert engine.process_inputs("x") == 0 or not engine.is_active
+
+def test_deadline_scheduler_cancel_and_len():
+    scheduler = manual_scheduler()
+    handles = [scheduler.schedule(i * MS, lambda: None) for i in range(1, 4)]
+    scheduler.cancel(handles[1])
+    scheduler.cancel(handles[1])
+    assert len(scheduler) == 2
+    assert scheduler.run_due(1 * MS) == 1
+    # 已执行的回调再取消不影响计数
+    scheduler.cancel(handles[0])
+    assert len(scheduler) == 1
+    assert scheduler.run_due(10 * MS) == 1
+    assert len(scheduler) == 0 and not scheduler.live
+
+def test_expire_waits_for_input_in_progress():
+    import threading
+    clock = VirtualClock()
+    scheduler = manual_scheduler()
+    engine = make_engine("hello world " * 10, clock=clock)
+    challenge = TimedChallenge(engine, 1, scheduler=scheduler)
+    challenge.start()
+    clock.advance(2 * SECOND)
+
+    # 输入线程正在处理按键时，调度线程中的截止回调等待其完成
+    with challenge.lock:
+        expiry = threading.Thread(target=scheduler.run_due, args=(clock(),))
+        expiry.start()
+        expiry.join(0.05)
+        assert expiry.is_alive() and engine.is_active
+        engine.process_input('h', engine.start_time + SECOND - MS)
+    expiry.join()
+    assert engine.is_completed and engine.current_position == 1
+    assert engine.get_duration_ns() == SECOND
+    # 会话结束后才到达的按键即使早于截止时刻也不计入
+    engine.process_input('e', engine.start_time + SECOND - MS)
+    assert engine.current_position == 1
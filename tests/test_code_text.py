@@ -0,0 +1,76 @@
+import os
+from core.CodeText import CodeText, TokenCache
+from core.StatusScheduler import StatusScheduler
+from core.TypingEngine import TypingEngine
+
+SOURCE = (
+    "import os\r\n"
+    "\r\n"
+    "\r\n"
+    "def main(argv):   \n"
+    "    if argv:\n"
+    "        return 1  # one\n"
+    "\n"
+    "    return 0\n"
+)
+
+def test_whitespace_handling():
+    code = CodeText(SOURCE, "main.py")
+    assert code.text == "import os\ndef main(argv):\nif argv:\nreturn 1  # one\nreturn 0"
+    assert code.indents == ['', '', '    ', '        ', '    ']
+
+    code = CodeText(SOURCE, "main.py", skip_indent=False, collapse_newlines=False)
+    assert code.text == "import os\n\n\ndef main(argv):\n    if argv:\n        return 1  # one\n\n    return 0"
+
+def test_token_lookup():
+    code = CodeText(SOURCE, "main.py")
+    position = code.text.index("return")
+    assert code.token_at(position) == (position, position + len("return"), 'Keyword')
+    assert code.token_at(code.text.index("# one"))[2] == 'Comment'
+    segments = list(code.tokens_between(0, len(code.text)))
+    assert "".join(code.text[start:end] for start, end, _ in segments) == code.text
+    assert sum(code.class_lengths().values()) == len(code.text)
+
+def test_cache(tmp_path, monkeypatch):
+    import core.CodeText
+    cache = TokenCache(str(tmp_path))
+    first = CodeText(SOURCE, "main.py", cache=cache)
+    assert len(os.listdir(tmp_path)) == 1
+    # 命中缓存时不再分析
+    with monkeypatch.context() as patch:
+        patch.setattr(core.CodeText, '_build', None)
+        second = CodeText(SOURCE, "other.py", cache=cache)
+    assert second.text == first.text
+    assert list(second.starts) == list(first.starts)
+    assert list(second.kinds) == list(first.kinds) and second.classes == first.classes
+    # 选项不同时使用不同的缓存
+    CodeText(SOURCE, "main.py", skip_indent=False, cache=cache)
+    assert len(os.listdir(tmp_path)) == 2
+
+def test_invalid_cache_rebuilt(tmp_path):
+    import marshal, pickle
+    cache = TokenCache(str(tmp_path))
+    expected = CodeText(SOURCE, "main.py", cache=cache).text
+    (name,) = os.listdir(tmp_path)
+    key = name[:-len('.tokens')]
+    header = TokenCache.CACHE_HEADER
+
+    # 旧的 pickle 缓存、截断的缓存与编号越界的缓存都只会触发重新分析
+    for content in (
+        pickle.dumps({'lexer': 'Python', 'text': 'x', 'starts': [], 'kinds': [], 'classes': [], 'indents': []}),
+        header + marshal.dumps(('Python', 'x', b'', b'', [], []))[:-2],
+        header + marshal.dumps(('Python', 'xy', b'\0\0\0\0', b'\3', ['Text'], [])),
+    ):
+        (tmp_path / (key + '.tokens')).write_bytes(content)
+        assert CodeText(SOURCE, "main.py", cache=cache).text == expected
+        assert cache.load(key) is not None
+
+def test_error_stats_by_token_class():
+    code = CodeText(SOURCE, "main.py")
+    engine = TypingEngine(StatusScheduler())
+    engine.status_update = lambda status: None
+    engine.load_text(code.text)
+    engine.start_session()
+    typed = code.text.replace("def", "dex").replace("argv", "argc")
+    engine.process_inputs(typed)
+    assert code.error_stats(engine.error_positions) == {'Keyword': 1, 'Name': 2}
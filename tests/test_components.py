@@ -0,0 +1,75 @@
+from ui.components import DiffRenderer
+
+def test_incremental_changes():
+    renderer = DiffRenderer(5)
+    assert renderer.segments() == [(0, 1, 'current'), (1, 5, 'pending')]
+
+    assert renderer.advance(True) == [(0, 1, 'correct'), (1, 2, 'current')]
+    assert renderer.advance(False) == [(1, 2, 'error'), (2, 3, 'current')]
+    renderer.advance(False)
+    assert renderer.segments() == [
+        (0, 1, 'correct'), (1, 3, 'error'), (3, 4, 'current'), (4, 5, 'pending')
+    ]
+
+    assert renderer.retreat() == [(2, 3, 'current'), (3, 4, 'pending')]
+    assert renderer.runs == [[0, 1, 'correct'], [1, 2, 'error']]
+
+def test_sync_coalesces():
+    renderer = DiffRenderer(10)
+    correctness = [True, True, False, True]
+    changes = renderer.sync(4, correctness.__getitem__)
+    assert changes == [(0, 2, 'correct'), (2, 3, 'error'), (3, 4, 'correct'), (4, 5, 'current')]
+    assert renderer.sync(3, correctness.__getitem__) == [(3, 4, 'current'), (4, 5, 'pending')]
+
+def test_viewport_window():
+    from ui.components import TextViewport
+    text = "\n".join("line%04d " % i * 3 for i in range(10000))
+    viewport = TextViewport(text, rows=6, columns=10, prefetch=0)
+    start, content = viewport.materialize(0)
+    assert start == 0
+    assert content.count("\n") < 6
+
+    position = text.index("line0500")
+    start, content = viewport.materialize(position)
+    assert start <= position < start + len(content)
+    assert len(content) <= 6 * 10 + 6
+    assert viewport.needs_refresh(position) == False
+    assert viewport.lines.is_complete == False
+
+def test_viewport_scroll_by_rows():
+    from ui.components import TextViewport
+    text = "\n".join("row%06d" % i for i in range(1000))
+    viewport = TextViewport(text, rows=6, columns=10, prefetch=0)
+    viewport.materialize(0)
+
+    start, content = viewport.scroll(1)
+    assert start == text.index("row000001")
+    assert content.startswith("row000001") and content.count("\n") == 6
+    start, content = viewport.scroll(-1)
+    assert start == 0
+    assert viewport.scroll(-1)[0] == 0
+
+    # 翻页
+    start, content = viewport.scroll(viewport.rows)
+    assert start == text.index("row000006")
+    assert content.startswith("row000006\nrow000007")
+    start, _ = viewport.scroll(-viewport.rows)
+    assert start == 0
+
+    # 到达末尾时区间保持填满
+    start, content = viewport.scroll(10_000)
+    assert content.endswith("row000999")
+    assert start == text.index("row000994")
+
+def test_viewport_scroll_wrapped_and_short_lines():
+    from ui.components import TextViewport
+    text = "a" * 25 + "\nb\n\nc" + "d" * 14 + "\ne"
+    viewport = TextViewport(text, rows=2, columns=10, prefetch=0)
+    viewport.materialize(0)
+    # 第一行折成 3 个显示行
+    assert viewport.scroll(1)[0] == 10
+    assert viewport.scroll(1)[0] == 20
+    assert viewport.scroll(1)[0] == text.index("b")
+    # 空行也是一个显示行
+    assert viewport.scroll(2)[0] == text.index("c")
+    assert viewport.scroll(-3)[0] == 20
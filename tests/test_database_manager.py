@@ -1,6 +1,45 @@
 import os
+import threading
 from core import DatabaseManager as DM
 
 def test_is_path_exist():
     path = DM.DatabaseManger.DATABASE_PATH
-    assert os.path.exists(path) == True
\ No newline at end of file
+    assert os.path.exists(path) == True
+def test_connection_reused_per_thread(tmp_path):
+    database = DM.DatabaseManger(str(tmp_path / "test.db"))
+    assert database.get_connection() is database.get_connection()
+    assert database.query("PRAGMA journal_mode")[0][0] == 'wal'
+
+    def insert(index):
+        for i in range(20):
+            with database.transaction() as conn:
+                conn.execute("INSERT INTO users (username) VALUES (?)", (f"user{index}-{i}",))
+
+    threads = [threading.Thread(target=insert, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert database.query("SELECT COUNT(*) FROM users")[0][0] == 80
+    assert len(database.connections) == 5
+    database.close()
+
+def test_migrate_existing_database(tmp_path):
+    import sqlite3
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT UNIQUE NOT NULL)")
+    conn.execute("INSERT INTO users (username) VALUES ('old')")
+    conn.commit()
+    conn.close()
+
+    database = DM.DatabaseManger(path)
+    assert database.schema_version() == DM.LATEST_VERSION
+    assert database.query("SELECT username FROM users") == [('old',)]
+    plan = database.query(
+        "EXPLAIN QUERY PLAN SELECT started_at, wpm FROM sessions WHERE user_id = 1 ORDER BY started_at"
+    )
+    assert 'COVERING INDEX idx_sessions_user_started' in plan[0][-1]
+    assert database.migrate() == DM.LATEST_VERSION
+    database.close()
@@ -0,0 +1,32 @@
+from core.Clock import VirtualClock
+from core.DatabaseManager import DatabaseManger
+from core.EngineHost import EngineHost
+from core.SessionWriter import SessionWriter
+
+def test_sessions_share_texts_and_writer(tmp_path):
+    database = DatabaseManger(str(tmp_path / "test.db"))
+    writer = SessionWriter(database)
+    clock = VirtualClock(10 ** 12)
+    host = EngineHost(writer, clock=clock)
+
+    text = "shared text"
+    engines = [host.open(user_id, "".join(["shared", " text"])) for user_id in range(1, 6)]
+    assert len(host.texts) == 1
+    assert all(engine.text is engines[0].text for engine in engines)
+    assert not hasattr(engines[0], '__dict__')
+
+    for user_id in range(1, 6):
+        for char in text[:user_id * 2]:
+            clock.advance(100_000_000)
+            host.feed(user_id, char if user_id != 3 else 'x')
+    assert host.feed(5, "t" * 100, [clock()] * 100) == 1
+    assert host.backspace(1)
+
+    stats = host.close(3)
+    assert stats['error_counts'] == 6
+    host.close_all()
+    assert len(host) == 0 and len(host.texts) == 0
+    rows = database.query("SELECT user_id, typed_chars FROM sessions ORDER BY user_id")
+    assert rows == [(1, 1), (2, 4), (3, 6), (4, 8), (5, 11)]
+    writer.close()
+    database.close()
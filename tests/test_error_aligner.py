@@ -0,0 +1,133 @@
+import random
+from core.ErrorAligner import ErrorAligner, SUBSTITUTION, INSERTION, OMISSION, TRANSPOSITION
+from core.StatusScheduler import StatusScheduler
+from core.TypingEngine import TypingEngine
+
+TEXT = "the quick brown fox jumps over the lazy dog"
+
+def align(typed, text=TEXT):
+    aligner = ErrorAligner()
+    aligner.reset(text)
+    aligner.feed_many(typed)
+    aligner.finish()
+    return aligner
+
+def test_classification():
+    cases = {
+        "the quixk brown fox": (SUBSTITUTION, 'c'),
+        "the quicck brown fox": (INSERTION, 'k'),
+        "the quik brown fox": (OMISSION, 'c'),
+        "teh quick brown fox": (TRANSPOSITION, 'h'),
+    }
+    for typed, (kind, char) in cases.items():
+        aligner = align(typed)
+        assert dict(aligner.counts) == {kind: 1}, typed
+        assert dict(aligner.error_analysis) == {char: 1}, typed
+        assert aligner.position == len("the quick brown fox")
+
+def test_backspace_restores_state():
+    aligner = align("the quik brown")
+    for _ in range(len(" brown") + 2):
+        assert aligner.pop()
+    assert aligner.counts[OMISSION] == 0
+    assert aligner.position == len("the qu")
+    aligner.feed_many("ick brown fox")
+    aligner.finish()
+    assert sum(aligner.counts.values()) == 0
+    assert aligner.position == len("the quick brown fox")
+
+def test_drift_does_not_cascade():
+    rng = random.Random(3)
+    words = ["alpha", "beta", "gamma", "delta", "epsilon", "zeta", "theta"]
+    text = " ".join(rng.choice(words) for _ in range(2000))
+    typed = []
+    injected = {SUBSTITUTION: 0, INSERTION: 0, OMISSION: 0}
+    position = 0
+    while position < len(text):
+        if position % 40 == 20:
+            kind = rng.choice(list(injected))
+            injected[kind] += 1
+            if kind == SUBSTITUTION:
+                typed.append('#')
+            elif kind == INSERTION:
+                typed.append('#')
+                typed.append(text[position])
+            position += 1
+            continue
+        typed.append(text[position])
+        position += 1
+    aligner = align("".join(typed), text)
+    assert {kind: aligner.counts[kind] for kind in injected} == injected
+    assert aligner.position == len(text)
+
+def test_engine_alignment_mode():
+    engine = TypingEngine(StatusScheduler(), aligner=ErrorAligner())
+    engine.status_update = lambda status: None
+    engine.load_text(TEXT)
+    engine.start_session()
+    engine.process_inputs("the quik brown fox jumps over the lazy dog")
+    engine.end_session()
+    stats = engine.get_stats()
+    assert stats['error_analysis'] == {'c': 1}
+    assert stats['alignment'] == {SUBSTITUTION: 0, INSERTION: 0, OMISSION: 1, TRANSPOSITION: 0}
+    # 漏打之后的字符不再全部算错：只有一处错误，输入的字符全部正确
+    assert engine.error_counts == stats['error_counts'] == 1
+    assert engine.correct_chars == len("the quik brown fox jumps over the lazy dog")
+    assert stats['accuracy'] == 100.0
+    assert engine.error_positions == {len("the qui"): 1}
+    assert engine.current_position == len(TEXT) and stats['is_completed']
+
+def test_engine_alignment_insertion_reaches_end():
+    for typed, expected in (("thhe cat", 'e'), ("the cxat", 'a')):
+        engine = TypingEngine(StatusScheduler(), aligner=ErrorAligner())
+        engine.status_update = lambda status: None
+        engine.load_text("the cat")
+        engine.start_session()
+        for char in typed:
+            assert engine.current_position < engine.total_chars, typed
+            engine.process_input(char)
+        assert engine.current_position == engine.total_chars, typed
+        engine.end_session()
+        stats = engine.get_stats()
+        assert stats['alignment'][INSERTION] == 1 and stats['error_analysis'] == {expected: 1}, typed
+        assert stats['error_counts'] == 1 and stats['accuracy'] == 87.5, typed
+
+        # 批量输入同样按对齐位置判断文本末尾，多余的输入被忽略
+        engine.start_session()
+        assert engine.process_inputs(typed + "xyz") == len(typed), typed
+        engine.end_session()
+        assert engine.get_stats()['error_counts'] == 1, typed
+
+def test_engine_alignment_backspace():
+    engine = TypingEngine(StatusScheduler(), aligner=ErrorAligner())
+    engine.status_update = lambda status: None
+    engine.load_text(TEXT)
+    engine.start_session()
+    engine.process_inputs("the quicck b")
+    assert engine.error_counts == 1 and engine.current_position == len("the quick b")
+    for _ in range(len("ck b")):
+        assert engine.backspace()
+    assert engine.error_counts == 0 and not engine.error_positions
+    assert engine.current_position == len("the quic")
+    engine.process_inputs("k brown")
+    assert engine.error_counts == 0 and engine.correct_chars == len("the quick brown")
+
+def test_backspace_removes_zero_counts():
+    aligner = align("the quixk brown")
+    assert dict(aligner.error_analysis) == {'c': 1}
+    for _ in range(len("xk brown")):
+        aligner.pop()
+    assert dict(aligner.error_analysis) == {} and dict(aligner.counts) == {}
+
+def test_mmap_text_not_scanned(tmp_path, monkeypatch):
+    from core.TextSource import MmapTextSource
+    monkeypatch.setattr(MmapTextSource, 'BLOCK_SIZE', 64)
+    path = tmp_path / "text.txt"
+    path.write_text(TEXT + " " + "filler words " * 500, encoding='utf-8')
+    with MmapTextSource(str(path)) as source:
+        aligner = ErrorAligner()
+        aligner.reset(source)
+        aligner.feed_many("the quicck brown fox")
+        aligner.finish()
+        assert dict(aligner.counts) == {INSERTION: 1}
+        assert source.length is None
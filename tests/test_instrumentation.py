@@ -0,0 +1,61 @@
+import json
+
+from core.Instrumentation import Instrumentation, PROCESS_INPUT, STATS, RENDER, STAGES
+from core.TypingEngine import TypingEngine
+
+
+def make_engine(probe):
+    engine = TypingEngine()
+    engine.probe = probe
+    engine.status_update = lambda status: None
+    engine.load_text("hello world")
+    engine.start_session()
+    return engine
+
+
+def test_engine_stages_are_recorded():
+    probe = Instrumentation()
+    engine = make_engine(probe)
+    for char in "hello":
+        engine.process_input(char)
+    engine.process_inputs(" world")
+    assert probe.count(PROCESS_INPUT) == 6
+    assert probe.count(STATS) == 1
+    assert probe.count(RENDER) == 1
+    assert probe.percentile(PROCESS_INPUT, 50) > 0
+
+
+def test_sampling():
+    probe = Instrumentation(sample_every=4)
+    engine = make_engine(probe)
+    for char in "hello wo":
+        engine.process_input(char)
+    assert probe.count(PROCESS_INPUT) == 2
+
+
+def test_disabled_engine_has_no_probe(monkeypatch):
+    # 全局埋点的状态在测试结束后恢复，不影响其他测试
+    monkeypatch.setattr(Instrumentation, '_shared', Instrumentation._shared)
+    monkeypatch.setattr(Instrumentation, '_shared_loaded', Instrumentation._shared_loaded)
+    Instrumentation.disable()
+    assert TypingEngine().probe is None
+
+
+def test_export(tmp_path):
+    probe = Instrumentation()
+    probe.record(PROCESS_INPUT, 1500)
+    probe.record(PROCESS_INPUT, 3_000_000)
+
+    path = tmp_path / "stages.json"
+    probe.export(str(path))
+    data = json.loads(path.read_text(encoding='utf-8'))
+    assert set(data['stages']) == set(STAGES)
+    assert data['stages']['process_input']['count'] == 2
+    assert data['stages']['process_input']['sum_ns'] == 3_001_500
+
+    path = tmp_path / "stages.prom"
+    probe.export(str(path))
+    lines = path.read_text(encoding='utf-8').splitlines()
+    assert 'jtypewriter_stage_latency_seconds_bucket{stage="process_input",le="2e-06"} 1' in lines
+    assert 'jtypewriter_stage_latency_seconds_bucket{stage="process_input",le="+Inf"} 2' in lines
+    assert 'jtypewriter_stage_latency_seconds_count{stage="process_input"} 2' in lines
@@ -0,0 +1,99 @@
+import random
+from bisect import bisect_right
+from core.Clock import VirtualClock
+from core.DatabaseManager import DatabaseManger
+from core.KeyLatency import BOUNDS, KeyLatency, _interval_buckets
+from core.SessionWriter import SessionWriter
+from core.StatusScheduler import StatusScheduler
+from core.TypingEngine import TypingEngine
+
+MS = 1_000_000
+
+def test_batch_matches_single():
+    # ASCII 文本按字节分桶，其他文本逐个二分查找
+    for alphabet in ("abc d", "aé 中"):
+        rng = random.Random(5)
+        text = "".join(rng.choice(alphabet) for _ in range(2000))
+        timestamps = []
+        now = 0
+        for _ in text:
+            now += rng.choice((80 * MS, 150 * MS, 400 * MS, 6000 * MS, rng.choice(BOUNDS) - 1, rng.choice(BOUNDS)))
+            timestamps.append(now)
+        errors = sorted(rng.sample(range(len(text)), 60)) + [len(text) - 1]
+
+        single = KeyLatency()
+        for i, char in enumerate(text):
+            if i in errors:
+                single.interrupt()
+            else:
+                single.record(char, timestamps[i])
+        batch = KeyLatency()
+        for start in range(0, len(text), 333):
+            batch.record_many(
+                text[start:start + 333], timestamps[start:start + 333],
+                [i - start for i in errors if start <= i < start + 333]
+            )
+        assert batch.keys == single.keys
+        assert batch.bigrams == single.bigrams
+        assert sum(map(sum, single.keys.values())) < len(text) - len(errors)
+
+def test_batches_fold_immediately_in_order():
+    single = KeyLatency()
+    mixed = KeyLatency()
+    for i, char in enumerate("abcabc"):
+        single.record(char, (i + 1) * 100 * MS)
+    mixed.record_many("abc", [100 * MS, 200 * MS, 300 * MS])
+    assert sum(mixed.histogram("c")) == 1
+    mixed.record("a", 400 * MS)
+    mixed.record_many("bc", [500 * MS, 600 * MS])
+    assert sorted(mixed.rows(1)) == sorted(single.rows(1))
+
+def test_interval_buckets_match_bisect():
+    rng = random.Random(9)
+    latency = KeyLatency()
+    timestamps = [0]
+    for _ in range(20000):
+        timestamps.append(timestamps[-1] + rng.choice((
+            0, rng.randrange(1 << 24), rng.randrange(1 << 34), rng.choice(BOUNDS), rng.choice(BOUNDS) - 1
+        )))
+    idle = len(latency.bounds)
+    expected = [
+        min(bisect_right(latency.bounds, later - earlier), idle)
+        for earlier, later in zip(timestamps, timestamps[1:])
+    ]
+    assert list(_interval_buckets(latency.tables, timestamps, len(timestamps))) == expected
+    # 递减的时刻无法按字节分桶
+    assert _interval_buckets(latency.tables, [5 * MS, 3 * MS], 2) is None
+
+def test_percentiles_and_slowest_bigrams():
+    latency = KeyLatency()
+    now = 0
+    for _ in range(20):
+        for char, gap in (("a", 100), ("b", 100), ("c", 900)):
+            now += gap * MS
+            latency.record(char, now)
+    assert 80 < latency.percentile("b", 50) < 120
+    assert 750 < latency.percentile("c", 95) < 1100
+    assert latency.percentile("z", 50) is None
+    assert latency.slowest_bigrams(limit=1)[0][0] == "bc"
+    assert len(latency.keys) == 3 and len(latency.bigrams) == 3
+
+def test_aggregated_across_sessions(tmp_path):
+    database = DatabaseManger(str(tmp_path / "test.db"))
+    writer = SessionWriter(database)
+    for _ in range(2):
+        clock = VirtualClock(0)
+        engine = TypingEngine(StatusScheduler(), writer=writer, user_id=3, clock=clock)
+        engine.status_update = lambda status: None
+        engine.load_text("abab")
+        engine.start_session()
+        for char in "abab":
+            engine.process_input(char, clock.advance(200 * MS))
+        engine.end_session()
+
+    total = KeyLatency.load(database, 3)
+    assert sum(total.histogram("a")) == 2
+    assert sum(total.histogram("ab")) == 4
+    assert sum(total.histogram("b")) == 4
+    writer.close()
+    database.close()
@@ -0,0 +1,47 @@
+from core.KeyboardListener import KeyboardListener, SyntheticSource, KeyEventBuffer, KeyEvent
+from core.StatusScheduler import StatusScheduler
+from core.TypingEngine import TypingEngine
+
+def test_synthetic_input_reaches_engine():
+    engine = TypingEngine(StatusScheduler())
+    engine.status_update = lambda status: None
+    engine.load_text("hello world")
+    engine.start_session()
+
+    rendered = []
+    source = SyntheticSource()
+    listener = KeyboardListener(engine, source, on_render=lambda: rendered.append(engine.current_position))
+    listener.start()
+    source.type("hellp\bo world!")
+    listener.stop()
+    listener.join(timeout=5)
+    engine.end_session()
+
+    assert engine.user_input == "hello world"
+    assert engine.error_counts == 0
+    assert rendered[-1] == 11
+    assert len(listener.latency.samples) == 14
+    assert listener.latency.percentiles()[50] >= 0
+
+def test_buffer_overflow_rejects_and_counts():
+    buffer = KeyEventBuffer(capacity=3)
+    results = [buffer.put(KeyEvent(str(i), str(i), i)) for i in range(5)]
+    assert results == [True, True, True, False, False]
+    assert buffer.dropped_keystrokes == 2
+    assert [event.char for event in buffer.get_batch(10)] == ['0', '1', '2']
+
+def test_dropped_keystrokes_reported_to_engine():
+    engine = TypingEngine(StatusScheduler())
+    engine.status_update = lambda status: None
+    engine.load_text("hello world")
+    engine.start_session()
+
+    source = SyntheticSource()
+    listener = KeyboardListener(engine, source, capacity=3)
+    source.start(listener.capture)
+    source.type("hello")
+    listener.deliver(listener.events.get_batch(10))
+    assert engine.user_input == "hel"
+    assert listener.dropped_keystrokes == engine.dropped_keystrokes == 2
+    listener.deliver([])
+    assert engine.get_stats()['dropped_keystrokes'] == 2
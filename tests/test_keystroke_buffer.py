@@ -0,0 +1,32 @@
+from core.KeystrokeBuffer import KeystrokeBuffer
+from core.TypingEngine import TypingEngine
+
+def test_append_and_pop():
+    buffer = KeystrokeBuffer()
+    for i, char in enumerate("héllo 世界"):
+        buffer.append(char, i % 2 == 0)
+    assert buffer.text == "héllo 世界"
+    assert len(buffer) == 8
+    assert buffer.is_correct_at(0) == True
+    assert buffer.is_correct_at(1) == False
+
+    assert buffer.pop() == ('界', False)
+    assert buffer.pop() == ('世', True)
+    assert buffer.text == "héllo "
+
+def test_engine_backspace():
+    engine = TypingEngine()
+    engine.status_update = lambda status: None
+    engine.load_text("abc")
+    engine.start_session()
+    engine.process_input('a')
+    engine.process_input('x')
+    assert engine.user_input == "ax"
+    assert engine.error_counts == 1
+
+    assert engine.backspace() == True
+    assert engine.user_input == "a"
+    assert engine.error_counts == 0
+    assert engine.correct_chars == 1
+    assert 1 not in engine.error_positions
+    engine.end_session()
@@ -0,0 +1,72 @@
+import os
+from core.PracticeGenerator import CorpusIndex, PracticeGenerator
+
+def new_index(tmp_path):
+    return CorpusIndex(str(tmp_path), str(tmp_path.parent / (tmp_path.name + "_cache")))
+
+def test_index_cached_and_incremental(tmp_path):
+    (tmp_path / "a.txt").write_text("the quick brown fox jumps over the lazy dog", encoding='utf-8')
+    (tmp_path / "b.txt").write_text("zebra zigzag puzzle", encoding='utf-8')
+    index = new_index(tmp_path)
+    assert index.counts[index.word_ids["the"]] == 2
+    assert os.path.exists(index.cache_path)
+
+    cached = new_index(tmp_path)
+    assert cached.words == index.words and cached.refresh() == 0
+
+    (tmp_path / "b.txt").write_text("quizzical jazz", encoding='utf-8')
+    os.utime(tmp_path / "b.txt", ns=(1, 1))
+    assert cached.refresh() == 1
+    assert cached.counts[cached.word_ids["zebra"]] == 0
+    assert cached.counts[cached.word_ids["jazz"]] == 1
+    assert cached.word_ids["the"] == index.word_ids["the"]
+
+def test_drill_favours_weak_spots(tmp_path):
+    words = ["alpha", "beta", "gamma", "delta", "zigzag", "quiz"] + [f"word{'a' * i}" for i in range(50)]
+    (tmp_path / "c.txt").write_text(" ".join(words * 20), encoding='utf-8')
+    generator = PracticeGenerator(new_index(tmp_path), seed=1)
+
+    drill = generator.generate(500, error_analysis={'z': 10}, slow_bigrams=[('qu', 400.0, 9)], focus=0.5)
+    drilled = drill.split()
+    assert len(drilled) == 500
+    weak = sum(1 for word in drilled if 'z' in word or 'qu' in word)
+    assert weak >= 250
+    assert len(generator.generate(100).split()) == 100
+
+def test_invalid_cache_rebuilt(tmp_path):
+    import marshal, pickle
+    (tmp_path / "a.txt").write_text("the quick brown fox", encoding='utf-8')
+    cache_path = new_index(tmp_path).cache_path
+    header = CorpusIndex.CACHE_HEADER
+
+    # 旧的 pickle 缓存、截断的缓存与结构不对的缓存都只会触发重建
+    for content in (
+        pickle.dumps({'version': 1, 'files': {}, 'words': [], 'counts': [], 'postings': {}}),
+        header + marshal.dumps(({}, ["x"], b"\1\0\0\0", {}))[:-3],
+        header + marshal.dumps(({}, ["x"], b"\1\0\0\0", {"x": b"\7\0\0\0"})),
+        header + marshal.dumps(({"p": [1, 2, {}]}, [], b"", {})),
+    ):
+        with open(cache_path, 'wb') as file:
+            file.write(content)
+        index = new_index(tmp_path)
+        assert sorted(index.words) == ["brown", "fox", "quick", "the"]
+        assert new_index(tmp_path).load()
+
+def test_cache_kept_out_of_corpus(tmp_path):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    (corpus / "a.txt").write_text("the quick brown fox", encoding='utf-8')
+    cache_dir = tmp_path / "cache"
+    index = CorpusIndex(str(corpus), str(cache_dir))
+    assert os.listdir(corpus) == ["a.txt"]
+    assert os.path.dirname(index.cache_path) == str(cache_dir) and os.path.exists(index.cache_path)
+    assert CorpusIndex(str(corpus), str(cache_dir)).load()
+
+    # 另一个语料目录使用不同的缓存文件；缓存目录不可用时仍能建立索引
+    other = tmp_path / "other"
+    other.mkdir()
+    (other / "b.txt").write_text("zebra", encoding='utf-8')
+    assert CorpusIndex(str(other), str(cache_dir)).cache_path != index.cache_path
+    blocked = tmp_path / "blocked"
+    blocked.write_text("", encoding='utf-8')
+    assert CorpusIndex(str(corpus), str(blocked / "cache")).words == ["the", "quick", "brown", "fox"]
@@ -0,0 +1,82 @@
+import random
+from core.Clock import VirtualClock
+from core.SessionRecorder import SessionRecorder, SessionReplayer
+from core.StatusScheduler import StatusScheduler
+from core.TypingEngine import TypingEngine
+
+def new_engine(text, recorder=None, clock=None):
+    engine = TypingEngine(StatusScheduler(), recorder=recorder, clock=clock)
+    engine.status_update = lambda status: None
+    engine.load_text(text)
+    return engine
+
+def test_record_and_replay(tmp_path):
+    rng = random.Random(3)
+    text = "".join(rng.choice("asdf jkl;") for _ in range(300)) + "终"
+    path = tmp_path / "session.jtrc"
+
+    clock = VirtualClock(1_000_000_000_000)
+    engine = new_engine(text, SessionRecorder(path, {'text': text}), clock)
+    engine.start_session()
+    for i, char in enumerate(text):
+        clock.advance(rng.randrange(50_000_000, 300_000_000))
+        engine.process_input(char if rng.random() > 0.05 else 'x', clock.now)
+        if i % 50 == 10:
+            engine.backspace()
+        if i == 150:
+            engine.pause_session()
+            clock.advance(5_000_000_000)
+            engine.resume_session()
+    engine.process_inputs(text[engine.current_position:], [clock.now + 100_000_000] * 10)
+    clock.advance(200_000_000)
+    engine.end_session()
+
+    replayer = SessionReplayer(path)
+    assert replayer.metadata['text'] == text
+    for batch in (True, False):
+        replayed = new_engine(replayer.metadata['text'])
+        replayer.replay(replayed, batch=batch)
+        assert replayed.is_completed
+        assert replayed.user_input == engine.user_input
+        assert replayed.error_positions == engine.error_positions
+        assert replayed.get_duration_ns() == engine.get_duration_ns()
+        assert replayed.get_stats() == engine.get_stats()
+
+def test_control_code_points_round_trip(tmp_path):
+    text = "a\x00b\x01c\x02d\x08e"
+    path = tmp_path / "session.jtrc"
+    clock = VirtualClock(1_000_000_000)
+    engine = new_engine(text, SessionRecorder(path, {'text': text}), clock)
+    engine.start_session()
+    for char in text:
+        clock.advance(100_000_000)
+        engine.process_input(char, clock.now)
+    engine.backspace()
+    engine.backspace()
+    engine.process_input("\x08", clock.now)
+    engine.process_input("e", clock.now)
+    clock.advance(100_000_000)
+    engine.end_session()
+
+    replayer = SessionReplayer(path)
+    for batch in (True, False):
+        replayed = new_engine(text)
+        replayer.replay(replayed, batch=batch)
+        assert replayed.is_completed
+        assert replayed.user_input == text
+        assert replayed.get_stats() == engine.get_stats()
+
+def test_legacy_version_readable(tmp_path):
+    from core.SessionRecorder import MAGIC, LEGACY_VERSION, END, BACKSPACE, write_varint
+    path = tmp_path / "legacy.jtrc"
+    metadata = b'{"text": "ab", "started_at": 0}'
+    data = bytearray(MAGIC)
+    data.append(LEGACY_VERSION)
+    write_varint(data, len(metadata))
+    data += metadata
+    for code in (ord('x'), BACKSPACE, ord('a'), ord('b'), END):
+        write_varint(data, code)
+        write_varint(data, 10)
+    path.write_bytes(bytes(data))
+    replayer = SessionReplayer(path)
+    assert [code for code, _ in replayer.events] == ['x', BACKSPACE, 'a', 'b', END]
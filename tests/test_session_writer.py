@@ -0,0 +1,139 @@
+from core.DatabaseManager import DatabaseManger
+from core.SessionWriter import SessionWriter
+from core.StatusScheduler import StatusScheduler
+from core.TypingEngine import TypingEngine
+
+def test_session_persisted_on_end(tmp_path):
+    database = DatabaseManger(str(tmp_path / "test.db"))
+    writer = SessionWriter(database, flush_interval=60, batch_size=1000)
+    engine = TypingEngine(StatusScheduler(), writer=writer, user_id=1)
+    engine.status_update = lambda status: None
+    engine.load_text("hello")
+    engine.start_session()
+    for char in "hallo":
+        engine.process_input(char)
+    engine.backspace()
+    engine.end_session()
+
+    assert database.query("SELECT COUNT(*) FROM keystrokes WHERE session_id = ?", (engine.session_id,))[0][0] == 6
+    row = database.query("SELECT user_id, typed_chars, error_counts, error_analysis FROM sessions")[0]
+    assert row == (1, 4, 1, '{"e": 1}')
+
+    writer.close()
+    database.close()
+
+def test_backpressure_never_blocks(tmp_path):
+    database = DatabaseManger(str(tmp_path / "test.db"))
+    writer = SessionWriter(database, max_pending=10)
+    results = [writer.record_keystroke(1, 1, i, 'a', 'a', True, 0.0) for i in range(1000)]
+    assert results.count(False) == writer.dropped == writer.dropped_keystrokes
+    writer.close()
+    database.close()
+
+def test_failed_commit_raised_from_flush(tmp_path):
+    import pytest
+
+    database = DatabaseManger(str(tmp_path / "test.db"))
+    writer = SessionWriter(database, flush_interval=60)
+    # char 为 NOT NULL，整批提交失败
+    writer.record_keystrokes([(1, 1, 0, 'a', 'a', True, 0.0), (1, 1, 1, None, 'b', False, 0.0)])
+    with pytest.raises(RuntimeError) as error:
+        writer.flush()
+    assert writer.lost_keystrokes == 2
+    assert "2" in str(error.value)
+    # 错误只抛出一次，之后的写入正常
+    writer.record_keystroke(1, 1, 0, 'a', 'a', True, 0.0)
+    assert writer.flush() == True
+    writer.close()
+    database.close()
+
+def test_session_ids_unique_across_writers(tmp_path):
+    import sqlite3
+    from core.Migrations import MIGRATIONS
+
+    # 升级前的数据库中已有会话，新编号从其后继续分配
+    path = str(tmp_path / "test.db")
+    conn = sqlite3.connect(path)
+    for version, statements in MIGRATIONS:
+        if version < 8:
+            for statement in statements:
+                conn.execute(statement)
+    conn.execute("PRAGMA user_version = 7")
+    conn.execute("INSERT INTO sessions (id) VALUES (41)")
+    conn.commit()
+    conn.close()
+
+    first = DatabaseManger(path)
+    second = DatabaseManger(path)
+    writers = [SessionWriter(first), SessionWriter(second)]
+    ids = [writer.new_session_id() for _ in range(5) for writer in writers]
+    # 每个写入器按块申请编号，块之间不重叠
+    assert len(set(ids)) == 10 and min(ids) == 42
+    assert first.query("SELECT COUNT(*) FROM session_ids")[0][0] == 1
+    for writer in writers:
+        writer.close()
+    first.close()
+    second.close()
+
+def test_new_session_id_never_waits_for_write_lock(tmp_path):
+    import sqlite3
+    import time
+
+    database = DatabaseManger(str(tmp_path / "test.db"))
+    writer = SessionWriter(database)
+    first = writer.new_session_id()
+    # 其他进程长时间持有写锁时，开始会话仍然立即拿到编号
+    blocker = sqlite3.connect(str(tmp_path / "test.db"), isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")
+    started = time.monotonic()
+    ids = [writer.new_session_id() for _ in range(SessionWriter.ID_BLOCK - 1)]
+    assert time.monotonic() - started < 0.5
+    assert ids == list(range(first + 1, first + SessionWriter.ID_BLOCK))
+    blocker.execute("ROLLBACK")
+    blocker.close()
+    # 写锁释放后写入线程补充下一块
+    assert writer.new_session_id() >= first + SessionWriter.ID_BLOCK
+    writer.close()
+    database.close()
+
+def test_engine_counts_dropped_keystrokes(tmp_path):
+    database = DatabaseManger(str(tmp_path / "test.db"))
+    writer = SessionWriter(database, max_pending=3)
+    # 停止写入线程，队列不再被消费
+    writer.close()
+    engine = TypingEngine(StatusScheduler(), writer=writer, user_id=1)
+    engine.status_update = lambda status: None
+    engine.load_text("hello world")
+    engine.start_session()
+    for char in "hello":
+        engine.process_input(char)
+    engine.process_inputs(" world")
+    assert engine.dropped_keystrokes == writer.dropped_keystrokes == 2 + 6
+    assert engine.get_stats()['dropped_keystrokes'] == 8
+    engine.scheduler.unregister(engine)
+    database.close()
+
+def test_rollups_follow_sessions(tmp_path):
+    database = DatabaseManger(str(tmp_path / "test.db"))
+    writer = SessionWriter(database)
+    for text, typed in (("hello", "hallo"), ("world", "wprld"), ("hello", "hello")):
+        engine = TypingEngine(StatusScheduler(), writer=writer, user_id=7)
+        engine.status_update = lambda status: None
+        engine.load_text(text)
+        engine.start_session()
+        for char in typed:
+            engine.process_input(char)
+        engine.end_session()
+
+    rollup = writer.rollup
+    daily = rollup.progress(7)
+    assert len(daily) == 1 and daily[0][1] == 3
+    assert sorted(rollup.common_errors(7)) == [('e', 1), ('o', 1)]
+    assert rollup.check() == []
+
+    database.execute("UPDATE char_errors SET errors = 5 WHERE char = 'e'")
+    assert len(rollup.check()) == 1
+    rollup.rebuild()
+    assert rollup.check() == []
+    writer.close()
+    database.close()
@@ -0,0 +1,26 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run(args, stdin=''):
+    return subprocess.run(
+        [sys.executable, *args], cwd=ROOT, input=stdin, capture_output=True, text=True, check=True
+    ).stdout
+
+
+def test_import_core_is_lazy():
+    output = run(['-c', (
+        "import sys, core\n"
+        "print('tkinter' in sys.modules, 'sqlite3' in sys.modules)\n"
+        "from core import TypingEngine\n"
+        "print(isinstance(TypingEngine, type), 'tkinter' in sys.modules)\n"
+    )])
+    assert output.split() == ['False', 'False', 'True', 'False']
+
+
+def test_headless_mode():
+    output = run(['main.py', '--headless'], "The quick brown fox\njumps over the lazy dog.\n")
+    assert "准确率: 100.0% | 错误: 0" in output.splitlines()[-1]
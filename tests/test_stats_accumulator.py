@@ -0,0 +1,38 @@
+from core.Clock import NS_PER_SECOND as NS
+from core.StatsAccumulator import StatsAccumulator
+
+def test_incremental_stats():
+    stats = StatsAccumulator(window=10 * NS)
+    for i in range(60):
+        stats.record(i % 4 != 0, i * NS)
+    snapshot = stats.snapshot(60 * NS, 60 * NS)
+    assert snapshot.typed_chars == 60
+    assert snapshot.correct_chars == 45
+    assert snapshot.accuracy == 75.0
+    assert snapshot.error_rate == 25.0
+    assert snapshot.wpm == 9.0
+    assert snapshot.raw_wpm == 12.0
+    # 窗口 [50, 60] 内共有 8 个正确按键
+    assert snapshot.window_wpm == 8 * 12 / 10
+    assert snapshot.duration_time == 60.0
+    assert stats.snapshot(60 * NS) is snapshot
+
+    stats.undo(True)
+    assert stats.snapshot(60 * NS).correct_chars == 44
+
+def test_engine_keystroke_path_takes_no_snapshot(monkeypatch):
+    from core.StatusScheduler import StatusScheduler
+    from core.TypingEngine import TypingEngine
+
+    calls = []
+    snapshot = StatsAccumulator.snapshot
+    monkeypatch.setattr(StatsAccumulator, 'snapshot', lambda self, *args: calls.append(args) or snapshot(self, *args))
+    engine = TypingEngine(StatusScheduler())
+    engine.status_update = lambda status: None
+    engine.load_text("hello world")
+    engine.reset_engine()
+    for char in "hello":
+        engine.process_input(char, 0)
+    assert calls == []
+    engine.push_status()
+    assert len(calls) == 1
@@ -0,0 +1,71 @@
+import threading
+from core.StatusScheduler import StatusScheduler
+from core.TypingEngine import TypingEngine
+
+def test_single_thread_across_pause_resume():
+    scheduler = StatusScheduler(frame_interval=0.01)
+    engines = [TypingEngine(scheduler) for _ in range(3)]
+    for engine in engines:
+        engine.status_update = lambda status: None
+        engine.load_text("hello")
+        engine.start_session()
+
+    before = threading.active_count()
+    for _ in range(10):
+        for engine in engines:
+            engine.pause_session()
+            engine.resume_session()
+    assert threading.active_count() == before
+
+    for engine in engines:
+        engine.end_session()
+    assert scheduler.engines == set()
+
+def test_push_only_on_change():
+    pushed = []
+    engine = TypingEngine(StatusScheduler())
+    engine.status_update = pushed.append
+    engine.load_text("hello")
+    engine.reset_engine()
+
+    assert engine.push_status() == True
+    assert engine.push_status() == False
+    engine.process_input('h')
+    assert engine.push_status() == True
+    assert len(pushed) == 2
+
+def test_detach_cancels_timer_and_falls_back_to_thread():
+    jobs = {}
+    cancelled = []
+    def timer(delay, callback):
+        job = len(jobs)
+        jobs[job] = callback
+        return job
+    scheduler = StatusScheduler(frame_interval=0.01)
+    scheduler.attach_timer(timer, cancelled.append)
+
+    pushed = []
+    engine = TypingEngine(scheduler)
+    engine.status_update = pushed.append
+    engine.load_text("hello")
+    engine.start_session()
+    assert scheduler.timer_job == 0
+
+    scheduler.detach()
+    assert cancelled == [0]
+    assert scheduler.timer is None
+    # 已取消的定时任务即使触发也不再推送或重新调度
+    jobs[0]()
+    assert len(jobs) == 1
+    assert scheduler.thread is not None
+    engine.end_session()
+
+def test_snapshot_while_recording_from_another_thread():
+    engine = TypingEngine(StatusScheduler(frame_interval=0.0001))
+    engine.status_update = lambda status: None
+    engine.load_text("a" * 200_000)
+    engine.start_session()
+    for _ in range(200_000):
+        engine.process_input('a', engine.clock() - 20 * 10 ** 9)
+    engine.end_session()
+    assert engine.correct_chars == 200_000
@@ -0,0 +1,48 @@
+from core.TextSource import MmapTextSource, StringTextSource
+from core.TypingEngine import TypingEngine
+from core.StatusScheduler import StatusScheduler
+
+def test_mmap_source_matches_str(tmp_path, monkeypatch):
+    monkeypatch.setattr(MmapTextSource, 'BLOCK_SIZE', 16)
+    text = "打字练习 typing practice\n第二行 second line 😀\n" * 20
+    path = tmp_path / "text.txt"
+    path.write_bytes(text.encode('utf-8'))
+
+    with MmapTextSource(str(path)) as source:
+        assert source[0] == text[0]
+        assert source[100] == text[100]
+        assert source[50:400] == text[50:400]
+        assert source[-5:] == text[-5:]
+        assert source.find('\n', 30) == text.find('\n', 30)
+        assert len(source) == len(text)
+        assert len(source.cache) <= MmapTextSource.CACHED_BLOCKS
+
+def test_engine_accepts_text_source():
+    engine = TypingEngine(StatusScheduler())
+    engine.load_text(StringTextSource("abc"))
+    engine.reset_engine()
+    engine.process_input('a')
+    engine.process_input('c')
+    assert engine.total_chars == 3
+    assert engine.error_counts == 1
+
+def test_status_does_not_scan_whole_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(MmapTextSource, 'BLOCK_SIZE', 64)
+    text = "typing practice 打字练习\n" * 200
+    path = tmp_path / "text.txt"
+    path.write_bytes(text.encode('utf-8'))
+
+    with MmapTextSource(str(path)) as source:
+        engine = TypingEngine(StatusScheduler())
+        engine.status_update = lambda status: None
+        engine.load_text(source)
+        engine.start_session()
+        engine.process_input('t')
+        engine.push_status()
+        status = engine.get_current_status()
+        assert source.length is None
+        assert len(source.byte_offsets) <= 3
+        assert abs(status['total_chars'] - len(text)) < len(text) * 0.05
+        assert len(source) == len(text)
+        assert engine.total_chars == len(text)
+        engine.end_session()
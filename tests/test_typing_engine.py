@@ -0,0 +1,59 @@
+import random
+from core.Clock import VirtualClock, NS_PER_SECOND
+from core.StatusScheduler import StatusScheduler
+from core.TypingEngine import TypingEngine
+
+def make_engine(text):
+    engine = TypingEngine(StatusScheduler())
+    engine.status_update = lambda status: None
+    engine.load_text(text)
+    engine.start_session()
+    return engine
+
+def test_batch_matches_single_inputs():
+    rng = random.Random(1)
+    text = "".join(rng.choice("abcdef ") for _ in range(5000))
+    typed = "".join(c if rng.random() > 0.02 else 'x' for c in text) + "overflow"
+
+    single = make_engine(text)
+    for char in typed[:len(text)]:
+        single.process_input(char, 1000)
+    batch = make_engine(text)
+    for start in range(0, len(typed), 777):
+        batch.process_inputs(typed[start:start + 777], [1000] * 777)
+
+    assert batch.current_position == single.current_position == len(text)
+    assert batch.user_input == single.user_input
+    assert batch.error_positions == single.error_positions
+    assert batch.error_analysis == single.error_analysis
+    assert batch.correct_chars == single.correct_chars
+    assert batch.input_buffer._bitmap[:len(text) // 8] == single.input_buffer._bitmap[:len(text) // 8]
+    single.end_session()
+    batch.end_session()
+
+def test_batch_non_ascii():
+    engine = make_engine("打字练习abc")
+    assert engine.process_inputs("打子练习abx!") == 7
+    assert engine.error_positions == {1, 6}
+    assert dict(engine.error_analysis) == {'字': 1, 'c': 1}
+    engine.end_session()
+
+def test_virtual_clock_timing():
+    clock = VirtualClock(5 * NS_PER_SECOND)
+    engine = TypingEngine(StatusScheduler(), clock=clock)
+    engine.status_update = lambda status: None
+    engine.load_text("abcde" * 20)
+    engine.start_session()
+    for char in "abcde" * 4:
+        engine.process_input(char, clock.advance(NS_PER_SECOND // 2))
+    engine.pause_session()
+    clock.advance(60 * NS_PER_SECOND)
+    engine.resume_session()
+    clock.advance(NS_PER_SECOND * 2)
+    engine.end_session()
+
+    assert engine.get_duration_ns() == 12 * NS_PER_SECOND
+    stats = engine.get_stats()
+    assert stats['duration_time'] == 12.0
+    assert stats['wpm'] == 20.0
+    assert stats['start_time'] == 65.0
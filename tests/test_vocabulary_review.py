@@ -0,0 +1,68 @@
+from core.DatabaseManager import DatabaseManger
+from core.StatusScheduler import StatusScheduler
+from core.TypingEngine import TypingEngine
+from core.VocabularyReview import Card, ReviewScheduler, VocabularyReview, sm2, DAY
+
+def test_sm2_intervals():
+    card = Card(1, "apple")
+    for expected in (1, 6, 15.0):
+        sm2(card, 4, 0)
+        assert card.interval == expected
+    sm2(card, 1, 100)
+    assert card.repetitions == 0 and card.lapses == 1
+    assert card.next_due == 100 + ReviewScheduler.RELEARN_DELAY
+    assert card.ease >= 1.3
+
+def test_scheduler_orders_and_reschedules(tmp_path, monkeypatch):
+    monkeypatch.setattr(ReviewScheduler, 'BATCH_SIZE', 8)
+    database = DatabaseManger(str(tmp_path / "test.db"))
+    scheduler = ReviewScheduler(database, 1, "gre")
+    assert scheduler.import_words([f"word{i:03}" for i in range(50)], now=0) == 50
+    assert scheduler.import_words(["word000", ("extra", "额外")], now=0) == 1
+    assert len(scheduler) == 51
+
+    reviewed = []
+    while (card := scheduler.next_card(now=10)) is not None:
+        reviewed.append(card.word)
+        # 一半的卡片遗忘，10 分钟后重新出现
+        scheduler.answer(card, 2 if len(reviewed) % 2 else 5, now=10)
+    assert len(reviewed) == 51 and len(set(reviewed)) == 51
+    assert scheduler.due_count(now=10) == 0
+
+    relearn = ReviewScheduler(database, 1, "gre")
+    assert relearn.due_count(now=10 + ReviewScheduler.RELEARN_DELAY) == 26
+    again = []
+    while (card := relearn.next_card(now=10 + ReviewScheduler.RELEARN_DELAY)) is not None:
+        again.append(card)
+        relearn.answer(card, 4, now=1000)
+    assert len(again) == 26
+    assert relearn.peek().next_due == 10 + DAY
+    database.close()
+
+def test_import_file_uses_given_clock(tmp_path):
+    path = tmp_path / "words.txt"
+    path.write_text("apple\t苹果\n\nbanana\n", encoding='utf-8')
+    database = DatabaseManger(str(tmp_path / "test.db"))
+    scheduler = ReviewScheduler(database, 1)
+    assert scheduler.import_file(str(path), now=100) == 2
+    assert database.query("SELECT word, meaning, next_due FROM cards ORDER BY word") == [
+        ("apple", "苹果", 100), ("banana", None, 100)
+    ]
+    assert scheduler.due_count(now=100) == 2
+    database.close()
+
+def test_review_with_engine(tmp_path):
+    database = DatabaseManger(str(tmp_path / "test.db"))
+    scheduler = ReviewScheduler(database, 1)
+    scheduler.import_words(["cat", "dog"], now=0)
+    engine = TypingEngine(StatusScheduler())
+    engine.status_update = lambda status: None
+    review = VocabularyReview(engine, scheduler)
+
+    grades = []
+    while (card := review.next(now=1)) is not None:
+        engine.process_inputs("cxt" if card.word == "cat" else card.word)
+        grades.append((card.word, review.finish(now=1)))
+    assert grades[0][0] == "cat" and grades[0][1] < 3
+    assert grades[1][0] == "dog" and grades[1][1] >= 4
+    database.close()
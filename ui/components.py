@@ -0,0 +1,421 @@
+from bisect import bisect_right
+from operator import itemgetter
+
+
+class DiffRenderer:
+    """游程差异渲染器
+
+    以游程（连续同类字符区间）维护文本的显示状态：已输入区域由
+    correct/error 游程组成，其后是 current（当前位置）和 pending（未输入）。
+    光标前进或退格时只更新末尾游程，并只返回发生变化的区间
+    (start, end, tag)，可直接交给 Tk Text 控件的 tag_add 使用。
+    """
+
+    CORRECT = 'correct'
+    ERROR = 'error'
+    CURRENT = 'current'
+    PENDING = 'pending'
+    TAGS = (CORRECT, ERROR, CURRENT, PENDING)
+
+    def __init__(self, length:int):
+        """初始化渲染器
+        Args:
+            length(int): 文本长度
+        """
+        self.length = length
+        self.position = 0
+        # 已输入区域的游程，元素为 [start, end, tag]
+        self.runs = []
+
+    # ----------- 增量更新 ----------- #
+
+    def advance(self, is_correct:bool) -> list:
+        """光标前进一个字符
+        Args:
+            is_correct(bool): 刚输入的字符是否正确
+        Returns:
+            changes(list): 发生变化的区间 [(start, end, tag), ...]
+        """
+        position = self.position
+        if position >= self.length:
+            return []
+        tag = DiffRenderer.CORRECT if is_correct else DiffRenderer.ERROR
+
+        runs = self.runs
+        if runs and runs[-1][2] == tag:
+            runs[-1][1] += 1
+        else:
+            runs.append([position, position + 1, tag])
+
+        self.position = position + 1
+        changes = [(position, position + 1, tag)]
+        if self.position < self.length:
+            changes.append((self.position, self.position + 1, DiffRenderer.CURRENT))
+        return changes
+
+    def retreat(self) -> list:
+        """光标后退一个字符（退格）
+        Returns:
+            changes(list): 发生变化的区间 [(start, end, tag), ...]
+        """
+        if self.position == 0:
+            return []
+
+        runs = self.runs
+        last = runs[-1]
+        last[1] -= 1
+        if last[0] == last[1]:
+            runs.pop()
+
+        self.position -= 1
+        changes = [(self.position, self.position + 1, DiffRenderer.CURRENT)]
+        if self.position + 1 < self.length:
+            changes.append((self.position + 1, self.position + 2, DiffRenderer.PENDING))
+        return changes
+
+    def sync(self, position:int, is_correct_at) -> list:
+        """将渲染状态同步到指定位置，合并期间所有变化
+        Args:
+            position(int): 引擎当前的输入位置
+            is_correct_at(callable): 根据位置判断该字符是否正确的函数
+        Returns:
+            changes(list): 合并后的变化区间 [(start, end, tag), ...]
+        """
+        changes = []
+        while self.position < position:
+            changes.extend(self.advance(is_correct_at(self.position)))
+        while self.position > position:
+            changes.extend(self.retreat())
+        return self.coalesce(changes)
+
+    @staticmethod
+    def coalesce(changes:list) -> list:
+        """合并变化区间：后写入的覆盖先写入的，相邻同类区间合并
+        Args:
+            changes(list): 按发生顺序排列的变化区间
+        Returns:
+            changes(list): 按位置排序、互不重叠的变化区间
+        """
+        if len(changes) <= 1:
+            return changes
+        latest = {}
+        for start, end, tag in changes:
+            for index in range(start, end):
+                latest[index] = tag
+
+        merged = []
+        for index in sorted(latest):
+            tag = latest[index]
+            if merged and merged[-1][1] == index and merged[-1][2] == tag:
+                merged[-1][1] = index + 1
+            else:
+                merged.append([index, index + 1, tag])
+        return [tuple(change) for change in merged]
+
+    # ----------- 全量输出 ----------- #
+
+    def segments(self) -> list:
+        """获取完整的游程列表，用于首次绘制
+        Returns:
+            segments(list): [(start, end, tag), ...]
+        """
+        segments = [tuple(run) for run in self.runs]
+        if self.position < self.length:
+            segments.append((self.position, self.position + 1, DiffRenderer.CURRENT))
+            if self.position + 1 < self.length:
+                segments.append((self.position + 1, self.length, DiffRenderer.PENDING))
+        return segments
+
+    def segments_between(self, start:int, end:int) -> list:
+        """获取与区间 [start, end) 相交的游程
+        Args:
+            start(int): 起始位置
+            end(int): 结束位置
+        Returns:
+            segments(list): [(start, end, tag), ...]
+        """
+        runs = self.runs
+        first = max(0, bisect_right(runs, start, key=itemgetter(0)) - 1)
+        segments = []
+        for index in range(first, len(runs)):
+            run = runs[index]
+            if run[0] >= end:
+                break
+            if run[1] > start:
+                segments.append(tuple(run))
+        if start <= self.position < min(end, self.length):
+            segments.append((self.position, self.position + 1, DiffRenderer.CURRENT))
+        pending_start = max(self.position + 1, start)
+        pending_end = min(end, self.length)
+        if pending_start < pending_end:
+            segments.append((pending_start, pending_end, DiffRenderer.PENDING))
+        return segments
+
+    @staticmethod
+    def apply(text_widget, changes:list, offset:int = 0) -> None:
+        """把变化区间应用到 Tk Text 控件上
+        Args:
+            text_widget(tk.Text): 文本控件
+            changes(list): 变化区间 [(start, end, tag), ...]
+            offset(int): 控件中第一个字符对应的文本位置
+        """
+        for start, end, tag in changes:
+            first = f"1.0+{start - offset}c"
+            last = f"1.0+{end - offset}c"
+            for old_tag in DiffRenderer.TAGS:
+                text_widget.tag_remove(old_tag, first, last)
+            text_widget.tag_add(tag, first, last)
+
+
+class LineIndex:
+    """惰性行索引
+
+    只在需要时向后扫描换行符，记录每一行的起始位置。
+    打开大文本时无需预先扫描全文。
+    """
+
+    SCAN_CHUNK = 64 * 1024
+
+    def __init__(self, text:str):
+        """初始化行索引
+        Args:
+            text(str): 文本
+        """
+        self.text = text
+        self.starts = [0]
+        self.scanned = 0
+        self.is_complete = len(text) == 0
+
+    def _scan_until(self, offset:int) -> None:
+        """向后扫描，直到覆盖 offset 所在的行"""
+        text = self.text
+        length = len(text)
+        starts = self.starts
+        while not self.is_complete and self.scanned <= offset:
+            chunk_end = min(self.scanned + LineIndex.SCAN_CHUNK, length)
+            index = text.find('\n', self.scanned, chunk_end)
+            while index != -1:
+                starts.append(index + 1)
+                index = text.find('\n', index + 1, chunk_end)
+            self.scanned = chunk_end
+            if chunk_end >= length:
+                self.is_complete = True
+
+    def line_of(self, offset:int) -> int:
+        """获取 offset 所在的行号（从 0 开始）"""
+        self._scan_until(offset)
+        return bisect_right(self.starts, offset) - 1
+
+    def line_start(self, line:int) -> int:
+        """获取行的起始位置"""
+        return self.starts[line]
+
+    def line_end(self, line:int) -> int:
+        """获取行的结束位置（不含换行符）"""
+        if self.has_line(line + 1):
+            return self.starts[line + 1] - 1
+        return len(self.text)
+
+    def has_line(self, line:int) -> bool:
+        """判断行是否存在"""
+        while line >= len(self.starts) and not self.is_complete:
+            self._scan_until(self.scanned)
+        return line < len(self.starts)
+
+
+class TextViewport:
+    """虚拟化文本视口
+
+    只计算 current_position 附近可见的若干显示行（外加预取边距），
+    换行（按列数折行）与滚动均按需计算，适合超大文本。
+    """
+
+    def __init__(self, text:str, rows:int = 20, columns:int = 80, prefetch:int = 10):
+        """初始化视口
+        Args:
+            text(str): 文本
+            rows(int): 可见的显示行数
+            columns(int): 每个显示行的字符数
+            prefetch(int): 可见区域上下各额外准备的显示行数
+        """
+        self.text = text
+        self.rows = rows
+        self.columns = columns
+        self.prefetch = prefetch
+        self.lines = LineIndex(text)
+        # 当前已生成的区间 [start, end)
+        self.start = 0
+        self.end = 0
+
+    def _row_count(self, line:int) -> int:
+        """一行文本折行后的显示行数"""
+        width = self.lines.line_end(line) - self.lines.line_start(line)
+        return max(1, -(-width // self.columns))
+
+    def _row_offset(self, line:int, row:int) -> int:
+        """某行第 row 个显示行的起始位置"""
+        return self.lines.line_start(line) + row * self.columns
+
+    def _move(self, line:int, row:int, count:int) -> tuple:
+        """从第 line 行的第 row 个显示行出发移动 count 个显示行（正数向下），在文本首尾处停止
+        Returns:
+            (line, row, remaining)(tuple): 到达的位置以及因到达首尾而未能移动的显示行数
+        """
+        while count > 0:
+            remaining = self._row_count(line) - 1 - row
+            if remaining > 0:
+                step = min(count, remaining)
+                row += step
+                count -= step
+            elif self.lines.has_line(line + 1):
+                line += 1
+                row = 0
+                count -= 1
+            else:
+                break
+        while count < 0:
+            if row > 0:
+                step = min(-count, row)
+                row -= step
+                count += step
+            elif line > 0:
+                line -= 1
+                row = self._row_count(line) - 1
+                count += 1
+            else:
+                break
+        return line, row, count
+
+    def _row_end(self, line:int, row:int) -> int:
+        """某行第 row 个显示行的结束位置（含行尾换行符）"""
+        return min(
+            self._row_offset(line, row) + self.columns,
+            self.lines.line_end(line) + 1,
+            len(self.text)
+        )
+
+    def window(self, position:int) -> tuple:
+        """计算包含 position 的可见区间（含预取边距）
+        Args:
+            position(int): 当前输入位置
+        Returns:
+            (start, end)(tuple): 文本区间
+        """
+        position = max(0, min(position, len(self.text)))
+        line = self.lines.line_of(position)
+        row = (position - self.lines.line_start(line)) // self.columns
+
+        # 当前行上方保留三分之一的可见行
+        start_line, start_row, _ = self._move(line, row, -(self.rows // 3 + self.prefetch))
+        end_line, end_row, _ = self._move(line, row, self.rows - self.rows // 3 + self.prefetch)
+        return self._row_offset(start_line, start_row), self._row_end(end_line, end_row)
+
+    def needs_refresh(self, position:int) -> bool:
+        """判断 position 是否已接近已生成区间的边缘，需要重新生成"""
+        margin = self.prefetch * self.columns // 2
+        at_start = self.start == 0
+        at_end = self.end >= len(self.text)
+        return not (
+            (at_start or position >= self.start + margin)
+            and (at_end or position < self.end - margin)
+        )
+
+    def materialize(self, position:int) -> tuple:
+        """生成 position 附近的文本
+        Args:
+            position(int): 当前输入位置
+        Returns:
+            (start, content)(tuple): 区间起始位置及文本内容
+        """
+        self.start, self.end = self.window(position)
+        return self.start, self.text[self.start:self.end]
+
+    def scroll(self, rows:int) -> tuple:
+        """从当前区间出发滚动若干显示行（区间大小不变，到达文本末尾时停止）
+        Args:
+            rows(int): 滚动的显示行数，正数向下，一页为 self.rows
+        Returns:
+            (start, content)(tuple): 区间起始位置及文本内容
+        """
+        line = self.lines.line_of(self.start)
+        row = (self.start - self.lines.line_start(line)) // self.columns
+        line, row, _ = self._move(line, row, rows)
+
+        span = self.rows + 2 * self.prefetch - 1
+        end_line, end_row, missing = self._move(line, row, span)
+        if missing > 0:
+            # 已到文本末尾：把起始行上移，保持区间填满
+            line, row, _ = self._move(line, row, -missing)
+
+        self.start = self._row_offset(line, row)
+        self.end = self._row_end(end_line, end_row)
+        return self.start, self.text[self.start:self.end]
+
+
+class VirtualTextView:
+    """虚拟化的 Tk 文本控件
+
+    控件中只放入视口生成的文本片段，并用 DiffRenderer 的变化区间着色。
+    """
+
+    STYLES = {
+        DiffRenderer.CORRECT: {'foreground': '#2e7d32'},
+        DiffRenderer.ERROR: {'foreground': '#c62828', 'underline': True},
+        DiffRenderer.CURRENT: {'background': '#fff59d'},
+        DiffRenderer.PENDING: {'foreground': '#757575'},
+    }
+
+    def __init__(self, master, viewport:TextViewport, renderer:DiffRenderer, **options):
+        """初始化文本控件
+        Args:
+            master(tk.Widget): 父控件
+            viewport(TextViewport): 文本视口
+            renderer(DiffRenderer): 差异渲染器
+        """
+        import tkinter as tk
+
+        self.viewport = viewport
+        self.renderer = renderer
+        self.widget = tk.Text(
+            master, wrap='char', width=viewport.columns, height=viewport.rows, **options
+        )
+        for tag, style in VirtualTextView.STYLES.items():
+            self.widget.tag_configure(tag, **style)
+        self.refresh(renderer.position)
+
+    def refresh(self, position:int) -> None:
+        """重新生成 position 附近的文本并整体着色"""
+        start, content = self.viewport.materialize(position)
+        end = start + len(content)
+
+        self.widget.configure(state='normal')
+        self.widget.delete('1.0', 'end')
+        self.widget.insert('1.0', content)
+        self.widget.configure(state='disabled')
+
+        visible = [
+            (max(seg_start, start), min(seg_end, end), tag)
+            for seg_start, seg_end, tag in self.renderer.segments_between(start, end)
+        ]
+        DiffRenderer.apply(self.widget, visible, offset=start)
+        self.widget.see(f"1.0+{position - start}c")
+
+    def update(self, position:int, is_correct_at) -> None:
+        """同步到新的输入位置，只重绘发生变化的区间
+        Args:
+            position(int): 引擎当前的输入位置
+            is_correct_at(callable): 根据位置判断该字符是否正确的函数
+        """
+        changes = self.renderer.sync(position, is_correct_at)
+        if self.viewport.needs_refresh(position):
+            self.refresh(position)
+            return
+
+        start, end = self.viewport.start, self.viewport.end
+        visible = [
+            (max(change_start, start), min(change_end, end), tag)
+            for change_start, change_end, tag in changes
+            if change_end > start and change_start < end
+        ]
+        DiffRenderer.apply(self.widget, visible, offset=start)
+        self.widget.see(f"1.0+{position - start}c")